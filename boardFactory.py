@@ -13,6 +13,8 @@ Cambio respecto a la versión anterior:
 import os
 import json
 import math
+import zlib
+import functools
 from dataclasses import dataclass
 from typing import Dict, Tuple, List, Optional
 
@@ -48,6 +50,24 @@ class TileCell:
     isCorner:  bool
 
 
+@dataclass(frozen=True)
+class LaneSlot:
+    lane:      int           # carril según el catálogo (1 azul, 2 amarillo, 3 rojo)
+    slot:      Optional[int] # índice dentro del carril / las esquinas; None = sin lugar
+    isCorner:  bool
+    tipo:      int
+
+
+@dataclass
+class LaneLayout:
+    lanes:     Dict[int, List[str]]     # carril → nombres en orden de tablero
+    corners:   Dict[int, List[str]]     # carril → nombres de esquina
+    index:     Dict[str, LaneSlot]      # nombre → LaneSlot (todas las casillas)
+
+    def unplaced(self) -> List[str]:
+        return [n for n, s in self.index.items() if s.slot is None]
+
+
 # =========================
 # PROPERTIES HELPERS
 # =========================
@@ -79,41 +99,83 @@ def loadProperties(propsPath: str = DEFAULT_PROPS_PATH) -> Dict[str, dict]:
                 propByName[name] = prop
         return propByName
 
-    # CSV / Excel — usa pandas si está disponible
+    # CSV / Excel — consulta el catálogo SQLite indexado (requiere pandas para importar)
     try:
-        import pandas as pd
-        if ext == ".csv":
-            df = pd.read_csv(propsPath)
-        else:
-            df = pd.read_excel(propsPath)
-        return {row["nombre"]: row.to_dict() for _, row in df.iterrows() if "nombre" in df.columns}
+        from tileCatalog import open_catalog
+        return open_catalog(propsPath).props_by_name()
     except ImportError:
         return {}
 
 
+def laneSlotCounts(boardSize: int) -> Dict[int, int]:
+    """Slots de carril (sin esquinas) de cada anillo: {1: azul, 2: amarillo, 3: rojo}."""
+    return {lane: max(boardSize - 2 * (lane - 1) - 2, 0) * 4 for lane in (1, 2, 3)}
+
+
+def buildLaneLayout(
+    catalog,
+    cornerOverrides: Optional[Dict[int, List[str]]] = None,
+    boardSize:       Optional[int] = None,
+) -> LaneLayout:
+    """
+    Deriva carriles y esquinas del catálogo (carril + tipo + `posicion`) y
+    arma el índice nombre → LaneSlot una sola vez.
+    cornerOverrides: {carril: [nombres]} que reemplaza las esquinas derivadas.
+    """
+    boardSize = boardSize or sideLengthFromPerimeter(BLUE_CANONICAL)
+    cornerOverrides = cornerOverrides or {}
+
+    lanes, corners = {}, {}
+    for lane, slots in laneSlotCounts(boardSize).items():
+        lanes[lane]   = catalog.lane_names(lane, slots)
+        corners[lane] = list(cornerOverrides.get(lane) or catalog.corner_names(lane, 4))
+
+    index: Dict[str, LaneSlot] = {}
+    for row in catalog.rows():
+        index[row["nombre"]] = LaneSlot(int(row["carril"]), None, False, int(row["tipo"]))
+    for groups, corner in ((lanes, False), (corners, True)):
+        for names in groups.values():
+            for i, name in enumerate(names):
+                entry = index.get(name)
+                if entry:
+                    index[name] = LaneSlot(entry.lane, i, corner, entry.tipo)
+
+    return LaneLayout(lanes=lanes, corners=corners, index=index)
+
+
+def laneIndexFromProps(propByName: Dict[str, dict]) -> Dict[str, LaneSlot]:
+    """Índice mínimo (sin slots) a partir de props cargadas de JSON."""
+    _LANE_NUM = {"blue": 1, "yellow": 2, "red": 3}
+    index: Dict[str, LaneSlot] = {}
+    for name, prop in propByName.items():
+        raw = str(prop.get("lane") or prop.get("carril") or prop.get("Carril") or "").strip()
+        lane = _LANE_NUM.get(raw.lower()) or (int(raw) if raw.isdigit() else 0)
+        tipo = str(prop.get("tipo") or prop.get("type") or "").strip()
+        index[name] = LaneSlot(lane, None, False, int(tipo) if tipo.isdigit() else 0)
+    return index
+
+
 def validateLaneAssignments(
     laneNames:   List[str],
     cornerNames: List[str],
     laneColor:   str,
-    propByName:  Dict[str, dict],
+    laneIndex:   Dict[str, LaneSlot],
     label:       str,
 ) -> None:
-    # Mapa número de carril → nombre de color
-    _LANE_NUM = {"1": "blue", "2": "yellow", "3": "red"}
-
-    allNames = list(laneNames) + list(cornerNames)
-    for name in allNames:
-        prop = propByName.get(name)
-        if not prop:
+    # Mapa nombre de color → número de carril
+    _LANE_NUM = {"blue": 1, "yellow": 2, "red": 3}
+    _LANE_COLOR = {v: k for k, v in _LANE_NUM.items()}
+    expected = _LANE_NUM[laneColor.lower()]
+
+    for name in list(laneNames) + list(cornerNames):
+        entry = laneIndex.get(name)
+        if not entry:
             print(f"[boardFactory] Warning: '{name}' from {label} no encontrada en el archivo de props")
             continue
-
-        raw = prop.get("lane") or prop.get("carril") or prop.get("Carril") or ""
-        # Normalizar: "2" → "yellow", "blue" → "blue"
-        lane_normalized = _LANE_NUM.get(str(raw).strip(), str(raw).strip().lower())
-        if lane_normalized and lane_normalized != laneColor.lower():
+        if entry.lane and entry.lane != expected:
             print(
-                f"[boardFactory] Warning: '{name}' tiene carril '{raw}' ({lane_normalized}) "
+                f"[boardFactory] Warning: '{name}' tiene carril '{entry.lane}' "
+                f"({_LANE_COLOR.get(entry.lane, '?')}) "
                 f"pero está listada en {label} ('{laneColor}')"
             )
 
@@ -252,13 +314,34 @@ def renderTileCell(cell: TileCell, cell_class: str = "") -> str:
     Extraemos el <style> de la casilla y reemplazamos cada selector de clase
     (.tile, .tile__band, …) con un prefijo único (.t{uid} .tile, …) para que
     no colisione con otras casillas inlineadas en el mismo documento.
+
+    Memoizado por (ruta, mtime): al rearmar el tablero en el mismo proceso
+    (generator.py --watch) solo se releen las casillas que cambiaron.
     """
+    return _renderTileCell(cell.htmlPath, _mtime(cell.htmlPath), cell.rotation,
+                           cell.lane, cell_class)
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+@functools.lru_cache(maxsize=1024)
+def _renderTileCell(htmlPath: str, _mtime: float, rotation: int, lane: str,
+                    cell_class: str) -> str:
     import re
 
+    cell = TileCell(htmlPath=htmlPath, rotation=rotation, name=None, lane=lane, isCorner=False)
+
     TILE_W = 150   # ancho portrait (px)
     TILE_H = 225   # alto  portrait (px)
 
-    uid = abs(hash(cell.htmlPath)) % 10**8
+    # crc32 del nombre de archivo, no hash(): el de str cambia en cada proceso
+    # y el tablero (y los bundles que lo incluyen) dejaría de ser reproducible
+    uid = zlib.crc32(os.path.basename(cell.htmlPath).encode("utf-8")) % 10**8
 
     # ── Leer HTML de la casilla ──────────────────────────────────────────────
     if os.path.exists(cell.htmlPath):
@@ -501,6 +584,16 @@ def buildBoardTable(
     return "\n".join(htmlParts)
 
 
+def _loadLaneIndex(propsPath: str) -> Dict[str, LaneSlot]:
+    if os.path.splitext(propsPath)[1].lower() == ".json" or not os.path.exists(propsPath):
+        return laneIndexFromProps(loadProperties(propsPath))
+    try:
+        from tileCatalog import open_catalog
+        return buildLaneLayout(open_catalog(propsPath)).index
+    except ImportError:
+        return {}
+
+
 # =========================
 # PUBLIC API
 # =========================
@@ -516,12 +609,17 @@ def generateBoardHtml(
     propsPath:       str  = DEFAULT_PROPS_PATH,
     nullTileFile:    str  = NULL_TILE_FILE,
     fit:             bool = False,
+    fontUrl:         Optional[str] = None,
+    laneIndex:       Optional[Dict[str, LaneSlot]] = None,
 ) -> str:
 
-    propByName = loadProperties(propsPath)
-    validateLaneAssignments(blueLaneNames,   blueCornerNames,   "blue",   propByName, "blue lane")
-    validateLaneAssignments(yellowLaneNames, yellowCornerNames, "yellow", propByName, "yellow lane")
-    validateLaneAssignments(redLaneNames,    redCornerNames,    "red",    propByName, "red lane")
+    # laneIndex viene de buildLaneLayout (generator); solo se arma aquí si
+    # se llama sin él, para no volver a cargar el archivo de props
+    if laneIndex is None:
+        laneIndex = _loadLaneIndex(propsPath)
+    validateLaneAssignments(blueLaneNames,   blueCornerNames,   "blue",   laneIndex, "blue lane")
+    validateLaneAssignments(yellowLaneNames, yellowCornerNames, "yellow", laneIndex, "yellow lane")
+    validateLaneAssignments(redLaneNames,    redCornerNames,    "red",    laneIndex, "red lane")
 
     boardSize  = sideLengthFromPerimeter(BLUE_CANONICAL)
     blueSize   = boardSize
@@ -607,11 +705,11 @@ def generateBoardHtml(
     # ── Fuente: @font-face por ruta relativa desde repo/tableros/ ────────────
     _font_path = os.path.join(os.path.dirname(__file__), "src", "KabelHeavy.ttf")
     if os.path.exists(_font_path):
-        font_style = """<style>
-@font-face {
+        font_style = f"""<style>
+@font-face {{
     font-family: 'KabelHeavy';
-    src: url('../../src/KabelHeavy.ttf') format('truetype');
-}
+    src: url('{fontUrl or "../../src/KabelHeavy.ttf"}') format('truetype');
+}}
 </style>
 """
     else:
@@ -672,6 +770,7 @@ def saveBoardHtml(
     propsPath:        str  = DEFAULT_PROPS_PATH,
     nullTileFile:     str  = NULL_TILE_FILE,
     fit:              bool = False,
+    laneIndex:        Optional[Dict[str, LaneSlot]] = None,
 ) -> str:
     html = generateBoardHtml(
         blueLaneNames=blueLaneNames,
@@ -684,6 +783,11 @@ def saveBoardHtml(
         propsPath=propsPath,
         nullTileFile=nullTileFile,
         fit=fit,
+        laneIndex=laneIndex,
+        fontUrl=os.path.relpath(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "KabelHeavy.ttf"),
+            os.path.dirname(os.path.abspath(outputPath)),
+        ).replace(os.sep, "/"),
     )
 
     os.makedirs(os.path.dirname(outputPath), exist_ok=True)
@@ -0,0 +1,371 @@
+"""
+buildGraph.py
+=============
+Motor de build en proceso: las etapas de una edición forman un grafo de
+dependencias (DAG) con entradas y salidas declaradas.
+
+Antes gameFactory.regenerar_todo corría generator.py, fortunaFactory.py e
+instructivoFactory.py como subprocesos en serie: tres arranques del
+intérprete, tres importaciones de pandas/bs4, nada en paralelo y los errores
+se adivinaban por el código de salida y los últimos 500 bytes de stderr.
+
+Aquí:
+  - las etapas cuyas dependencias ya terminaron corren a la vez en un pool
+    de hilos (fortunas e instructivo mientras se renderizan las casillas)
+  - una etapa se omite si la huella de sus entradas (ruta, tamaño y mtime de
+    cada archivo, más sus parámetros) no cambió desde el último build y sus
+    salidas existen; la huella se guarda en {repo}/.build_state.json
+  - cada etapa devuelve un ResultadoEtapa (estado, segundos, detalle o la
+    excepción con su traza); si falla, sus dependientes quedan bloqueados
+
+Etapas de una edición:
+
+  casillas ─┬─ tarjetas ───┐
+            └─ tablero ────┤
+  fortunas ────────────────┼── ensamblado
+  instructivo ─────────────┘
+
+Las tarjetas esperan a las casillas porque ambas usan la imagen de la
+casilla: así la busca una sola etapa y la otra la encuentra en caché.
+
+Uso (ver gameFactory.py / editionBuilder.py):
+    etapas = etapas_edicion(props_path=..., repo_dir=..., juego_dir=...)
+    resultados = construir(etapas, estado_path=os.path.join(repo_dir, ".build_state.json"))
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import traceback
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# =============================================================================
+# PATHS Y CONSTANTES
+# =============================================================================
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+ESTADOS  = ("hecha", "omitida", "fallida", "bloqueada")
+_IGNORAR = (".sqlite", ".sqlite-wal", ".sqlite-shm", ".tmp", ".part", ".pyc")
+
+
+# =============================================================================
+# MODELO
+# =============================================================================
+
+@dataclass
+class Etapa:
+    nombre:    str
+    funcion:   callable                  # () -> dict | None (detalle para el reporte)
+    entradas:  list[str] = field(default_factory=list)   # archivos o carpetas
+    salidas:   list[str] = field(default_factory=list)
+    depende:   list[str] = field(default_factory=list)   # nombres de etapas
+    params:    dict      = field(default_factory=dict)   # entran en la huella
+
+
+@dataclass
+class ResultadoEtapa:
+    nombre:   str
+    estado:   str                        # hecha | omitida | fallida | bloqueada
+    segundos: float = 0.0
+    detalle:  dict  = field(default_factory=dict)
+    error:    str   = ""
+    traza:    str   = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.estado in ("hecha", "omitida")
+
+
+# =============================================================================
+# HUELLAS
+# =============================================================================
+
+def _archivos(ruta: str):
+    if os.path.isfile(ruta):
+        yield ruta
+        return
+    for raiz, dirs, files in os.walk(ruta):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for fn in sorted(files):
+            if not fn.endswith(_IGNORAR):
+                yield os.path.join(raiz, fn)
+
+
+def huella(entradas: list[str], params: dict = None) -> str:
+    """sha1 de (ruta, tamaño, mtime) de cada archivo de `entradas` y de `params`."""
+    h = hashlib.sha1(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    for ruta in entradas:
+        if not os.path.exists(ruta):
+            h.update(f"-{ruta}\n".encode())
+            continue
+        for path in _archivos(ruta):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            h.update(f"{path}\t{st.st_size}\t{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def _leer_estado(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _escribir_estado(path: str, estado: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+# =============================================================================
+# MOTOR
+# =============================================================================
+
+def _orden(etapas: list[Etapa]) -> None:
+    """Valida nombres y dependencias; ValueError si hay ciclos o faltantes."""
+    nombres = {e.nombre for e in etapas}
+    if len(nombres) != len(etapas):
+        raise ValueError("Etapas con nombre repetido")
+    for e in etapas:
+        for d in e.depende:
+            if d not in nombres:
+                raise ValueError(f"La etapa '{e.nombre}' depende de '{d}', que no existe")
+    pendientes = {e.nombre: set(e.depende) for e in etapas}
+    while pendientes:
+        listas = [n for n, deps in pendientes.items() if not deps]
+        if not listas:
+            raise ValueError(f"Ciclo entre etapas: {', '.join(sorted(pendientes))}")
+        for n in listas:
+            del pendientes[n]
+        for deps in pendientes.values():
+            deps.difference_update(listas)
+
+
+def construir(
+    etapas:      list[Etapa],
+    jobs:        int  = 4,
+    force:       bool = False,
+    estado_path: str  = None,
+    label:       str  = "build",
+) -> list[ResultadoEtapa]:
+    """
+    Ejecuta el grafo: cada etapa corre cuando sus dependencias terminaron
+    bien, hasta `jobs` a la vez. Con `estado_path` las etapas sin cambios en
+    sus entradas se omiten (salvo `force`). Devuelve los resultados en el
+    orden de `etapas`.
+    """
+    _orden(etapas)
+    estado     = _leer_estado(estado_path) if estado_path else {}
+    lock       = threading.Lock()
+    resultados: dict[str, ResultadoEtapa] = {}
+
+    def _correr(e: Etapa) -> ResultadoEtapa:
+        h = huella(e.entradas, e.params)
+        if (not force and estado_path and estado.get(e.nombre) == h
+                and all(os.path.exists(s) for s in e.salidas)):
+            return ResultadoEtapa(e.nombre, "omitida")
+        t0 = time.perf_counter()
+        try:
+            detalle = e.funcion() or {}
+        except Exception as ex:
+            return ResultadoEtapa(e.nombre, "fallida", time.perf_counter() - t0,
+                                  error=f"{type(ex).__name__}: {ex}",
+                                  traza=traceback.format_exc())
+        if estado_path:
+            with lock:
+                estado[e.nombre] = h     # huella previa a la corrida: un cambio durante ella re-ejecuta
+                _escribir_estado(estado_path, estado)
+        return ResultadoEtapa(e.nombre, "hecha", time.perf_counter() - t0, detalle=detalle)
+
+    restantes = list(etapas)
+    en_curso  = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        while restantes or en_curso:
+            for e in list(restantes):
+                deps = [resultados.get(d) for d in e.depende]
+                if any(r is not None and not r.ok for r in deps):
+                    fallo = next(d for d, r in zip(e.depende, deps) if r is not None and not r.ok)
+                    resultados[e.nombre] = ResultadoEtapa(e.nombre, "bloqueada",
+                                                          error=f"falló '{fallo}'")
+                    restantes.remove(e)
+                elif all(r is not None for r in deps):
+                    print(f"[{label}] ▶ {e.nombre}")
+                    en_curso[executor.submit(_correr, e)] = e
+                    restantes.remove(e)
+            if not en_curso:
+                continue
+            hechos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for fut in hechos:
+                e = en_curso.pop(fut)
+                r = fut.result()
+                resultados[e.nombre] = r
+                if r.estado == "fallida":
+                    print(f"[{label}] ❌ {e.nombre}: {r.error}")
+
+    return [resultados[e.nombre] for e in etapas]
+
+
+def reportar(resultados: list[ResultadoEtapa], label: str = "build") -> bool:
+    """Imprime una línea por etapa (y la traza de las fallidas). True si todo salió bien."""
+    iconos = {"hecha": "✓", "omitida": "·", "fallida": "❌", "bloqueada": "⊘"}
+    for r in resultados:
+        detalle = " · ".join(f"{k} {v}" for k, v in r.detalle.items())
+        extra   = r.error or detalle
+        print(f"[{label}] {iconos[r.estado]} {r.nombre:<12} {r.estado:<9} "
+              f"{r.segundos:6.1f}s" + (f"  {extra}" if extra else ""))
+    for r in resultados:
+        if r.traza:
+            print(f"[{label}] Traza de '{r.nombre}':\n{r.traza}")
+    return all(r.ok for r in resultados)
+
+
+# =============================================================================
+# ETAPAS DE UNA EDICIÓN
+# =============================================================================
+
+def _src(*partes: str) -> str:
+    return os.path.join(_HERE, *partes)
+
+
+def etapas_edicion(
+    props_path:    str  = None,
+    fortunas_path: str  = None,
+    repo_dir:      str  = None,
+    juego_dir:     str  = None,
+    config_path:   str  = None,
+    palette_path:  str  = None,
+    corners:       dict = None,
+    force:         bool = False,
+    workers:       int  = 1,
+    rescrape:      bool = False,
+    docs:          bool = True,
+    ensamblar:     bool = True,
+    enlazar:       bool = True,
+    bundle:        str  = None,
+    directorio:    bool = True,
+    libro:         bool = False,
+    titulo:        str  = None,
+    label:         str  = "build",
+) -> list[Etapa]:
+    """
+    Grafo de una edición. None = rutas de la edición ZMG en la raíz
+    (props/zmg.csv, props/fortunas.csv, repo/, juego_completo/).
+    ensamblar: incluye la etapa final que arma juego_completo/.
+    enlazar / bundle / directorio / libro / titulo: opciones de gameFactory.ensamblar.
+    """
+    from cardFactory import _load_config, _get_colors, _CONFIG_PATH, _PALETTE_PATH, _FONT_PATH, _IMG_DIR
+
+    props_path    = props_path    or _src("props", "zmg.csv")
+    fortunas_path = fortunas_path or _src("props", "fortunas.csv")
+    repo_dir      = repo_dir      or _src("repo")
+    juego_dir     = juego_dir     or _src("juego_completo")
+    config_path   = config_path   or _CONFIG_PATH
+    palette_path  = palette_path  or _PALETTE_PATH
+
+    casillas_dir = os.path.join(repo_dir, "casillas")
+    tarjetas_dir = os.path.join(repo_dir, "tarjetas")
+    fortunas_dir = os.path.join(repo_dir, "fortunas")
+    inst_dir     = os.path.join(repo_dir, "instructivo")
+    tablero_path = os.path.join(repo_dir, "tableros", "tablero_metropoly.html")
+
+    # Catálogo validado y carriles: se calculan una vez, en la primera etapa que los pida
+    preparada = {}
+    prep_lock = threading.Lock()
+
+    def _edicion():
+        from generator import preparar_edicion
+        with prep_lock:
+            if "ed" not in preparada:
+                ed = preparar_edicion(props_path, corners, label)
+                if ed is None:
+                    raise ValueError(f"Catálogo inválido: {os.path.relpath(props_path, _HERE)}")
+                cfg = _load_config(config_path)
+                if rescrape:
+                    cfg = {**cfg, "scraper": {**cfg.get("scraper", {}), "rescrape": True}}
+                preparada.update(ed=ed, cfg=cfg, colors=_get_colors(palette_path))
+        return preparada["ed"], preparada["cfg"], preparada["colors"]
+
+    def casillas():
+        from cardFactory import generar_casilla
+        from generator import renderizar_propiedades
+        ed, cfg, colors = _edicion()
+        errores = renderizar_propiedades(
+            ed.propiedades,
+            lambda p: generar_casilla(p, force=force, cfg=cfg, colors=colors, out_dir=casillas_dir),
+            workers, label,
+        )
+        if errores:
+            raise RuntimeError(f"{errores} de {len(ed.propiedades)} casillas fallaron")
+        return {"casillas": len(ed.propiedades)}
+
+    def tarjetas():
+        from cardFactory import generar_tarjeta
+        from generator import renderizar_propiedades
+        ed, cfg, colors = _edicion()
+        errores = renderizar_propiedades(
+            ed.propiedades,
+            lambda p: generar_tarjeta(p, force=force, cfg=cfg, colors=colors, out_dir=tarjetas_dir),
+            workers, label,
+        )
+        if errores:
+            raise RuntimeError(f"{errores} de {len(ed.propiedades)} tarjetas fallaron")
+        return {"tarjetas": len(ed.propiedades)}
+
+    def tablero():
+        from generator import guardar_tablero
+        ed, _, _ = _edicion()
+        guardar_tablero(ed.layout, props_path, tablero_path, casillas_dir, label)
+
+    def fortunas():
+        import fortunaFactory
+        fortunaFactory.generar_todas(fortunas_path, force=force, out_dir=fortunas_dir,
+                                     colors=fortunaFactory._get_colors(palette_path))
+
+    def instructivo():
+        import instructivoFactory
+        instructivoFactory.generar(inst_dir)
+
+    def ensamblado():
+        import gameFactory
+        gameFactory.ensamblar(repo_dir=repo_dir, out_dir=juego_dir,
+                              props_path=props_path, docs=docs, enlazar=enlazar,
+                              bundle=bundle, directorio=directorio, libro=libro,
+                              fortunas_path=fortunas_path,
+                              titulo=titulo or gameFactory.TITULO)
+
+    comunes = [props_path, config_path, palette_path, _FONT_PATH, _IMG_DIR,
+               _src("cardFactory.py"), _src("generator.py")]
+    params  = {"force": force, "corners": corners, "rescrape": rescrape}
+    etapas = [
+        Etapa("casillas", casillas, comunes, [casillas_dir], params=params),
+        Etapa("tarjetas", tarjetas, comunes, [tarjetas_dir], ["casillas"], params),
+        Etapa("tablero",  tablero,
+              [props_path, config_path, palette_path, casillas_dir, _src("boardFactory.py")],
+              [tablero_path], ["casillas"], params),
+        Etapa("fortunas", fortunas,
+              [fortunas_path, palette_path, _src("src", "gw"), _src("fortunaFactory.py")],
+              [fortunas_dir], params={"force": force}),
+        Etapa("instructivo", instructivo, [_src("instructivoFactory.py")], [inst_dir]),
+    ]
+    if ensamblar:
+        etapas.append(Etapa(
+            "ensamblado", ensamblado,
+            [os.path.join(repo_dir, d) for d in ("tableros", "tarjetas", "fortunas", "instructivo")]
+            + [props_path, _src("src", "feria"), _src("gameFactory.py")]   # props: tipo_counts del índice
+            + ([fortunas_path, _src("printBook.py")] if libro else []),
+            ([juego_dir] if directorio else []) + ([str(bundle)] if bundle else []),
+            ["tarjetas", "tablero", "fortunas", "instructivo"],
+            {"docs": docs, "enlazar": enlazar, "bundle": str(bundle or ""),
+             "directorio": directorio, "libro": libro, "titulo": titulo or ""},
+        ))
+    return etapas
@@ -0,0 +1,364 @@
+"""
+bundleWriter.py
+===============
+Escribe el juego completo como un solo archivo (zip, tar o tar.gz) directo
+desde los assets generados, sin pasar por una copia en disco.
+
+Antes el paquete para la imprenta se armaba comprimiendo juego_completo/ a
+mano después del ensamblado: todo se escribía dos veces. Aquí
+gameFactory.ensamblar pasa la misma lista de archivos que usa para
+sincronizar juego_completo/ y cada uno se lee de su origen (repo/, src/feria)
+y se agrega al archivo en el momento:
+
+  - PDFs e imágenes (ya comprimidos) van sin recomprimir (zip: STORED)
+  - el texto (HTML, JSON) se comprime en paralelo en una ventana acotada de
+    hilos (zlib libera el GIL) y se escribe en orden
+  - tar.gz: el stream tar se comprime por bloques en paralelo como miembros
+    gzip concatenados (igual que pigz; cualquier gunzip los lee)
+  - autocontenido: lo que los HTML referencian fuera de juego_completo/
+    (../../src/KabelHeavy.ttf, los sprites de src/gw/) se agrega bajo
+    recursos/ y las URLs se reescriben para apuntar ahí
+
+Reproducible: orden alfabético de rutas, fecha fija (SOURCE_DATE_EPOCH o
+1980-01-01), permisos 0644, sin usuario ni grupo. Un build sin cambios
+produce un archivo idéntico byte a byte, que CDNs y cachés pueden reusar.
+
+Uso:
+    python gameFactory.py --bundle juego_metropoly.zip
+    python gameFactory.py --skip-gen --bundle juego_metropoly.tar.gz --sin-directorio
+    python bundleWriter.py --verificar juego_metropoly.tar.gz   # dos builds, mismos bytes
+"""
+
+import io
+import os
+import re
+import zlib
+import gzip
+import time
+import struct
+import hashlib
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+FORMATOS   = ("zip", "tar", "tar.gz")
+_EPOCH_MIN = 315532800          # 1980-01-01 UTC: lo mínimo que admite la fecha DOS del zip
+_GUARDADOS = (".pdf", ".jpg", ".jpeg", ".png", ".webp", ".gif", ".zip", ".gz",
+              ".woff", ".woff2")
+_NIVEL     = 6
+_BLOQUE    = 1 << 20            # tar.gz: bytes por miembro gzip
+
+
+def formato_de(path) -> str:
+    nombre = str(path).lower()
+    if nombre.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    if nombre.endswith(".tar"):
+        return "tar"
+    if nombre.endswith(".zip"):
+        return "zip"
+    raise ValueError(f"Formato de bundle desconocido: {path} ({', '.join(FORMATOS)})")
+
+
+def _epoch(epoch: int = None) -> int:
+    if epoch is None:
+        epoch = int(os.environ.get("SOURCE_DATE_EPOCH", _EPOCH_MIN))
+    return max(epoch, _EPOCH_MIN)
+
+
+def _leer(origen) -> bytes:
+    """origen: Path de un archivo, o el contenido (str / bytes) ya generado."""
+    if isinstance(origen, bytes):
+        return origen
+    if isinstance(origen, Path):
+        return origen.read_bytes()
+    return origen.encode("utf-8")
+
+
+def _en_orden(items, fn, workers: int):
+    """fn(item) en paralelo con ventana acotada; resultados en el orden de `items`."""
+    ventana = max(1, workers) * 2
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pendientes = deque()
+        for item in items:
+            pendientes.append(executor.submit(fn, item))
+            if len(pendientes) >= ventana:
+                yield pendientes.popleft().result()
+        while pendientes:
+            yield pendientes.popleft().result()
+
+
+# =============================================================================
+# ZIP
+# =============================================================================
+
+def _preparar_zip(item):
+    """(ruta, datos comprimidos, método, crc, tamaño) de una entrada."""
+    ruta, origen = item
+    datos = _leer(origen)
+    crc   = zlib.crc32(datos)
+    if not ruta.lower().endswith(_GUARDADOS):
+        c = zlib.compressobj(_NIVEL, zlib.DEFLATED, -15)
+        comp = c.compress(datos) + c.flush()
+        if len(comp) < len(datos):
+            return ruta, comp, 8, crc, len(datos)
+    return ruta, datos, 0, crc, len(datos)
+
+
+def _escribir_zip(f, entradas, workers: int, epoch: int) -> dict:
+    t = time.gmtime(epoch)
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+    central, offset = [], 0
+    stats = {"archivos": 0, "comprimidos": 0, "guardados": 0, "bytes": 0}
+    for ruta, datos, metodo, crc, tam in _en_orden(entradas, _preparar_zip, workers):
+        nombre = ruta.encode("utf-8")
+        if offset > 0xFFFFFFFF or tam > 0xFFFFFFFF:
+            raise ValueError("El bundle zip excede 4 GB; usa --bundle *.tar.gz")
+        cabecera = struct.pack(
+            "<IHHHHHIIIHH", 0x04034B50, 20, 0x0800, metodo, dos_time, dos_date,
+            crc, len(datos), tam, len(nombre), 0,
+        )
+        f.write(cabecera + nombre)
+        f.write(datos)
+        central.append(struct.pack(
+            "<IHHHHHHIIIHHHHHII", 0x02014B50, (3 << 8) | 20, 20, 0x0800, metodo,
+            dos_time, dos_date, crc, len(datos), tam, len(nombre), 0, 0, 0, 0,
+            (0o100644 << 16), offset,
+        ) + nombre)
+        offset += len(cabecera) + len(nombre) + len(datos)
+        stats["archivos"] += 1
+        stats["comprimidos" if metodo else "guardados"] += 1
+        stats["bytes"] += tam
+
+    if len(central) > 0xFFFF:
+        raise ValueError("El bundle zip excede 65535 archivos; usa --bundle *.tar.gz")
+    cd = b"".join(central)
+    f.write(cd)
+    f.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, len(central), len(central),
+                        len(cd), offset, 0))
+    return stats
+
+
+# =============================================================================
+# TAR / TAR.GZ
+# =============================================================================
+
+class _GzipParalelo(io.RawIOBase):
+    """Archivo de solo escritura: comprime bloques de _BLOQUE en paralelo como miembros gzip."""
+
+    def __init__(self, f, workers: int):
+        self._f        = f
+        self._buf      = bytearray()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self._cola     = deque()
+        self._ventana  = max(1, workers) * 2
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buf += data
+        while len(self._buf) >= _BLOQUE:
+            self._enviar(bytes(self._buf[:_BLOQUE]))
+            del self._buf[:_BLOQUE]
+        return len(data)
+
+    def _enviar(self, bloque: bytes) -> None:
+        self._cola.append(self._executor.submit(gzip.compress, bloque, _NIVEL, mtime=0))
+        while len(self._cola) >= self._ventana:
+            self._f.write(self._cola.popleft().result())
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self._buf:
+            self._enviar(bytes(self._buf))
+            self._buf.clear()
+        while self._cola:
+            self._f.write(self._cola.popleft().result())
+        self._executor.shutdown()
+        super().close()
+
+
+def _escribir_tar(f, entradas, workers: int, epoch: int, comprimir: bool) -> dict:
+    destino = _GzipParalelo(f, workers) if comprimir else f
+    stats   = {"archivos": 0, "comprimidos": 0, "guardados": 0, "bytes": 0}
+    leidos  = _en_orden(entradas, lambda item: (item[0], _leer(item[1])), workers)
+    with tarfile.open(fileobj=destino, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        for ruta, datos in leidos:
+            info = tarfile.TarInfo(ruta)
+            info.size, info.mtime, info.mode = len(datos), epoch, 0o644
+            info.uid = info.gid = 0
+            info.uname = info.gname = ""
+            tar.addfile(info, io.BytesIO(datos))
+            stats["archivos"] += 1
+            stats["comprimidos" if comprimir else "guardados"] += 1
+            stats["bytes"] += len(datos)
+    if comprimir:
+        destino.close()
+    return stats
+
+
+# =============================================================================
+# RECURSOS EXTERNOS
+# =============================================================================
+
+_RE_REF = re.compile(r"""(url\(\s*['"]?|\b(?:src|href)=["'])([^'"()\s]+)""", re.I)
+
+
+def autocontenido(entradas: dict, raiz: Path, carpeta: str = "recursos") -> tuple[dict, int]:
+    """
+    Copia de `entradas` en la que cada URL relativa de un HTML/CSS que sale de
+    `raiz` (la carpeta del juego: las URLs se resuelven desde el lugar del
+    documento en ella) apunta a una copia del archivo dentro de `carpeta`/.
+    Devuelve (entradas, cuántos recursos se agregaron). Las URLs a archivos
+    que no existen se dejan igual.
+    """
+    raiz     = Path(os.path.abspath(raiz))
+    out      = dict(entradas)
+    recursos = {}     # ruta absoluta → ruta relativa dentro del bundle
+
+    def _destino(target: str) -> Path | None:
+        if target not in recursos:
+            rel = os.path.relpath(target, raiz.parent)
+            if rel.startswith(".."):
+                rel = os.path.basename(target)
+            recursos[target] = Path(carpeta) / Path(rel).as_posix()
+        return recursos[target]
+
+    for ruta, origen in entradas.items():
+        ruta = Path(ruta)
+        if ruta.suffix.lower() not in (".html", ".htm", ".css") or isinstance(origen, bytes):
+            continue
+        texto = origen.read_text(encoding="utf-8") if isinstance(origen, Path) else origen
+        base  = raiz / ruta.parent
+
+        def _sub(m):
+            url = m.group(2)
+            if url.startswith(("data:", "#", "/")) or re.match(r"^[a-z][a-z0-9+.-]*:", url, re.I):
+                return m.group(0)
+            limpio = url.split("#")[0].split("?")[0]
+            target = os.path.normpath(os.path.join(base, limpio))
+            if target.startswith(str(raiz) + os.sep) or not os.path.isfile(target):
+                return m.group(0)
+            nuevo = os.path.relpath(raiz / _destino(target), base).replace(os.sep, "/")
+            return m.group(1) + nuevo + url[len(limpio):]
+
+        nuevo = _RE_REF.sub(_sub, texto)
+        if nuevo != texto:
+            out[ruta] = nuevo
+    for target, rel in recursos.items():
+        out[rel] = Path(target)
+    return out, len(recursos)
+
+
+# =============================================================================
+# API
+# =============================================================================
+
+def escribir_bundle(entradas: dict, destino, prefijo: str = "juego_completo",
+                    formato: str = None, workers: int = 4, epoch: int = None) -> dict:
+    """
+    Escribe `entradas` ({ruta relativa: Path de origen | contenido str/bytes})
+    en el archivo `destino`, bajo `prefijo/`. El formato sale de la extensión
+    salvo que se indique. Escribe a un .tmp y lo renombra al terminar.
+    Devuelve {'archivos', 'comprimidos', 'guardados', 'bytes', 'tamaño'}.
+    """
+    destino = Path(destino)
+    formato = formato or formato_de(destino)
+    epoch   = _epoch(epoch)
+    items   = sorted(
+        ((f"{prefijo}/" if prefijo else "") + Path(ruta).as_posix(), origen)
+        for ruta, origen in entradas.items()
+    )
+
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destino.with_name(destino.name + ".tmp")
+    with open(tmp, "wb") as f:
+        if formato == "zip":
+            stats = _escribir_zip(f, items, workers, epoch)
+        elif formato in ("tar", "tar.gz"):
+            stats = _escribir_tar(f, items, workers, epoch, comprimir=formato == "tar.gz")
+        else:
+            raise ValueError(f"Formato de bundle desconocido: {formato} ({', '.join(FORMATOS)})")
+    os.replace(tmp, destino)
+    stats["tamaño"] = destino.stat().st_size
+    return stats
+
+
+# =============================================================================
+# VERIFICACIÓN
+# =============================================================================
+
+def _miembros(path) -> dict:
+    """{ruta: sha256 del contenido} de un bundle."""
+    path = Path(path)
+    if formato_de(path) == "zip":
+        with zipfile.ZipFile(path) as z:
+            return {n: hashlib.sha256(z.read(n)).hexdigest() for n in z.namelist()}
+    with tarfile.open(path) as t:
+        return {m.name: hashlib.sha256(t.extractfile(m).read()).hexdigest()
+                for m in t.getmembers() if m.isfile()}
+
+
+def verificar_reproducible(destino, comandos: list = None, veces: int = 2) -> bool:
+    """
+    Corre el build `veces` veces, cada una en un proceso nuevo con otra
+    semilla de hash (PYTHONHASHSEED), y compara los bytes del bundle.
+    comandos: listas de argv a correr en orden; por omisión regenera el
+    tablero (generator.py --solo-cache) y escribe el bundle sin tocar
+    juego_completo/. Si difieren, imprime los archivos que cambiaron.
+    """
+    import sys
+    import subprocess
+
+    destino = Path(destino).resolve()
+    here    = Path(__file__).parent
+    comandos = comandos or [
+        [sys.executable, "generator.py", "--solo-cache"],
+        [sys.executable, "gameFactory.py", "--skip-gen", "--bundle", str(destino), "--sin-directorio"],
+    ]
+    copias = []
+    for i in range(veces):
+        env = {**os.environ, "PYTHONHASHSEED": str(i + 1)}
+        for argv in comandos:
+            subprocess.run(argv, cwd=here, env=env, check=True, stdout=subprocess.DEVNULL)
+        copia = destino.with_name(f"repro{i + 1}_{destino.name}")
+        os.replace(destino, copia)
+        copias.append(copia)
+
+    huellas = [hashlib.sha256(c.read_bytes()).hexdigest() for c in copias]
+    ok = len(set(huellas)) == 1
+    if ok:
+        print(f"[bundleWriter] ✅ {veces} builds idénticos: sha256 {huellas[0][:16]}…")
+    else:
+        base = _miembros(copias[0])
+        for copia in copias[1:]:
+            otra = _miembros(copia)
+            for ruta in sorted(base.keys() | otra.keys()):
+                if base.get(ruta) != otra.get(ruta):
+                    print(f"[bundleWriter] ≠ {ruta}")
+        print(f"[bundleWriter] ❌ Los builds difieren ({len(set(huellas))} versiones)")
+    os.replace(copias[0], destino)
+    for c in copias[1:]:
+        c.unlink()
+    return ok
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Bundle reproducible del juego")
+    parser.add_argument("--verificar", type=Path, required=True, metavar="BUNDLE",
+                        help="Construye el bundle dos veces y compara los bytes")
+    parser.add_argument("--veces", type=int, default=2)
+    args = parser.parse_args()
+    if not verificar_reproducible(args.verificar, veces=args.veces):
+        raise SystemExit(1)
@@ -17,22 +17,14 @@ import os
 import re
 import json
 import math
-import time
 import random
 import shutil
 import base64
-import io
 import csv
-import urllib.request
-from urllib.parse import urlparse
+import functools
 
-import requests
-from PIL import Image
 from bs4 import BeautifulSoup
 
-# ── Selenium (se importa en tiempo de ejecución dentro de _scrape_images) ───
-_SELENIUM_OK = None   # None = no verificado aún
-
 
 # =============================================================================
 # PATHS Y CONFIG
@@ -57,13 +49,33 @@ os.makedirs(_TARJETAS_DIR, exist_ok=True)
 # HELPERS — CONFIG / PALETTE / FONT
 # =============================================================================
 
-def _load_config() -> dict:
-    with open(_CONFIG_PATH, "r", encoding="utf-8") as f:
+# Las cachés se llavean por (ruta, mtime): varias ediciones en el mismo proceso
+# comparten config/paleta/fuente ya parseadas, y un archivo editado se relee.
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def _load_config(path: str = _CONFIG_PATH) -> dict:
+    return _load_config_cached(path, _mtime(path))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config_cached(path: str, _mtime: float) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def _get_colors() -> dict:
-    with open(_PALETTE_PATH, "r", encoding="utf-8") as f:
+def _get_colors(path: str = _PALETTE_PATH) -> dict:
+    return _get_colors_cached(path, _mtime(path))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_colors_cached(path: str, _mtime: float) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
         soup = BeautifulSoup(f, "html.parser")
     style = soup.find("style").string
     keys = [
@@ -78,7 +90,12 @@ def _get_colors() -> dict:
 def _font_b64() -> str:
     if not os.path.exists(_FONT_PATH):
         return ""
-    with open(_FONT_PATH, "rb") as f:
+    return _font_b64_cached(_FONT_PATH, _mtime(_FONT_PATH))
+
+
+@functools.lru_cache(maxsize=4)
+def _font_b64_cached(path: str, _mtime: float) -> str:
+    with open(path, "rb") as f:
         return base64.b64encode(f.read()).decode()
 
 
@@ -88,241 +105,51 @@ def _safe_name(nombre: str) -> str:
 
 
 # =============================================================================
-# SCRAPER DE IMÁGENES  (integrado desde GoogleImageScraper)
+# IMÁGENES  (caché en src/img/, scraper en imageScraper.py)
 # =============================================================================
 
-def _webdriver_exe() -> str:
-    import sys
-    return "chromedriver" if sys.platform != "win32" else "chromedriver.exe"
-
-
-def _scrape_images(nombre: str, n: int = 1, headless: bool = True,
-                   min_res=(80, 80), max_res=(3840, 2160), max_missed: int = 5) -> str | None:
+def _cached_image(nombre: str) -> str | None:
     """
-    Scrapea Google Imágenes buscando `nombre`, guarda la primera imagen válida
-    en src/img/{safe_nombre}/ y devuelve la ruta absoluta.
-    Devuelve None si falla o si Selenium no está instalado.
+    Primera imagen en src/img/{safe_nombre}/; si no hay, la canónica de la que
+    la casilla es alias (duplicadas colapsadas por imageIndex.py); si no, None.
     """
-    # Import en tiempo de ejecución para detectar instalaciones posteriores
-    try:
-        from selenium import webdriver as _webdriver
-        from selenium.webdriver.chrome.options import Options as _Options
-        from selenium.webdriver.common.by import By as _By
-        from selenium.webdriver.support.ui import WebDriverWait as _WebDriverWait
-        from selenium.webdriver.support import expected_conditions as _EC
-        from selenium.webdriver.common.keys import Keys as _Keys
-    except ImportError:
-        print(
-            "[cardFactory] Selenium no instalado. Ejecuta:\n"
-            "    pip install selenium\n"
-            "y asegúrate de tener chromedriver en la carpeta webdriver/"
-        )
-        return None
-
-    safe = _safe_name(nombre)
-    save_dir = os.path.join(_IMG_DIR, safe)
-    os.makedirs(save_dir, exist_ok=True)
-
-    url = f"https://www.google.com/search?q={urllib.parse.quote(nombre)}&tbm=isch&hl=es"
-    options = _Options()
-    if headless:
-        options.add_argument("--headless=new")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--window-size=1400,1050")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/148.0.0.0 Safari/537.36"
-    )
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-
-    driver_path = os.path.join(_WEBDRIVER_DIR, _webdriver_exe())
-
-    # Intentar usar webdriver-manager para obtener el driver correcto
-    # automáticamente según la versión de Chrome instalada
-    try:
-        from webdriver_manager.chrome import ChromeDriverManager
-        from selenium.webdriver.chrome.service import Service as ChromeService
-        service = ChromeService(ChromeDriverManager().install())
-    except ImportError:
-        # webdriver-manager no instalado, usar driver manual
-        if not os.path.isfile(driver_path):
-            print(
-                "[cardFactory] chromedriver no encontrado. Instala webdriver-manager:\n"
-                "    pip install webdriver-manager\n"
-                "o coloca chromedriver.exe manualmente en la carpeta webdriver/"
-            )
-            return None
-        service = _webdriver.chrome.service.Service(driver_path)
-    except Exception as e:
-        print(f"[cardFactory] Error configurando chromedriver: {e}")
-        return None
-
-    try:
-        driver = _webdriver.Chrome(service=service, options=options)
-    except Exception as e:
-        print(f"[cardFactory] No se pudo iniciar Chrome: {e}")
-        return None
-    driver.set_window_size(1400, 1050)
-    driver.get(url)
-    time.sleep(3)
-
-    # Intentar aceptar cookies si aparece el diálogo
-    try:
-        for btn_text in ["Aceptar todo", "Accept all", "Aceptar"]:
-            btns = driver.find_elements(_By.XPATH, f"//button[contains(., '{btn_text}')]")
-            if btns:
-                btns[0].click()
-                time.sleep(1)
-                break
-    except Exception:
-        pass
-
-    image_urls = []
-
-    # Estrategia 1: extraer URLs de imágenes directamente del HTML/JS de la página
-    # Google incrusta las URLs en atributos data-src y src de las miniaturas
-    def extract_urls_from_page() -> list:
-        found = []
-        # Buscar imágenes con src de http (no data:image)
-        imgs = driver.find_elements(_By.CSS_SELECTOR, "img[src^='http']")
-        for img in imgs:
-            src = img.get_attribute("src") or ""
-            if src.startswith("http") and "encrypted" not in src and "gstatic" not in src:
-                found.append(src)
-        # También buscar en data-src
-        imgs2 = driver.find_elements(_By.CSS_SELECTOR, "img[data-src^='http']")
-        for img in imgs2:
-            src = img.get_attribute("data-src") or ""
-            if src.startswith("http") and "encrypted" not in src:
-                found.append(src)
-        return list(set(found))
-
-    # Estrategia 2: click en miniaturas y extraer imagen de alta resolución
-    def try_click_thumbnails() -> list:
-        found = []
-        # Selectores conocidos de miniaturas en Google Images (varios por compatibilidad)
-        thumb_selectors = [
-            'div[jsname="dTDiAc"]',
-            'div[data-id]',
-            'g-img > img',
-            '.rg_i',
-            'img.YQ4gaf',
-            'img.t0fcAb',
-        ]
-        thumbs = []
-        for sel in thumb_selectors:
-            thumbs = driver.find_elements(_By.CSS_SELECTOR, sel)
-            if thumbs:
-                break
-
-        for thumb in thumbs[:5]:
-            try:
-                driver.execute_script("arguments[0].click();", thumb)
-                time.sleep(1.5)
-                # Buscar imagen de alta res en el panel lateral
-                for hi_sel in ['img.sFlh5c', 'img.r48jcc', 'img.iPVvYb', 'img.n3VNCb']:
-                    hi_imgs = driver.find_elements(_By.CSS_SELECTOR, hi_sel)
-                    for hi in hi_imgs:
-                        src = hi.get_attribute("src") or ""
-                        if src.startswith("http") and "encrypted" not in src and len(src) > 50:
-                            found.append(src)
-                            break
-                if found:
-                    break
-            except Exception:
-                continue
-        return found
-
-    # Estrategia 3: extraer URLs del page source (Google embebe JSON con URLs)
-    def extract_from_source() -> list:
-        found = []
-        try:
-            src = driver.page_source
-            # Google embebe URLs de imagen en formato ["https://...","width","height"]
-            matches = re.findall(r'"(https://[^"]+\.(?:jpg|jpeg|png|webp))"', src)
-            for m in matches:
-                if "encrypted" not in m and "gstatic" not in m:
-                    found.append(m)
-        except Exception:
-            pass
-        return list(set(found))
-
-    # Primero intentar clicks para imagen de mayor calidad
-    image_urls = try_click_thumbnails()
-
-    # Si no funcionó, extracción directa de miniaturas
-    if not image_urls:
-        image_urls = extract_urls_from_page()
-
-    # Último recurso: parsear el page source
-    if not image_urls:
-        image_urls = extract_from_source()
-        print(f"[cardFactory] Estrategia page source: {len(image_urls)} URLs")
-
-    driver.quit()
-    image_urls = list(set(image_urls))
-    print(f"[cardFactory] '{nombre}': {len(image_urls)} URLs encontradas")
-    for i, u in enumerate(image_urls[:3]):
-        print(f"[cardFactory]   [{i}] {u[:80]}")
-
-    # Guardar la primera imagen válida
-    for idx, img_url in enumerate(image_urls):
-        try:
-            resp = requests.get(img_url, timeout=5)
-            if resp.status_code != 200:
-                print(f"[cardFactory]   URL {idx}: HTTP {resp.status_code}")
-                continue
-            with Image.open(io.BytesIO(resp.content)) as pil:
-                w, h = pil.size
-                if w < min_res[0] or h < min_res[1] or w > max_res[0] or h > max_res[1]:
-                    print(f"[cardFactory]   URL {idx}: resolución {w}x{h} fuera de rango")
-                    continue
-                o = urlparse(img_url)
-                stem = os.path.splitext(os.path.basename(o.path))[0] or f"img_{idx}"
-                filename = f"{stem}.jpg"
-                out_path = os.path.join(save_dir, filename)
-                pil.convert("RGB").save(out_path, "JPEG")
-                print(f"[cardFactory] Imagen guardada: {out_path}")
-                return out_path
-        except Exception as e:
-            print(f"[cardFactory]   URL {idx}: error — {e}")
-
-    print(f"[cardFactory] '{nombre}': sin imagen válida")
-    return None
+    folder = os.path.join(_IMG_DIR, _safe_name(nombre))
+    if os.path.isdir(folder):
+        files = [f for f in os.listdir(folder)
+                 if f.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))]
+        if files:
+            return os.path.join(folder, files[0])
+    from imageIndex import alias_de
+    return alias_de(nombre)
 
 
 def _get_image_path(nombre: str, cfg: dict) -> str | None:
     """
     Devuelve la ruta absoluta de una imagen para esta casilla.
     1. Si src/img/{safe_nombre}/ existe y tiene archivos → usa el primero.
-    2. Si no → scrapea.
-    3. Si scrapea y falla → None.
+    2. Si no → proveedores de imágenes vía la cola de scraping (salvo falla
+       reciente en la caché negativa, o que otro proceso ya la esté buscando).
+    3. Si falla, o con scraper.solo_cache → None.
     """
-    safe = _safe_name(nombre)
-    folder = os.path.join(_IMG_DIR, safe)
-    if os.path.isdir(folder):
-        files = [f for f in os.listdir(folder)
-                 if f.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))]
-        if files:
-            return os.path.join(folder, files[0])
+    cached = _cached_image(nombre)
+    if cached:
+        return cached
 
     sc = cfg.get("scraper", {})
-    return _scrape_images(
-        nombre,
-        n=sc.get("images_per_tile", 1),
-        headless=sc.get("headless", True),
-        min_res=sc.get("min_resolution", [80, 80]),
-        max_res=sc.get("max_resolution", [3840, 2160]),
-        max_missed=sc.get("max_missed", 5),
-    )
+    if sc.get("solo_cache"):
+        return None
+    from scrapeQueue import scrape_tile
+    return scrape_tile(nombre, cfg)
 
 
 def _img_to_b64(path: str) -> str:
     """Convierte imagen a data URI base64 para incrustarla en el HTML."""
+    return _img_to_b64_cached(path, _mtime(path))
+
+
+@functools.lru_cache(maxsize=512)
+def _img_to_b64_cached(path: str, _mtime: float) -> str:
+    # Casilla y tarjeta (y cada edición) incrustan la misma imagen: se codifica una vez
     ext = os.path.splitext(path)[1].lower().lstrip(".")
     mime = {"jpg": "image/jpeg", "jpeg": "image/jpeg",
             "png": "image/png", "webp": "image/webp"}.get(ext, "image/jpeg")
@@ -356,6 +183,9 @@ def cargar_propiedades(path: str) -> list[Propiedad]:
 # TIPO → ETIQUETA LEGIBLE
 # =============================================================================
 
+# Tipos que no se pueden comprar — no muestran precio ni hipoteca
+_NO_COMPRABLE = {10, 14, 15}
+
 _TIPO_LABELS = {
     1:  ("PROPIEDAD",      "Renta",              True),
     2:  ("EMPRESA",        "Empresa de servicio", False),
@@ -472,6 +302,11 @@ def _font_face_css(rel_path: str) -> str:
         }}"""
 
 
+def _font_rel(out_dir: str) -> str:
+    """Ruta (estilo URL) al TTF relativa a la carpeta donde se escribe el HTML."""
+    return os.path.relpath(_FONT_PATH, out_dir).replace(os.sep, "/")
+
+
 def _base_css() -> str:
     """CSS base — referencia KabelHeavy por nombre, con Century Gothic como fallback."""
     return """
@@ -487,13 +322,17 @@ def _base_css() -> str:
 # GENERADOR DE CASILLA (tile)
 # =============================================================================
 
-def generar_casilla(propiedad, force: bool = False, cfg: dict = None, colors: dict = None):
+def generar_casilla(propiedad, force: bool = False, cfg: dict = None, colors: dict = None,
+                    out_dir: str = None):
     """
     Genera 4 archivos HTML (rotaciones 0/90/180/270) para una casilla.
     Si force=False y los 4 ya existen, los salta.
+    out_dir: carpeta de salida (default repo/casillas; otra para ediciones).
     """
-    if cfg    is None: cfg    = _load_config()
-    if colors is None: colors = _get_colors()
+    if cfg     is None: cfg     = _load_config()
+    if colors  is None: colors  = _get_colors()
+    if out_dir is None: out_dir = _CASILLAS_DIR
+    os.makedirs(out_dir, exist_ok=True)
 
     tile_cfg = cfg["tile"]
     band_pct    = tile_cfg["color_band_pct"]       # % del alto que ocupa la franja
@@ -526,9 +365,7 @@ def generar_casilla(propiedad, force: bool = False, cfg: dict = None, colors: di
         img_css = f"background-image: url('{b64}'); background-size: cover; background-position: center;"
 
     # Etiqueta de precio
-    # Tipos que no se pueden comprar — no muestran precio ni hipoteca
-    NO_COMPRABLE = {10, 14, 15}
-    is_comprable = propiedad.tipo not in NO_COMPRABLE
+    is_comprable = propiedad.tipo not in _NO_COMPRABLE
 
     precio_str = ""
     if is_comprable and propiedad.precio and str(propiedad.precio) not in ("0", "0.0", "nan", ""):
@@ -540,8 +377,8 @@ def generar_casilla(propiedad, force: bool = False, cfg: dict = None, colors: di
         else:
             precio_str = str(int(p))
 
-    # Ruta relativa al TTF desde repo/casillas/
-    font_face = _font_face_css("../../src/KabelHeavy.ttf")
+    # Ruta relativa al TTF desde la carpeta de salida (repo/casillas/ → ../../src/)
+    font_face = _font_face_css(_font_rel(out_dir))
     base_css  = _base_css()
 
     # Nombre display: recortado si es muy largo
@@ -552,7 +389,7 @@ def generar_casilla(propiedad, force: bool = False, cfg: dict = None, colors: di
     has_font = _font_exists()   # True si KabelHeavy.ttf existe
 
     for angle in [0, 90, 180, 270]:
-        out_path = os.path.join(_CASILLAS_DIR, f"casilla_{_safe_name(propiedad.nombre)}_{angle}.html")
+        out_path = os.path.join(out_dir, f"casilla_{_safe_name(propiedad.nombre)}_{angle}.html")
         if not force and os.path.exists(out_path):
             with open(out_path, "r", encoding="utf-8") as f:
                 existing = f.read()
@@ -824,15 +661,19 @@ def _fortuna_detalle(carril: int) -> list:
         ]
 
 
-def generar_tarjeta(propiedad, force: bool = False, cfg: dict = None, colors: dict = None):
+def generar_tarjeta(propiedad, force: bool = False, cfg: dict = None, colors: dict = None,
+                    out_dir: str = None):
     """
     Genera una tarjeta HTML para la propiedad.
     Si force=False y el archivo ya existe, lo salta.
+    out_dir: carpeta de salida (default repo/tarjetas; otra para ediciones).
     """
-    if cfg    is None: cfg    = _load_config()
-    if colors is None: colors = _get_colors()
+    if cfg     is None: cfg     = _load_config()
+    if colors  is None: colors  = _get_colors()
+    if out_dir is None: out_dir = _TARJETAS_DIR
+    os.makedirs(out_dir, exist_ok=True)
 
-    out_path = os.path.join(_TARJETAS_DIR, f"tarjeta_{_safe_name(propiedad.nombre)}.html")
+    out_path = os.path.join(out_dir, f"tarjeta_{_safe_name(propiedad.nombre)}.html")
 
     # Verificar caché: obtener img_path primero para saber si debemos regenerar
     img_path = _get_image_path(propiedad.nombre, cfg)
@@ -858,6 +699,7 @@ def generar_tarjeta(propiedad, force: bool = False, cfg: dict = None, colors: di
     band_color   = colors.get(propiedad.color, colors["blue"])
 
     tipo_label, tipo_subtitle, _has_renta = _tipo_info(propiedad.tipo)
+    is_comprable = propiedad.tipo not in _NO_COMPRABLE
     detalles = _TIPO_DETALLE.get(propiedad.tipo, lambda p: [])(propiedad)
 
     img_bg_css = ""
@@ -879,8 +721,8 @@ def generar_tarjeta(propiedad, force: bool = False, cfg: dict = None, colors: di
                 <td class="detail-value">{value}</td>
             </tr>"""
 
-    # Ruta relativa al TTF desde repo/tarjetas/
-    font_face = _font_face_css("../../src/KabelHeavy.ttf")
+    # Ruta relativa al TTF desde la carpeta de salida (repo/tarjetas/ → ../../src/)
+    font_face = _font_face_css(_font_rel(out_dir))
     base_css  = _base_css()
 
     html = f"""<!DOCTYPE html>
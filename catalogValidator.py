@@ -0,0 +1,348 @@
+"""
+catalogValidator.py
+===================
+Validación rápida (vectorizada) de zmg.csv y fortunas.csv antes de renderizar.
+
+En vez de abortar en el primer astype(int) con un traceback de pandas, se
+revisan columnas completas con máscaras y se juntan TODOS los errores en una
+sola pasada, con archivo, fila y columna:
+
+  Casillas (zmg.csv)
+    - columnas requeridas
+    - carril ∈ {1, 2, 3} y tipo ∈ tipos conocidos (enteros)
+    - precio / renta_base numéricos y no negativos
+    - color ∈ claves de src/palette.html
+    - nombres duplicados y slugs _safe_name que colisionan
+    - posicion (opcional): entero ≥ 1, sin repetirse dentro de un carril
+    - pertenencia a carriles / esquinas (si se pasan las listas)
+
+  Fortunas (fortunas.csv)
+    - columnas requeridas
+    - carril ∈ {1, 2, 3}, nivel ∈ 1..5, cantidad entero ≥ 1
+    - tipo ∈ {inmediato, guardian, doble}, efecto no vacío
+    - slugs fortuna_{carril}_{safe_nombre} que colisionan
+
+Uso:
+    python catalogValidator.py                              # valida los CSV por defecto
+    python catalogValidator.py --props props/otra.csv --fortunas props/otras.csv
+"""
+
+import os
+import re
+import sys
+from dataclasses import dataclass
+
+import pandas as pd
+
+from propsReader import leer_tabla
+
+# =============================================================================
+# PATHS / CONSTANTES
+# =============================================================================
+
+_HERE          = os.path.dirname(os.path.abspath(__file__))
+_PALETTE_PATH  = os.path.join(_HERE, "src", "palette.html")
+DEFAULT_PROPS  = os.path.join("props", "zmg.csv")
+DEFAULT_FORTUNAS = os.path.join("props", "fortunas.csv")
+
+CASILLA_COLUMNS = ["nombre", "color", "carril", "imagen", "precio", "renta_base", "tipo"]
+FORTUNA_COLUMNS = ["nombre", "carril", "nivel", "efecto", "tipo", "cantidad"]
+
+CARRILES       = (1, 2, 3)
+# Mismos tipos que cardFactory._TIPO_DETALLE (1-15 + 16 empresa/salida)
+TIPOS_CASILLA  = tuple(range(1, 17))
+TIPOS_FORTUNA  = ("inmediato", "guardian", "doble")
+NIVELES        = (1, 2, 3, 4, 5)
+
+_LANE_LABEL = {1: "azul", 2: "amarillo", 3: "rojo"}
+
+# Empresas (tipos 2 y 16): van en las esquinas, con su propia numeración de posicion
+TIPOS_ESQUINA  = (2, 16)
+
+
+# =============================================================================
+# MODELO
+# =============================================================================
+
+@dataclass
+class ValidationIssue:
+    archivo:  str
+    fila:     int | None     # línea del archivo (1 = encabezado), None = global
+    columna:  str | None
+    mensaje:  str
+    nivel:    str = "error"  # "error" aborta el build, "aviso" solo se reporta
+
+    def __str__(self) -> str:
+        where = os.path.basename(self.archivo)
+        if self.fila is not None:
+            where += f":{self.fila}"
+        if self.columna:
+            where += f" [{self.columna}]"
+        return f"{where}: {self.mensaje}"
+
+
+class CatalogError(ValueError):
+    """Error de validación con todos los problemas encontrados."""
+
+    def __init__(self, issues: list[ValidationIssue]):
+        self.issues = issues
+        errores = [i for i in issues if i.nivel == "error"]
+        super().__init__(
+            f"{len(errores)} error(es) de validación:\n"
+            + "\n".join(f"  - {i}" for i in errores)
+        )
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def palette_keys(path: str = _PALETTE_PATH) -> set[str]:
+    """Claves --nombre: definidas en la paleta (sin parsear con BeautifulSoup)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return set(re.findall(r"--([A-Za-z][\w-]*)\s*:", f.read()))
+
+
+def _safe_name(s: str) -> str:
+    return re.sub(r'[^\w\-]', '_', s)
+
+
+def _line(idx) -> int:
+    """Índice del DataFrame → línea del archivo (encabezado en la línea 1)."""
+    return int(idx) + 2
+
+
+def _issues(path, df, mask, columna, fmt, nivel="error") -> list[ValidationIssue]:
+    """Convierte una máscara booleana en issues (solo itera las filas malas)."""
+    bad = df.loc[mask]
+    return [
+        ValidationIssue(path, _line(i), columna, fmt(row), nivel)
+        for i, row in zip(bad.index, bad.to_dict(orient="records"))
+    ]
+
+
+def _check_columns(path, df, required) -> list[ValidationIssue]:
+    return [
+        ValidationIssue(path, None, col, "falta la columna requerida")
+        for col in required if col not in df.columns
+    ]
+
+
+def _int_in(df, col, allowed) -> pd.Series:
+    """Máscara de filas cuyo valor NO es un entero dentro de `allowed`."""
+    num = pd.to_numeric(df[col], errors="coerce")
+    return num.isna() | (num != num.round()) | ~num.isin(allowed)
+
+
+def _slug_collisions(path, df, slug: pd.Series, label: str) -> list[ValidationIssue]:
+    """Nombres distintos que producen el mismo nombre de archivo."""
+    out = []
+    dup = slug.duplicated(keep=False)
+    for s, grp in df[dup].groupby(slug[dup], sort=False):
+        names = grp["nombre"].astype(str).tolist()
+        kind  = "duplicado" if len(set(names)) == 1 else "colisión de slug"
+        out.append(ValidationIssue(
+            path, _line(grp.index[0]), "nombre",
+            f"{kind} en {label} '{s}': " + ", ".join(
+                f"'{n}' (línea {_line(i)})" for n, i in zip(names, grp.index)
+            ),
+        ))
+    return out
+
+
+# =============================================================================
+# CASILLAS
+# =============================================================================
+
+def validar_casillas(
+    df:       pd.DataFrame,
+    path:     str = DEFAULT_PROPS,
+    colors:   set[str] | None = None,
+    lanes:    dict[int, list[str]] | None = None,
+    corners:  dict[int, list[str]] | None = None,
+) -> list[ValidationIssue]:
+    """
+    Valida el catálogo de casillas completo y devuelve todos los problemas.
+    colors: claves válidas de la paleta (default: src/palette.html).
+    lanes / corners: {carril: [nombres]} tal como se pasarán a boardFactory.
+    """
+    issues = _check_columns(path, df, CASILLA_COLUMNS)
+    if issues:
+        return issues
+
+    if colors is None:
+        colors = palette_keys()
+
+    nombre = df["nombre"]
+    issues += _issues(path, df, nombre.isna() | (nombre.astype(str).str.strip() == ""),
+                      "nombre", lambda r: "nombre vacío")
+
+    issues += _issues(path, df, _int_in(df, "carril", CARRILES), "carril",
+                      lambda r: f"'{r['nombre']}': carril '{r['carril']}' inválido (1, 2 o 3)")
+    issues += _issues(path, df, _int_in(df, "tipo", TIPOS_CASILLA), "tipo",
+                      lambda r: f"'{r['nombre']}': tipo '{r['tipo']}' desconocido")
+
+    for col in ("precio", "renta_base"):
+        num = pd.to_numeric(df[col], errors="coerce")
+        issues += _issues(path, df, df[col].notna() & num.isna(), col,
+                          lambda r, c=col: f"'{r['nombre']}': {c} '{r[c]}' no es numérico")
+        issues += _issues(path, df, num < 0, col,
+                          lambda r, c=col: f"'{r['nombre']}': {c} negativo ({r[c]})")
+
+    bad_color = df["color"].isna() | ~df["color"].astype(str).str.strip().isin(colors)
+    issues += _issues(path, df, bad_color, "color",
+                      lambda r: f"'{r['nombre']}': color '{r['color']}' no existe en la paleta")
+
+    slug = nombre.astype(str).map(_safe_name)
+    issues += _slug_collisions(path, df, slug, "casilla")
+
+    if "posicion" in df.columns:
+        issues += _validar_posiciones(df, path)
+
+    if lanes or corners:
+        issues += validar_carriles(df, lanes or {}, corners or {}, path=path)
+
+    return issues
+
+
+def _validar_posiciones(df: pd.DataFrame, path: str) -> list[ValidationIssue]:
+    """Columna opcional `posicion`: slot 1-based dentro del carril o de sus esquinas."""
+    pos   = pd.to_numeric(df["posicion"], errors="coerce")
+    given = df["posicion"].notna()
+    issues = _issues(path, df, given & (pos.isna() | (pos != pos.round()) | (pos < 1)), "posicion",
+                     lambda r: f"'{r['nombre']}': posicion '{r['posicion']}' debe ser entero ≥ 1")
+
+    esquina = pd.to_numeric(df["tipo"], errors="coerce").isin(TIPOS_ESQUINA)
+    keys    = pd.DataFrame({"carril": df["carril"], "esquina": esquina, "pos": pos})
+    dup     = given & pos.notna() & keys.duplicated(keep=False)
+    issues += _issues(path, df, dup, "posicion",
+                      lambda r: f"'{r['nombre']}': posicion {r['posicion']} repetida en el carril {r['carril']}")
+    return issues
+
+
+def validar_carriles(
+    df:      pd.DataFrame,
+    lanes:   dict[int, list[str]],
+    corners: dict[int, list[str]],
+    path:    str = DEFAULT_PROPS,
+) -> list[ValidationIssue]:
+    """Pertenencia de cada nombre listado a su carril, en una sola pasada."""
+    issues  = []
+    carril  = pd.to_numeric(df["carril"], errors="coerce")
+    by_name = dict(zip(df["nombre"].astype(str), carril))
+    placed: dict[str, str] = {}
+
+    for kind, groups in (("carril", lanes), ("esquinas", corners)):
+        for lane, names in groups.items():
+            label = f"{kind} {_LANE_LABEL.get(lane, lane)}"
+            for name in names:
+                if name in placed:
+                    issues.append(ValidationIssue(
+                        path, None, "nombre",
+                        f"'{name}' aparece en {placed[name]} y en {label}",
+                    ))
+                placed[name] = label
+                actual = by_name.get(name)
+                if actual is None:
+                    issues.append(ValidationIssue(
+                        path, None, "nombre", f"'{name}' listada en {label} no existe en el catálogo",
+                    ))
+                elif actual != lane:
+                    issues.append(ValidationIssue(
+                        path, None, "carril",
+                        f"'{name}' tiene carril {actual:g} pero está listada en {label}",
+                    ))
+
+    # Casillas del catálogo que no quedan en el tablero (p. ej. exceden los slots)
+    sobrantes = ~df["nombre"].astype(str).isin(placed.keys())
+    issues += _issues(path, df, sobrantes, "nombre",
+                      lambda r: f"'{r['nombre']}' no tiene lugar en el tablero", nivel="aviso")
+    return issues
+
+
+# =============================================================================
+# FORTUNAS
+# =============================================================================
+
+def validar_fortunas(df: pd.DataFrame, path: str = DEFAULT_FORTUNAS) -> list[ValidationIssue]:
+    """Valida el CSV de fortunas completo y devuelve todos los problemas."""
+    issues = _check_columns(path, df, FORTUNA_COLUMNS)
+    if issues:
+        return issues
+
+    nombre = df["nombre"]
+    issues += _issues(path, df, nombre.isna() | (nombre.astype(str).str.strip() == ""),
+                      "nombre", lambda r: "nombre vacío")
+    issues += _issues(path, df, _int_in(df, "carril", CARRILES), "carril",
+                      lambda r: f"'{r['nombre']}': carril '{r['carril']}' inválido (1, 2 o 3)")
+    issues += _issues(path, df, _int_in(df, "nivel", NIVELES), "nivel",
+                      lambda r: f"'{r['nombre']}': nivel '{r['nivel']}' inválido (1-5)")
+
+    cantidad = pd.to_numeric(df["cantidad"], errors="coerce")
+    issues += _issues(path, df, cantidad.isna() | (cantidad != cantidad.round()) | (cantidad < 1),
+                      "cantidad", lambda r: f"'{r['nombre']}': cantidad '{r['cantidad']}' debe ser entero ≥ 1")
+
+    tipo = df["tipo"].astype(str).str.strip().str.lower()
+    issues += _issues(path, df, df["tipo"].isna() | ~tipo.isin(TIPOS_FORTUNA), "tipo",
+                      lambda r: f"'{r['nombre']}': tipo '{r['tipo']}' inválido "
+                                f"({', '.join(TIPOS_FORTUNA)})")
+
+    efecto = df["efecto"]
+    issues += _issues(path, df, efecto.isna() | (efecto.astype(str).str.strip() == ""),
+                      "efecto", lambda r: f"'{r['nombre']}': efecto vacío")
+
+    # Archivo de salida: fortuna_{carril}_{safe}.html
+    slug = df["carril"].astype(str) + "_" + nombre.astype(str).map(_safe_name)
+    issues += _slug_collisions(path, df, slug, "fortuna")
+
+    return issues
+
+
+# =============================================================================
+# REPORTE
+# =============================================================================
+
+def reportar(issues: list[ValidationIssue], label: str = "catalogValidator") -> bool:
+    """Imprime todos los problemas. Devuelve True si no hay errores (los avisos no cuentan)."""
+    errores = [i for i in issues if i.nivel == "error"]
+    avisos  = [i for i in issues if i.nivel != "error"]
+    for i in avisos:
+        print(f"[{label}] ⚠️  {i}")
+    for i in errores:
+        print(f"[{label}] ❌ {i}")
+    if errores:
+        print(f"[{label}] {len(errores)} error(es), {len(avisos)} aviso(s) — build abortado")
+    return not errores
+
+
+def validar_archivos(props_path: str = None, fortunas_path: str = None,
+                     lanes=None, corners=None) -> list[ValidationIssue]:
+    """Lee y valida los archivos indicados; nunca lanza por datos inválidos."""
+    issues = []
+    for path, fn, kwargs in (
+        (props_path,    validar_casillas, {"lanes": lanes, "corners": corners}),
+        (fortunas_path, validar_fortunas, {}),
+    ):
+        if not path:
+            continue
+        try:
+            df = leer_tabla(path)
+        except Exception as e:
+            issues.append(ValidationIssue(path, None, None, f"no se pudo leer: {e}"))
+            continue
+        issues += fn(df, path=path, **kwargs)
+    return issues
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Valida los catálogos de casillas y fortunas")
+    parser.add_argument("--props",    default=DEFAULT_PROPS)
+    parser.add_argument("--fortunas", default=DEFAULT_FORTUNAS)
+    args = parser.parse_args()
+
+    issues = validar_archivos(args.props, args.fortunas)
+    if reportar(issues):
+        print(f"[catalogValidator] ✅ Catálogos válidos ({len(issues)} aviso(s))")
+    else:
+        sys.exit(1)
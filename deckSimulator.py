@@ -0,0 +1,274 @@
+"""
+deckSimulator.py
+================
+Simulador vectorizado (NumPy) de robos de las barajas de fortuna.
+
+Cada baraja de carril es un arreglo de ids de carta expandido desde
+`cantidad` (p. ej. Multa de Tránsito ×3 → tres entradas). Se simulan muchas
+partidas a la vez, en lotes: cada fila del lote es una partida y cada
+columna un robo.
+
+Modos:
+  sin_reposicion   la carta robada va al descarte; al agotarse la baraja se
+                   revuelve completa (regla normal)
+  con_reposicion   cada robo es independiente (la carta vuelve y se revuelve)
+
+Efectos de empresa:
+  --revolver-cada K   Megacable: la baraja completa (con descartes) se
+                      revuelve cada K robos
+  --telcel N          Telcel + Megacable: se mira la carta de arriba y, si su
+                      nivel es menor que N, se revuelve antes de robar
+
+Reporte por carril: probabilidad de robo de cada carta (por robo y de
+aparecer al menos una vez en la partida), probabilidad por nivel y rachas
+máximas de cartas malas (nivel ≤ 2) y buenas (nivel ≥ 4).
+
+Uso:
+    python deckSimulator.py                                   # 3 carriles, 1M partidas × 30 robos
+    python deckSimulator.py --carril 2 --partidas 200000 --robos 60
+    python deckSimulator.py --modo con_reposicion --telcel 3 --revolver-cada 10
+"""
+
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from fortunaFactory import cargar_fortunas
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+DEFAULT_FORTUNAS = os.path.join("props", "fortunas.csv")
+MODOS            = ("sin_reposicion", "con_reposicion")
+NIVEL_MALO       = 2      # nivel ≤ 2 cuenta para la racha mala
+NIVEL_BUENO      = 4      # nivel ≥ 4 cuenta para la racha buena
+
+_LANE_LABEL = {1: "Azul", 2: "Amarillo", 3: "Rojo"}
+
+
+# =============================================================================
+# MODELO
+# =============================================================================
+
+@dataclass
+class Baraja:
+    carril:   int
+    nombres:  list[str]     # una entrada por carta distinta
+    niveles:  np.ndarray    # (k,) nivel de cada carta distinta
+    cantidad: np.ndarray    # (k,) copias de cada carta
+    mazo:     np.ndarray    # (n,) id local de carta por copia, n = cantidad.sum()
+
+
+@dataclass
+class ResultadoSimulacion:
+    carril:       int
+    partidas:     int
+    robos:        int
+    prob_carta:   np.ndarray    # (k,) P(robo = carta)
+    prob_aparece: np.ndarray    # (k,) P(la carta sale al menos una vez en la partida)
+    prob_nivel:   np.ndarray    # (5,) P(robo de nivel 1..5)
+    racha_mala:   np.ndarray    # (robos+1,) distribución de la racha mala máxima
+    racha_buena:  np.ndarray    # (robos+1,) distribución de la racha buena máxima
+    segundos:     float
+
+
+def construir_barajas(df: pd.DataFrame) -> dict[int, Baraja]:
+    """Una Baraja por carril a partir del DataFrame de cargar_fortunas."""
+    barajas = {}
+    for carril, sub in df.groupby("carril", sort=True):
+        cantidad = sub["cantidad"].to_numpy(dtype=np.int64)
+        barajas[int(carril)] = Baraja(
+            carril   = int(carril),
+            nombres  = sub["nombre"].astype(str).tolist(),
+            niveles  = sub["nivel"].to_numpy(dtype=np.int8),
+            cantidad = cantidad,
+            mazo     = np.repeat(np.arange(len(sub), dtype=np.int32), cantidad),
+        )
+    return barajas
+
+
+# =============================================================================
+# MOTOR
+# =============================================================================
+
+def _robar_tope(orden: np.ndarray, pos: np.ndarray, filas: np.ndarray, rng) -> np.ndarray:
+    """
+    Fisher-Yates perezoso: en cada fila de `filas` intercambia una carta al
+    azar de las restantes [pos, n) con la de `pos` y la devuelve como tope.
+    Equivale a robar de una baraja revuelta sin permutar la fila completa.
+    """
+    n    = orden.shape[1]
+    p    = pos[filas]
+    j    = p + (rng.random(len(filas)) * (n - p)).astype(np.int32)
+    tope = orden[filas, j]
+    orden[filas, j] = orden[filas, p]
+    orden[filas, p] = tope
+    return tope
+
+
+def _robar_lote(baraja: Baraja, partidas: int, robos: int, rng, modo: str,
+                revolver_cada: int, telcel_umbral: int) -> np.ndarray:
+    """Devuelve (partidas, robos) con el id local de la carta de cada robo."""
+    n       = len(baraja.mazo)
+    nivel_c = baraja.niveles[baraja.mazo]          # nivel de cada copia
+
+    if modo == "con_reposicion":
+        copias = rng.integers(0, n, size=(partidas, robos))
+        if telcel_umbral:
+            malas = nivel_c[copias] < telcel_umbral
+            copias[malas] = rng.integers(0, n, size=int(malas.sum()))
+        return baraja.mazo[copias]
+
+    # Sin reposición: cada partida lleva su baraja y cuántas cartas ha robado.
+    # Revolver (con descartes) es solo regresar pos a 0.
+    orden = np.tile(np.arange(n, dtype=np.int32), (partidas, 1))
+    pos   = np.zeros(partidas, dtype=np.int32)
+    filas = np.arange(partidas)
+    out   = np.empty((partidas, robos), dtype=np.int32)
+
+    for r in range(robos):
+        pos[pos >= n] = 0
+        if revolver_cada and r and r % revolver_cada == 0:
+            pos[:] = 0
+
+        tope = _robar_tope(orden, pos, filas, rng)
+        if telcel_umbral:
+            malas = nivel_c[tope] < telcel_umbral
+            if malas.any():
+                pos[malas] = 0
+                idx = np.flatnonzero(malas)
+                tope[idx] = _robar_tope(orden, pos, idx, rng)
+        out[:, r] = tope
+        pos += 1
+
+    return baraja.mazo[out]
+
+
+def _racha_maxima(mask: np.ndarray) -> np.ndarray:
+    """Racha más larga de True por fila, recorriendo columnas (vectorizado en filas)."""
+    actual = np.zeros(mask.shape[0], dtype=np.int32)
+    maxima = np.zeros(mask.shape[0], dtype=np.int32)
+    for c in range(mask.shape[1]):
+        actual = (actual + 1) * mask[:, c]
+        np.maximum(maxima, actual, out=maxima)
+    return maxima
+
+
+def simular(
+    baraja:        Baraja,
+    partidas:      int = 1_000_000,
+    robos:         int = 30,
+    modo:          str = "sin_reposicion",
+    revolver_cada: int = 0,
+    telcel_umbral: int = 0,
+    lote:          int = 50_000,
+    seed:          int | None = None,
+) -> ResultadoSimulacion:
+    """
+    Simula `partidas` partidas de `robos` robos cada una sobre una baraja.
+    Se procesa en lotes de `lote` partidas para acotar memoria.
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo desconocido: {modo} ({', '.join(MODOS)})")
+
+    rng = np.random.default_rng(seed)
+    k   = len(baraja.nombres)
+    t0  = time.perf_counter()
+
+    conteo      = np.zeros(k, dtype=np.int64)
+    aparece     = np.zeros(k, dtype=np.int64)
+    por_nivel   = np.zeros(6, dtype=np.int64)
+    racha_mala  = np.zeros(robos + 1, dtype=np.int64)
+    racha_buena = np.zeros(robos + 1, dtype=np.int64)
+
+    hechas = 0
+    while hechas < partidas:
+        s       = min(lote, partidas - hechas)
+        cartas  = _robar_lote(baraja, s, robos, rng, modo, revolver_cada, telcel_umbral)
+        niveles = baraja.niveles[cartas]
+
+        conteo    += np.bincount(cartas.ravel(), minlength=k)
+        por_nivel += np.bincount(niveles.ravel(), minlength=6)
+
+        vista = np.zeros((s, k), dtype=bool)
+        vista[np.arange(s)[:, None], cartas] = True
+        aparece += vista.sum(axis=0)
+
+        racha_mala  += np.bincount(_racha_maxima(niveles <= NIVEL_MALO),  minlength=robos + 1)
+        racha_buena += np.bincount(_racha_maxima(niveles >= NIVEL_BUENO), minlength=robos + 1)
+        hechas += s
+
+    total = partidas * robos
+    return ResultadoSimulacion(
+        carril       = baraja.carril,
+        partidas     = partidas,
+        robos        = robos,
+        prob_carta   = conteo / total,
+        prob_aparece = aparece / partidas,
+        prob_nivel   = por_nivel[1:] / total,
+        racha_mala   = racha_mala / partidas,
+        racha_buena  = racha_buena / partidas,
+        segundos     = time.perf_counter() - t0,
+    )
+
+
+# =============================================================================
+# REPORTE
+# =============================================================================
+
+def _resumen_racha(dist: np.ndarray) -> str:
+    media = float((np.arange(len(dist)) * dist).sum())
+    p3    = float(dist[3:].sum())
+    return f"media {media:.2f} · P(≥3) {p3:.1%}"
+
+
+def imprimir(res: ResultadoSimulacion, baraja: Baraja, top: int = 5) -> None:
+    label = f"[deckSimulator] {_LANE_LABEL.get(res.carril, res.carril)}"
+    n     = int(baraja.cantidad.sum())
+    print(f"{label}: {len(baraja.nombres)} cartas · {n} copias · "
+          f"{res.partidas:,} partidas × {res.robos} robos en {res.segundos:.2f}s")
+    print(f"   Por nivel: " + "  ".join(
+        f"{nv}: {p:.1%}" for nv, p in enumerate(res.prob_nivel, 1)
+    ))
+    print(f"   Racha mala (nivel ≤ {NIVEL_MALO}):  {_resumen_racha(res.racha_mala)}")
+    print(f"   Racha buena (nivel ≥ {NIVEL_BUENO}): {_resumen_racha(res.racha_buena)}")
+
+    orden = np.argsort(-res.prob_carta, kind="stable")
+    for titulo, idxs in (("Más probables", orden[:top]), ("Menos probables", orden[::-1][:top])):
+        print(f"   {titulo}:")
+        for i in idxs:
+            print(f"     {baraja.nombres[i]:<32} ×{baraja.cantidad[i]}  nivel {baraja.niveles[i]}  "
+                  f"P(robo) {res.prob_carta[i]:.2%}  P(sale) {res.prob_aparece[i]:.1%}")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Simulador de barajas de fortuna")
+    parser.add_argument("--input",    default=DEFAULT_FORTUNAS)
+    parser.add_argument("--carril",   type=int, choices=(1, 2, 3), help="Solo un carril")
+    parser.add_argument("--partidas", type=int, default=1_000_000)
+    parser.add_argument("--robos",    type=int, default=30, help="Robos por partida (default: 30)")
+    parser.add_argument("--modo",     choices=MODOS, default="sin_reposicion")
+    parser.add_argument("--revolver-cada", type=int, default=0,
+                        help="Megacable: revuelve la baraja completa cada K robos")
+    parser.add_argument("--telcel",   type=int, default=0,
+                        help="Telcel: si la carta de arriba es de nivel < N, revuelve antes de robar")
+    parser.add_argument("--lote",     type=int, default=50_000)
+    parser.add_argument("--seed",     type=int)
+    parser.add_argument("--top",      type=int, default=5)
+    args = parser.parse_args()
+
+    barajas = construir_barajas(cargar_fortunas(args.input))
+    for carril, baraja in barajas.items():
+        if args.carril and carril != args.carril:
+            continue
+        res = simular(
+            baraja, partidas=args.partidas, robos=args.robos, modo=args.modo,
+            revolver_cada=args.revolver_cada, telcel_umbral=args.telcel,
+            lote=args.lote, seed=args.seed,
+        )
+        imprimir(res, baraja, top=args.top)
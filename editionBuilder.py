@@ -0,0 +1,195 @@
+"""
+editionBuilder.py
+=================
+Construye varias ediciones de Metropoly (una por ciudad) en un solo proceso.
+
+Antes cada edición requería correr generator.py + fortunaFactory.py +
+instructivoFactory.py por separado, recargando fuente, paleta, config e
+imágenes cada vez. Aquí todas las ediciones comparten las cachés en memoria
+de cardFactory / fortunaFactory (config, paleta, fuente, imágenes en base64)
+y el catálogo SQLite, y se construyen en paralelo. Cada edición es un grafo
+de etapas de buildGraph (omite las que no cambiaron desde su último build).
+
+Manifiesto: src/ediciones.json
+  {
+    "ediciones": [
+      {
+        "nombre":   "zmg",                  ← identificador (--only)
+        "titulo":   "Metropoly ZMG",
+        "props":    "props/zmg.csv",        ← casillas (CSV / Excel / Parquet / Arrow)
+        "fortunas": "props/fortunas.csv",
+        "config":   "src/board_config.json",
+        "paleta":   "src/palette.html",
+        "salida":   ".",                    ← raíz de la edición
+        "esquinas": {"1": [...], "2": [...], "3": [...]}   (opcional, ver abajo)
+      }
+    ]
+  }
+
+Carriles y esquinas se derivan del catálogo (carril + tipo + columna opcional
+`posicion`); "esquinas" solo hace falta para reemplazar las esquinas derivadas.
+
+Salida por edición (rutas relativas a la raíz del proyecto):
+  {salida}/repo/casillas · tarjetas · fortunas · tableros · instructivo
+  {salida}/juego_completo/
+La edición con salida "." usa repo/ y juego_completo/ de la raíz y además
+actualiza docs/.
+
+Uso:
+    python editionBuilder.py                      # todas las ediciones
+    python editionBuilder.py --only zmg           # solo algunas
+    python editionBuilder.py --force --jobs 2     # regenera todo, 2 ediciones a la vez
+"""
+
+import os
+import json
+import time
+import argparse
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# =============================================================================
+# PATHS
+# =============================================================================
+
+_HERE          = os.path.dirname(os.path.abspath(__file__))
+_MANIFEST_PATH = os.path.join(_HERE, "src", "ediciones.json")
+
+
+# =============================================================================
+# MODELO
+# =============================================================================
+
+@dataclass
+class Edicion:
+    nombre:   str
+    titulo:   str
+    props:    str
+    fortunas: str
+    config:   str
+    paleta:   str
+    salida:   str
+    esquinas: dict = field(default_factory=dict)   # {carril: [nombres]} — override opcional
+
+    @property
+    def repo_dir(self) -> str:
+        return os.path.join(self.salida, "repo")
+
+    @property
+    def juego_dir(self) -> str:
+        return os.path.join(self.salida, "juego_completo")
+
+    @property
+    def es_principal(self) -> bool:
+        return os.path.abspath(self.salida) == _HERE
+
+
+def cargar_manifiesto(path: str = _MANIFEST_PATH) -> list[Edicion]:
+    """Lee el manifiesto; las rutas relativas se resuelven contra la raíz del proyecto."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    def _abs(p: str) -> str:
+        return p if os.path.isabs(p) else os.path.normpath(os.path.join(_HERE, p))
+
+    ediciones = []
+    for e in data.get("ediciones", []):
+        nombre = e["nombre"]
+        ediciones.append(Edicion(
+            nombre   = nombre,
+            titulo   = e.get("titulo", f"Metropoly {nombre}"),
+            props    = _abs(e["props"]),
+            fortunas = _abs(e.get("fortunas", "props/fortunas.csv")),
+            config   = _abs(e.get("config", "src/board_config.json")),
+            paleta   = _abs(e.get("paleta", "src/palette.html")),
+            salida   = _abs(e.get("salida", os.path.join("ediciones", nombre))),
+            esquinas = {int(k): v for k, v in e.get("esquinas", {}).items()},
+        ))
+    return ediciones
+
+
+# =============================================================================
+# CONSTRUCCIÓN
+# =============================================================================
+
+def construir_edicion(ed: Edicion, force: bool = False, workers: int = 1,
+                      rescrape: bool = False) -> dict:
+    """Genera y ensambla una edición completa (grafo de buildGraph). Devuelve un resumen."""
+    from buildGraph import etapas_edicion, construir, reportar
+
+    label = f"edition:{ed.nombre}"
+    t0    = time.perf_counter()
+
+    # config, paleta, fuente e imágenes se comparten vía lru_cache entre ediciones
+    etapas = etapas_edicion(
+        props_path    = ed.props,
+        fortunas_path = ed.fortunas,
+        repo_dir      = ed.repo_dir,
+        juego_dir     = ed.juego_dir,
+        config_path   = ed.config,
+        palette_path  = ed.paleta,
+        corners       = ed.esquinas or None,
+        force         = force,
+        workers       = workers,
+        rescrape      = rescrape,
+        docs          = ed.es_principal,
+        titulo        = ed.titulo,
+        label         = label,
+    )
+    resultados = construir(etapas, force=force, label=label,
+                           estado_path=os.path.join(ed.repo_dir, ".build_state.json"))
+    ok = reportar(resultados, label)
+    return {"edicion": ed.nombre, "ok": ok, "segundos": time.perf_counter() - t0,
+            "etapas": resultados}
+
+
+def construir_todas(ediciones: list[Edicion], force: bool = False,
+                    jobs: int = 2, workers: int = 1, rescrape: bool = False) -> list[dict]:
+    """Construye varias ediciones en paralelo dentro del mismo proceso."""
+    resultados = []
+    jobs = max(1, min(jobs, len(ediciones)))
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(construir_edicion, ed, force, workers, rescrape): ed
+            for ed in ediciones
+        }
+        for future in as_completed(futures):
+            ed = futures[future]
+            try:
+                resultados.append(future.result())
+            except Exception as e:
+                print(f"[editionBuilder] Error en edición '{ed.nombre}': {e}")
+                resultados.append({"edicion": ed.nombre, "ok": False, "error": str(e)})
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construye varias ediciones de Metropoly")
+    parser.add_argument("--manifest", default=_MANIFEST_PATH)
+    parser.add_argument("--only",     nargs="*", help="Nombres de ediciones a construir")
+    parser.add_argument("--force",    action="store_true")
+    parser.add_argument("--jobs",     type=int, default=2,
+                        help="Ediciones construidas en paralelo (default: 2)")
+    parser.add_argument("--workers",  type=int, default=1,
+                        help="Workers de scraping por edición (default: 1)")
+    parser.add_argument("--rescrape", action="store_true",
+                        help="Ignora la caché negativa de imágenes")
+    args = parser.parse_args()
+
+    ediciones = cargar_manifiesto(args.manifest)
+    if args.only:
+        ediciones = [e for e in ediciones if e.nombre in args.only]
+    if not ediciones:
+        raise SystemExit("[editionBuilder] Ninguna edición seleccionada")
+
+    print(f"[editionBuilder] {len(ediciones)} edición(es): {', '.join(e.nombre for e in ediciones)}")
+    resultados = construir_todas(ediciones, force=args.force, jobs=args.jobs,
+                                 workers=args.workers, rescrape=args.rescrape)
+
+    for r in sorted(resultados, key=lambda r: r["edicion"]):
+        estado = "✅" if r.get("ok") else "❌"
+        print(f"[editionBuilder] {estado} {r['edicion']} ({r.get('segundos', 0):.1f}s)")
+    from imageScraper import reporte_scraper
+    reporte_scraper("editionBuilder")
+    if not all(r.get("ok") for r in resultados):
+        raise SystemExit(1)
@@ -0,0 +1,458 @@
+"""
+fortunaEffects.py
+=================
+Compilador de efectos de fortunas: convierte el texto de `efecto` (y el
+`tipo`) de fortunas.csv en una secuencia compacta de opcodes que simuladores
+y herramientas de análisis pueden aplicar sin volver a parsear el texto.
+
+Gramática (una regla por oración del efecto, en minúsculas, "·" = ","):
+  paga / pierdes {monto} [al banco …]            → PAGAR monto
+  paga {monto} [al banco] por cada {activo}      → PAGAR_POR monto activo
+  recibes {monto} [del banco …]                  → RECIBIR monto
+  el banco te devuelve / entrega / da {monto}    → RECIBIR monto
+  recibes {monto} por cada {activo}              → RECIBIR_POR monto activo
+  recibes {monto} de cada jugador                → RECIBIR_POR monto jugador
+  cobra {monto} a cada jugador [del carril X]    → RECIBIR_POR monto jugador[_X]
+  elige a un jugador: le cobras {monto}          → RECIBIR monto
+  pierdes [automáticamente] todo tu dinero       → PERDER_PCT 100
+  pierdes el {n}% de todo tu dinero              → PERDER_PCT n
+  todos los jugadores pierden / reciben {monto}  → TODOS_PAGAN / TODOS_RECIBEN
+  todos los jugadores pierden el {n}% …          → TODOS_PIERDEN_PCT n
+  pierdes tu siguiente turno                     → PERDER_TURNO 1
+  ve al hospital por {n} turno(s)                → HOSPITAL n
+  avanza {n} casillas                            → MOVER n
+  recibe(s) / pierdes {n} de oro                 → ORO ±n
+  los siguientes {n} turnos pagas el doble       → PAGOS_DOBLES n
+  obtienes un 4° dado permanente                 → DADO_EXTRA
+  no puedes comprar nada durante {n} turnos      → SIN_COMPRAS n
+  sin efecto                                     → NADA
+  si tienes menos de {monto}, …                  → condición DINERO_MENOR
+  si tienes {n} o más {activo}, …                → condición ACTIVOS_MIN
+  tipo guardian / doble                          → GUARDAR / DOBLE al inicio
+
+Oraciones descriptivas conocidas ("El banco retiene el dinero.") se ignoran.
+Cualquier otra oración deja la carta marcada como no ejecutable (aviso) con
+el texto pendiente.
+
+La tabla compilada se guarda por hash del CSV en props/.cache/ y en memoria,
+así que compilar de nuevo un CSV sin cambios no parsea nada.
+
+Uso:
+    python fortunaEffects.py                      # resumen + cartas marcadas
+    python fortunaEffects.py --input props/otras.csv --verbose
+"""
+
+import os
+import re
+import pickle
+import hashlib
+from enum import IntEnum
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from propsReader import leer_tabla
+from catalogValidator import ValidationIssue, reportar
+
+# =============================================================================
+# PATHS / CONSTANTES
+# =============================================================================
+
+_HERE          = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FORTUNAS = os.path.join("props", "fortunas.csv")
+
+# Cambiar al modificar la gramática: invalida las tablas en caché
+_GRAMMAR_VERSION = 1
+
+
+class Op(IntEnum):
+    NADA              = 0
+    PAGAR             = 1
+    RECIBIR           = 2
+    PAGAR_POR         = 3
+    RECIBIR_POR       = 4
+    PERDER_PCT        = 5
+    TODOS_PAGAN       = 6
+    TODOS_RECIBEN     = 7
+    TODOS_PIERDEN_PCT = 8
+    PERDER_TURNO      = 9
+    HOSPITAL          = 10
+    MOVER             = 11
+    ORO               = 12
+    PAGOS_DOBLES      = 13
+    DADO_EXTRA        = 14
+    SIN_COMPRAS       = 15
+    GUARDAR           = 16
+    DOBLE             = 17
+
+
+class Cond(IntEnum):
+    SIEMPRE      = 0
+    DINERO_MENOR = 1
+    ACTIVOS_MIN  = 2
+
+
+# Activos contables ("por cada …"); el índice es el código en la tabla
+ACTIVOS = (
+    "propiedad", "propiedad_azul", "propiedad_amarilla", "propiedad_roja",
+    "hipotecada", "empresa", "taxi", "negocio", "casino", "mercado",
+    "fortuna_roja", "jugador", "jugador_azul", "jugador_amarillo", "jugador_rojo",
+)
+_ACTIVO_IDX = {a: i for i, a in enumerate(ACTIVOS)}
+
+# (frase, activo) — el orden importa: lo más específico primero
+_FRASES_ACTIVO = (
+    ("hipotecad",          "hipotecada"),
+    ("propiedad azul",     "propiedad_azul"),
+    ("propiedad amarilla", "propiedad_amarilla"),
+    ("propiedad roja",     "propiedad_roja"),
+    ("propiedad",          "propiedad"),
+    ("empresa",            "empresa"),
+    ("taxi",               "taxi"),
+    ("negocio",            "negocio"),
+    ("casino",             "casino"),
+    ("mercado",            "mercado"),
+    ("fortuna roja",       "fortuna_roja"),
+    ("jugador en el carril azul",     "jugador_azul"),
+    ("jugador en el carril amarillo", "jugador_amarillo"),
+    ("jugador en el carril rojo",     "jugador_rojo"),
+    ("jugador",            "jugador"),
+)
+
+# Oraciones sin efecto mecánico (texto de ambientación)
+_DESCRIPTIVAS = (
+    r"el banco retiene el dinero",
+    r"el banco se queda con él",
+    r"alguien más los encontró",
+    r"tu vehículo quedó inservible",
+    r"el festejo te favorece",
+    r"tu negocio fue hackeado",
+    r"el gobierno redujo servicios",
+    r"guarda esta carta",
+    r"otro jugador intenta asaltarte pero falla",
+    r"si no tienes suficiente, pierdes lo que tengas",   # el dinero nunca baja de 0
+)
+
+_MONTO = r"(\d+(?:\.\d+)?)\s*([km])"
+_N     = r"(\d+)"
+# Colas permitidas tras un monto simple (no deben cambiar el efecto)
+_COLA_LIBRE = r"(?![^.]*\b(?:si|cada|jugador|doble|oro|extra|próxima|siguiente)\b)[^%]*"
+
+
+# =============================================================================
+# MODELO
+# =============================================================================
+
+# Instrucción: (op, valor, activo, cond, cond_valor, cond_activo)
+Instr = tuple[int, int, int, int, int, int]
+
+
+@dataclass
+class CompiledCard:
+    nombre:     str
+    carril:     int
+    nivel:      int
+    cantidad:   int
+    tipo:       str
+    fila:       int                       # línea del CSV (1 = encabezado)
+    ops:        list[Instr] = field(default_factory=list)
+    pendientes: list[str]   = field(default_factory=list)   # oraciones sin regla
+
+    @property
+    def ejecutable(self) -> bool:
+        return not self.pendientes
+
+
+@dataclass
+class EffectTable:
+    huella:     str
+    cartas:     list[CompiledCard]
+    ops:        np.ndarray      # (n_cartas, max_ops, 6) int64, relleno con Op.NADA
+    ejecutable: np.ndarray      # (n_cartas,) bool
+
+    def avisos(self, path: str = DEFAULT_FORTUNAS) -> list[ValidationIssue]:
+        return [
+            ValidationIssue(
+                path, c.fila, "efecto",
+                f"'{c.nombre}': sin regla para " + " / ".join(f"«{p}»" for p in c.pendientes),
+                nivel="aviso",
+            )
+            for c in self.cartas if c.pendientes
+        ]
+
+
+# =============================================================================
+# PARSER
+# =============================================================================
+
+def _monto(num: str, unidad: str) -> int:
+    return int(round(float(num) * (1_000 if unidad == "k" else 1_000_000)))
+
+
+def _activo(texto: str) -> int | None:
+    for frase, activo in _FRASES_ACTIVO:
+        if frase in texto:
+            return _ACTIVO_IDX[activo]
+    return None
+
+
+def _op(op: Op, valor: int = 0, activo: int = 0) -> Instr:
+    return (int(op), int(valor), int(activo), int(Cond.SIEMPRE), 0, 0)
+
+
+def _reglas():
+    """Reglas (regex, constructor) en orden; el constructor devuelve Instr o None."""
+    def por_cada(op):
+        def build(m):
+            a = _activo(m.group(3))
+            return None if a is None else _op(op, _monto(m.group(1), m.group(2)), a)
+        return build
+
+    def cobra_cada(m):
+        lane = m.group(3)
+        return _op(Op.RECIBIR_POR, _monto(m.group(1), m.group(2)),
+                   _ACTIVO_IDX[f"jugador_{lane}" if lane else "jugador"])
+
+    reglas = [
+        (rf"(?:paga|pierdes) {_MONTO}[^.]*? por cada (.+)",               por_cada(Op.PAGAR_POR)),
+        (rf"recibes {_MONTO} por cada (.+)",                              por_cada(Op.RECIBIR_POR)),
+        (rf"recibes {_MONTO} de cada jugador(?: como [\w ]+)?",
+         lambda m: _op(Op.RECIBIR_POR, _monto(m.group(1), m.group(2)), _ACTIVO_IDX["jugador"])),
+        (rf"cobra {_MONTO} a cada jugador(?: (?:que esté en el|del) carril (azul|amarillo|rojo))?",
+         cobra_cada),
+        (rf"elige a un jugador: le cobras {_MONTO}",
+         lambda m: _op(Op.RECIBIR, _monto(m.group(1), m.group(2)))),
+        (rf"todos los jugadores pierden el {_N}% de su dinero",
+         lambda m: _op(Op.TODOS_PIERDEN_PCT, int(m.group(1)))),
+        (rf"todos los jugadores pierden {_MONTO}",
+         lambda m: _op(Op.TODOS_PAGAN, _monto(m.group(1), m.group(2)))),
+        (rf"todos los jugadores reciben {_MONTO} del banco",
+         lambda m: _op(Op.TODOS_RECIBEN, _monto(m.group(1), m.group(2)))),
+        (r"pierdes (?:automáticamente )?todo tu dinero",
+         lambda m: _op(Op.PERDER_PCT, 100)),
+        (rf"pierdes el {_N}% de todo tu dinero(?: actual)?",
+         lambda m: _op(Op.PERDER_PCT, int(m.group(1)))),
+        (rf"(?:paga|pierdes|pagas solo) {_MONTO}{_COLA_LIBRE}",
+         lambda m: _op(Op.PAGAR, _monto(m.group(1), m.group(2)))),
+        (rf"(?:recibes|recibe) {_MONTO}{_COLA_LIBRE}",
+         lambda m: _op(Op.RECIBIR, _monto(m.group(1), m.group(2)))),
+        (rf"el banco te (?:devuelve|entrega|da) {_MONTO}{_COLA_LIBRE}",
+         lambda m: _op(Op.RECIBIR, _monto(m.group(1), m.group(2)))),
+        (rf"(?:recibes|recibe) {_N} de oro(?: gratis)?(?: del banco)?",
+         lambda m: _op(Op.ORO, int(m.group(1)))),
+        (rf"pierdes {_N} de oro",
+         lambda m: _op(Op.ORO, -int(m.group(1)))),
+        (r"pierdes tu siguiente turno(?: .*)?",
+         lambda m: _op(Op.PERDER_TURNO, 1)),
+        (rf"ve al hospital por {_N} turnos?",
+         lambda m: _op(Op.HOSPITAL, int(m.group(1)))),
+        (rf"avanza {_N} casillas(?: .*)?",
+         lambda m: _op(Op.MOVER, int(m.group(1)))),
+        (rf"los siguientes {_N} turnos pagas el doble de todo",
+         lambda m: _op(Op.PAGOS_DOBLES, int(m.group(1)))),
+        (r"después obtienes un 4° dado permanente",
+         lambda m: _op(Op.DADO_EXTRA)),
+        (rf"no puedes comprar nada durante {_N} turnos",
+         lambda m: _op(Op.SIN_COMPRAS, int(m.group(1)))),
+        (r"sin efecto",
+         lambda m: _op(Op.NADA)),
+    ]
+    return [(re.compile(rx), build) for rx, build in reglas]
+
+
+_REGLAS       = _reglas()
+_DESCRIPTIVAS_RX = re.compile("|".join(f"(?:{d})" for d in _DESCRIPTIVAS))
+_COND_DINERO  = re.compile(rf"si tienes menos de {_MONTO}, (.+)")
+_COND_ACTIVOS = re.compile(rf"si tienes {_N} o más (.+?), (.+)")
+
+
+def _oraciones(efecto: str) -> list[str]:
+    texto = efecto.replace("·", ",").strip().lower()
+    return [s.strip(" .") for s in re.split(r"(?<=\.)\s+", texto) if s.strip(" .")]
+
+
+def _compilar_oracion(oracion: str) -> Instr | None:
+    """Devuelve la instrucción, Op.NADA para texto descriptivo o None si no hay regla."""
+    if _DESCRIPTIVAS_RX.fullmatch(oracion):
+        return _op(Op.NADA)
+
+    m = _COND_DINERO.fullmatch(oracion)
+    if m:
+        instr = _compilar_oracion(m.group(3))
+        if instr is None:
+            return None
+        return instr[:3] + (int(Cond.DINERO_MENOR), _monto(m.group(1), m.group(2)), 0)
+
+    m = _COND_ACTIVOS.fullmatch(oracion)
+    if m:
+        activo = _activo(m.group(2))
+        instr  = _compilar_oracion(m.group(3))
+        if instr is None or activo is None:
+            return None
+        return instr[:3] + (int(Cond.ACTIVOS_MIN), int(m.group(1)), activo)
+
+    for rx, build in _REGLAS:
+        m = rx.fullmatch(oracion)
+        if m:
+            return build(m)
+    return None
+
+
+def compilar_carta(nombre: str, carril: int, nivel: int, cantidad: int,
+                   tipo: str, efecto: str, fila: int = 0) -> CompiledCard:
+    card = CompiledCard(str(nombre), int(carril), int(nivel), int(cantidad), str(tipo), fila)
+    if card.tipo == "guardian":
+        card.ops.append(_op(Op.GUARDAR))
+    elif card.tipo == "doble":
+        card.ops.append(_op(Op.DOBLE))
+
+    for oracion in _oraciones(str(efecto)):
+        instr = _compilar_oracion(oracion)
+        if instr is None:
+            card.pendientes.append(oracion)
+        elif instr[0] != Op.NADA or oracion == "sin efecto":
+            card.ops.append(instr)
+    return card
+
+
+# =============================================================================
+# TABLA COMPILADA (con caché por hash del CSV)
+# =============================================================================
+
+_TABLAS: dict[str, EffectTable] = {}
+
+
+def _huella(path: str) -> str:
+    h = hashlib.sha1(f"v{_GRAMMAR_VERSION}".encode())
+    with open(path, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def _cache_path(path: str, huella: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(path)), ".cache", f"efectos_{huella}.pkl")
+
+
+def compilar_fortunas(path: str = DEFAULT_FORTUNAS, usar_cache: bool = True) -> EffectTable:
+    """
+    Compila todas las cartas del CSV. La tabla se reutiliza (memoria y disco)
+    mientras el contenido del archivo y la versión de la gramática no cambien.
+    """
+    huella = _huella(path)
+    if usar_cache:
+        if huella in _TABLAS:
+            return _TABLAS[huella]
+        try:
+            with open(_cache_path(path, huella), "rb") as f:
+                tabla = pickle.load(f)
+            _TABLAS[huella] = tabla
+            return tabla
+        except (FileNotFoundError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+
+    df = leer_tabla(path)
+    cartas = [
+        compilar_carta(r.nombre, r.carril, r.nivel, r.cantidad, r.tipo, r.efecto, fila=i + 2)
+        for i, r in enumerate(df.itertuples(index=False))
+    ]
+
+    max_ops = max((len(c.ops) for c in cartas), default=0) or 1
+    ops = np.zeros((len(cartas), max_ops, 6), dtype=np.int64)
+    for i, c in enumerate(cartas):
+        if c.ops:
+            ops[i, :len(c.ops)] = c.ops
+
+    tabla = EffectTable(
+        huella     = huella,
+        cartas     = cartas,
+        ops        = ops,
+        ejecutable = np.array([c.ejecutable for c in cartas], dtype=bool),
+    )
+    _TABLAS[huella] = tabla
+
+    cache = _cache_path(path, huella)
+    os.makedirs(os.path.dirname(cache), exist_ok=True)
+    with open(cache, "wb") as f:
+        pickle.dump(tabla, f)
+    return tabla
+
+
+# =============================================================================
+# EJECUCIÓN VECTORIZADA
+# =============================================================================
+
+def aplicar_dinero(
+    tabla:     EffectTable,
+    ids:       np.ndarray,
+    dinero:    np.ndarray,
+    activos:   dict | None = None,
+    jugadores: int = 4,
+) -> np.ndarray:
+    """
+    Aplica el efecto monetario de un lote de robos de una vez.
+    ids: índices de carta (B,); dinero: dinero del jugador que roba (B,).
+    activos: {activo: int | (B,)} conteos para los "por cada"; 'jugador' toma
+             por defecto jugadores - 1.
+    Devuelve el dinero resultante (B,), nunca negativo. Cartas no ejecutables
+    y opcodes no monetarios no lo modifican.
+    """
+    ids    = np.asarray(ids)
+    dinero = np.asarray(dinero, dtype=np.float64).copy()
+    B      = len(ids)
+
+    counts = np.zeros((B, len(ACTIVOS)), dtype=np.float64)
+    counts[:, _ACTIVO_IDX["jugador"]] = jugadores - 1
+    for nombre, valor in (activos or {}).items():
+        counts[:, _ACTIVO_IDX[nombre]] = valor
+
+    ops  = tabla.ops[ids]                           # (B, max_ops, 6)
+    vivo = tabla.ejecutable[ids]
+    rows = np.arange(B)
+
+    for k in range(ops.shape[1]):
+        op, valor, activo, cond, cval, cact = (ops[:, k, j] for j in range(6))
+        cnt = counts[rows, activo]
+        pct = dinero * valor / 100
+        delta = np.select(
+            [op == Op.PAGAR, op == Op.RECIBIR, op == Op.PAGAR_POR, op == Op.RECIBIR_POR,
+             op == Op.PERDER_PCT, op == Op.TODOS_PAGAN, op == Op.TODOS_RECIBEN,
+             op == Op.TODOS_PIERDEN_PCT],
+            [-valor, valor, -valor * cnt, valor * cnt,
+             -pct, -valor, valor, -pct],
+            0.0,
+        )
+        ok = np.select(
+            [cond == Cond.DINERO_MENOR, cond == Cond.ACTIVOS_MIN],
+            [dinero < cval, counts[rows, cact] >= cval],
+            True,
+        )
+        dinero = np.maximum(dinero + np.where(ok & vivo, delta, 0.0), 0.0)
+    return dinero
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Compila los efectos de fortunas.csv a opcodes")
+    parser.add_argument("--input",    default=DEFAULT_FORTUNAS)
+    parser.add_argument("--verbose",  action="store_true", help="Lista los opcodes de cada carta")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    tabla = compilar_fortunas(args.input, usar_cache=not args.no_cache)
+    if args.verbose:
+        for c in tabla.cartas:
+            ops = ", ".join(
+                f"{Op(o).name}({v}{', ' + ACTIVOS[a] if o in (Op.PAGAR_POR, Op.RECIBIR_POR) else ''})"
+                + (f" si {Cond(cd).name}({cv})" if cd else "")
+                for o, v, a, cd, cv, _ in c.ops
+            )
+            print(f"[fortunaEffects] {'✓' if c.ejecutable else '·'} {c.nombre}: {ops or '—'}")
+
+    reportar(tabla.avisos(args.input), "fortunaEffects")
+    n_ok = int(tabla.ejecutable.sum())
+    print(f"[fortunaEffects] {n_ok}/{len(tabla.cartas)} cartas ejecutables "
+          f"({len(tabla.cartas) - n_ok} requieren reglas manuales)")
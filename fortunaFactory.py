@@ -15,19 +15,42 @@ Estructura:
   │           │  ★★★☆☆  nivel              │
   └───────────┴────────────────────────────┘
 
-Sprites: src/gw/gw_{carril}{nivel}.svg
+Sprites: src/gw/gw_{carril}{nivel}.svg (o .png)
   - carril 1=azul, 2=amarillo, 3=rojo
   - nivel 1-5
+  - Los PNG se empacan en src/gw/gw_atlas.png (+ gw_atlas.json con las
+    coordenadas) y las tarjetas usan background-position sobre el atlas:
+    una sola imagen por documento. Los SVG se referencian sueltos porque
+    Pillow no los rasteriza.
 
-CSV: props/fortunas.csv
+CSV: props/fortunas.csv  (o .parquet / .arrow, ver propsReader.py)
   columnas: nombre, carril, nivel, efecto, tipo, cantidad
+
+Hojas de impresión: repo/fortunas/hojas/hojas_{azul,amarillo,rojo}.html
+  Una por carril con cada carta repetida `cantidad` veces, 2×4 por página
+  Letter con marcas de corte; fuente, CSS y sprites declarados una vez.
+
+Uso:
+    python fortunaFactory.py                           # tarjetas + hojas
+    python fortunaFactory.py --hojas --por-fila 2 --filas 4
 """
 
 import os
 import re
 import json
+import hashlib
+import itertools
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
 import pandas as pd
 from bs4 import BeautifulSoup
+from PIL import Image
+
+from propsReader import leer_tabla
+from catalogValidator import validar_fortunas, CatalogError, CARRILES, NIVELES
 
 # =============================================================================
 # PATHS
@@ -52,8 +75,14 @@ def _safe_name(s: str) -> str:
     return re.sub(r'[^\w\-]', '_', s)
 
 
-def _get_colors() -> dict:
-    with open(_PALETTE_PATH, "r", encoding="utf-8") as f:
+def _get_colors(path: str = _PALETTE_PATH) -> dict:
+    return _get_colors_cached(path, os.path.getmtime(path))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_colors_cached(path: str, _mtime: float) -> dict:
+    # Compartido entre ediciones del mismo proceso; se relee si la paleta cambia
+    with open(path, "r", encoding="utf-8") as f:
         soup = BeautifulSoup(f, "html.parser")
     style = soup.find("style").string
     keys = [
@@ -63,13 +92,25 @@ def _get_colors() -> dict:
     return {k: style.split(f"--{k}:")[1].split(";")[0].strip() for k in keys}
 
 
-def _font_face_css() -> str:
+def _juego_rel(target: str, out_dir: str = _OUT_DIR) -> str:
+    """
+    Ruta de `target` relativa a juego_completo/fortunas/{carril}/, que es donde
+    gameFactory deja las cartas (hermano de repo/ en la raíz de la edición).
+    """
+    edition_root = os.path.dirname(os.path.dirname(os.path.abspath(out_dir)))
+    return os.path.relpath(
+        target, os.path.join(edition_root, "juego_completo", "fortunas", "azul")
+    ).replace(os.sep, "/")
+
+
+def _font_face_css(out_dir: str = _OUT_DIR) -> str:
+    """@font-face con la fuente relativa a la carpeta final de las cartas."""
     if not os.path.exists(_FONT_PATH):
         return ""
-    return """@font-face {
+    return f"""@font-face {{
     font-family: 'KabelHeavy';
-    src: url('../../../src/KabelHeavy.ttf') format('truetype');
-}"""
+    src: url('{_juego_rel(_FONT_PATH, out_dir)}') format('truetype');
+}}"""
 
 
 def _stars(nivel: int) -> str:
@@ -79,22 +120,6 @@ def _stars(nivel: int) -> str:
     return filled + empty
 
 
-def _sprite_path(carril: int, nivel: int) -> str:
-    """Ruta relativa al sprite desde repo/fortunas/"""
-    # Soporta .svg y .png — prioriza .svg si existe
-    for ext in ("svg", "png"):
-        if os.path.exists(os.path.join(_GW_DIR, f"gw_{carril}{nivel}.{ext}")):
-            return f"../../src/gw/gw_{carril}{nivel}.{ext}"
-    return f"../../src/gw/gw_{carril}{nivel}.png"  # fallback
-
-
-def _sprite_exists(carril: int, nivel: int) -> bool:
-    for ext in ("svg", "png"):
-        if os.path.exists(os.path.join(_GW_DIR, f"gw_{carril}{nivel}.{ext}")):
-            return True
-    return False
-
-
 def _lane_info(carril: int, colors: dict) -> tuple[str, str, str]:
     """Devuelve (nombre_carril, color_franja, color_fondo)"""
     if carril == 1:
@@ -113,73 +138,129 @@ def _nivel_color(nivel: int) -> str:
 
 
 # =============================================================================
-# GENERADOR DE TARJETA
+# ATLAS DE SPRITES
 # =============================================================================
 
-def generar_fortuna(row, force: bool = False, colors: dict = None):
+_ATLAS_NAME = "gw_atlas"
+_SPRITE_PX  = 80     # lado del sprite en la tarjeta
+_ATLAS_CELL = 160    # lado de cada celda en el atlas (2× para impresión)
+_ATLAS_LOCK = threading.Lock()   # editionBuilder --jobs: las ediciones comparten src/gw/
+
+
+@dataclass
+class SpriteAtlas:
+    png:    str | None = None                                # src/gw/gw_atlas.png
+    coords: dict = field(default_factory=dict)               # (carril, nivel) → (col, fila)
+    svgs:   dict = field(default_factory=dict)               # (carril, nivel) → archivo .svg
+
+    def faltantes(self) -> list[str]:
+        return [
+            f"gw_{c}{n}.svg" for c in CARRILES for n in NIVELES
+            if (c, n) not in self.coords and (c, n) not in self.svgs
+        ]
+
+
+def construir_atlas(gw_dir: str = _GW_DIR, force: bool = False) -> SpriteAtlas:
     """
-    Genera una tarjeta HTML para una carta de fortuna.
-    El nombre de archivo incluye carril y nivel: fortuna_{carril}_{safe_nombre}.html
+    Escanea src/gw una sola vez y empaca los sprites PNG en una cuadrícula
+    de 5 niveles × 3 carriles (gw_atlas.png + gw_atlas.json). El atlas solo
+    se reescribe si algún sprite es más nuevo o cambió el conjunto.
+    Si existen ambos, el .svg tiene prioridad sobre el .png.
+    Se arma bajo un lock (las ediciones en paralelo lo piden a la vez) y se
+    escribe a un temporal que se renombra: nadie lee un atlas a medias.
     """
-    if colors is None:
-        colors = _get_colors()
+    with _ATLAS_LOCK:
+        return _construir_atlas(gw_dir, force)
+
+
+def _construir_atlas(gw_dir: str, force: bool) -> SpriteAtlas:
+    try:
+        mtimes = {e.name: e.stat().st_mtime for e in os.scandir(gw_dir) if e.is_file()}
+    except FileNotFoundError:
+        mtimes = {}
+
+    atlas = SpriteAtlas()
+    pngs  = {}
+    for carril in CARRILES:
+        for nivel in NIVELES:
+            base = f"gw_{carril}{nivel}"
+            if f"{base}.svg" in mtimes:
+                atlas.svgs[(carril, nivel)] = f"{base}.svg"
+            elif f"{base}.png" in mtimes:
+                pngs[(carril, nivel)] = f"{base}.png"
+    if not pngs:
+        return atlas
+
+    atlas.png    = os.path.join(gw_dir, f"{_ATLAS_NAME}.png")
+    atlas.coords = {(c, n): (n - 1, c - 1) for c, n in pngs}
+    json_path    = os.path.join(gw_dir, f"{_ATLAS_NAME}.json")
+
+    mapa = {
+        "celda":   _ATLAS_CELL,
+        "sprites": {
+            f[:-4]: [col * _ATLAS_CELL, row * _ATLAS_CELL, _ATLAS_CELL, _ATLAS_CELL]
+            for (c, n), f in sorted(pngs.items())
+            for col, row in [atlas.coords[(c, n)]]
+        },
+    }
+    fresh = (
+        not force
+        and mtimes.get(f"{_ATLAS_NAME}.png", 0) >= max(mtimes[f] for f in pngs.values())
+        and os.path.exists(json_path)
+    )
+    if fresh:
+        with open(json_path, "r", encoding="utf-8") as f:
+            fresh = json.load(f) == mapa
+    if fresh:
+        return atlas
+
+    sheet = Image.new("RGBA", (len(NIVELES) * _ATLAS_CELL, len(CARRILES) * _ATLAS_CELL), (0, 0, 0, 0))
+    for key, fname in pngs.items():
+        with Image.open(os.path.join(gw_dir, fname)) as im:
+            im = im.convert("RGBA")
+            im.thumbnail((_ATLAS_CELL, _ATLAS_CELL))
+            col, row = atlas.coords[key]
+            sheet.paste(im, (col * _ATLAS_CELL + (_ATLAS_CELL - im.width) // 2,
+                             row * _ATLAS_CELL + (_ATLAS_CELL - im.height) // 2))
+    sufijo = f".{os.getpid()}.tmp"     # otro proceso puede estar escribiendo el suyo
+    sheet.save(atlas.png + sufijo, format="PNG", optimize=True)
+    os.replace(atlas.png + sufijo, atlas.png)
+    with open(json_path + sufijo, "w", encoding="utf-8") as f:
+        json.dump(mapa, f, indent=2)
+    os.replace(json_path + sufijo, json_path)
+    print(f"[fortunaFactory] Atlas de sprites: {len(pngs)} sprites → {os.path.relpath(atlas.png, _HERE)}")
+    return atlas
 
-    carril  = int(row["carril"])
-    nivel   = int(row["nivel"])
-    nombre  = str(row["nombre"])
-    efecto  = str(row["efecto"])
 
-    safe    = _safe_name(nombre)
-    out_path = os.path.join(_OUT_DIR, f"fortuna_{carril}_{safe}.html")
-
-    if not force and os.path.exists(out_path):
-        return
+# =============================================================================
+# PLANTILLA DE TARJETA (compartida por archivos sueltos y hojas de impresión)
+# =============================================================================
 
-    lane_name, band_color, bg_color = _lane_info(carril, colors)
-    border_color = colors["borderBlack"]
-    stars        = _stars(nivel)
-    star_color   = _nivel_color(nivel)
-    font_face    = _font_face_css()
-    sprite_path  = _sprite_path(carril, nivel)
-    has_sprite   = _sprite_exists(carril, nivel)
-
-    # Sprite: imagen si existe, placeholder de color si no
-    if has_sprite:
-        sprite_html = f'<img src="{sprite_path}" alt="nivel {nivel}" style="width:80px;height:80px;object-fit:contain;">'
-    else:
-        # Placeholder con número de nivel mientras no estén los sprites
-        sprite_html = f'''<div style="
-            width:80px;height:80px;
-            background:{band_color};
-            border-radius:50%;
-            display:flex;align-items:center;justify-content:center;
-            font-size:32px;font-weight:900;color:white;
-            opacity:0.7;
-        ">{nivel}</div>'''
-
-    html = f"""<!DOCTYPE html>
-<html lang="es">
-<head>
-<meta charset="UTF-8">
-{f'<style>{font_face}</style>' if font_face else ''}
-<style>
-    *, *::before, *::after {{
-        box-sizing: border-box; margin: 0; padding: 0;
-        font-family: 'KabelHeavy', 'Century Gothic', 'Futura', sans-serif;
-    }}
-    html, body {{
-        width: 350px; height: 200px;
-        overflow: hidden; background: transparent;
-    }}
+def _card_css(border_color: str, atlas_url: str | None = None) -> str:
+    """
+    CSS de .card. Los colores que dependen del carril/nivel entran como
+    variables (--band, --bg, --star) en el style de cada tarjeta, así que un
+    solo bloque sirve para todas las cartas de un documento.
+    atlas_url: URL de gw_atlas.png (se declara una vez; cada sprite solo
+    lleva su background-position).
+    """
+    atlas_css = f"""
+    .card__atlas {{
+        width: {_SPRITE_PX}px; height: {_SPRITE_PX}px;
+        background: url('{atlas_url}') no-repeat;
+        background-size: {len(NIVELES) * _SPRITE_PX}px {len(CARRILES) * _SPRITE_PX}px;
+    }}""" if atlas_url else ""
+    return f"""
     .card {{
+        -webkit-print-color-adjust: exact; print-color-adjust: exact;
         width: 350px; height: 200px;
         border: 2.5px solid {border_color};
         display: flex; flex-direction: column;
-        overflow: hidden; background: {bg_color};
+        overflow: hidden; background: var(--bg);
     }}
     .card__header {{
         width: 100%; height: 32px;
-        background: {band_color};
+        background: var(--band);
         border-bottom: 1.5px solid {border_color};
         display: flex; align-items: center; justify-content: center;
         flex-shrink: 0;
@@ -199,6 +280,14 @@ def generar_fortuna(row, force: bool = False, colors: dict = None):
         border-right: 1px solid {border_color}22;
         padding: 8px;
     }}
+    .card__placeholder {{
+        width: 80px; height: 80px;
+        background: var(--band);
+        border-radius: 50%;
+        display: flex; align-items: center; justify-content: center;
+        font-size: 32px; font-weight: 900; color: white;
+        opacity: 0.7;
+    }}
     .card__content {{
         flex: 1; padding: 10px 12px 8px;
         display: flex; flex-direction: column; justify-content: space-between;
@@ -221,90 +310,394 @@ def generar_fortuna(row, force: bool = False, colors: dict = None):
         display: flex; align-items: center; gap: 6px;
     }}
     .card__stars {{
-        font-size: 13px; color: {star_color};
+        font-size: 13px; color: var(--star);
         letter-spacing: 1px;
     }}
     .card__nivel-label {{
         font-size: 9px; opacity: 0.5;
         text-transform: uppercase; letter-spacing: 0.08em;
         color: {border_color};
-    }}
-</style>
-</head>
-<body>
-<div class="card">
+    }}{atlas_css}"""
+
+
+def _sprite_html(carril: int, nivel: int, atlas: SpriteAtlas, gw_url: str) -> str:
+    """Celda del atlas, SVG suelto o placeholder con el número de nivel."""
+    key = (carril, nivel)
+    if key in atlas.svgs:
+        return (f'<img src="{gw_url}/{atlas.svgs[key]}" alt="nivel {nivel}" '
+                f'style="width:80px;height:80px;object-fit:contain;">')
+    if key in atlas.coords:
+        col, row = atlas.coords[key]
+        return (f'<div class="card__atlas" role="img" aria-label="nivel {nivel}" '
+                f'style="background-position:-{col * _SPRITE_PX}px -{row * _SPRITE_PX}px"></div>')
+    return f'<div class="card__placeholder">{nivel}</div>'
+
+
+def _card_html(carril: int, nivel: int, nombre: str, efecto: str,
+               colors: dict, sprite: str) -> str:
+    """Markup de una tarjeta; `sprite` es el HTML de _sprite_html."""
+    lane_name, band_color, bg_color = _lane_info(carril, colors)
+    return f"""<div class="card" style="--band:{band_color};--bg:{bg_color};--star:{_nivel_color(nivel)}">
     <div class="card__header">
         <span>{lane_name}</span>
     </div>
     <div class="card__body">
         <div class="card__sprite">
-            {sprite_html}
+            {sprite}
         </div>
         <div class="card__content">
             <div class="card__nombre">{nombre}</div>
             <div class="card__efecto">{efecto}</div>
             <div class="card__nivel">
-                <span class="card__stars">{stars}</span>
+                <span class="card__stars">{_stars(nivel)}</span>
                 <span class="card__nivel-label">Nivel {nivel}</span>
             </div>
         </div>
     </div>
-</div>
-</body>
-</html>"""
+</div>"""
 
-    with open(out_path, "w", encoding="utf-8") as f:
+
+# =============================================================================
+# GENERADOR DE TARJETA
+# =============================================================================
+
+_CACHE_NAME = ".fortunas_cache.json"   # archivo → huella, dentro de cada out_dir
+
+
+class PlantillaFortuna:
+    """
+    Documento de tarjeta precompilado para una carpeta de salida: el <head>
+    (fuente + CSS) y el HTML de los 15 sprites se arman una sola vez y cada
+    carta solo rellena su <div class="card">.
+    """
+
+    def __init__(self, colors: dict, out_dir: str, atlas: SpriteAtlas):
+        font_face = _font_face_css(out_dir)
+        atlas_url = _juego_rel(atlas.png, out_dir) if atlas.png else None
+        gw_url    = _juego_rel(_GW_DIR, out_dir)
+
+        self.colors  = colors
+        self.sprites = {
+            (c, n): _sprite_html(c, n, atlas, gw_url) for c in CARRILES for n in NIVELES
+        }
+        self.head = f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="UTF-8">
+{f'<style>{font_face}</style>' if font_face else ''}
+<style>
+    *, *::before, *::after {{
+        box-sizing: border-box; margin: 0; padding: 0;
+        font-family: 'KabelHeavy', 'Century Gothic', 'Futura', sans-serif;
+    }}
+    html, body {{
+        width: 350px; height: 200px;
+        overflow: hidden; background: transparent;
+    }}{_card_css(colors["borderBlack"], atlas_url)}
+</style>
+</head>
+<body>
+"""
+        self.tail = "\n</body>\n</html>"
+        # Cambia si cambian paleta, fuente, atlas o el propio template
+        self.huella = hashlib.sha1(
+            (self.head + self.tail + json.dumps(sorted(colors.items()))
+             + "".join(self.sprites.values())).encode("utf-8")
+        ).hexdigest()
+
+    def huella_carta(self, carril: int, nivel: int, nombre: str, efecto: str) -> str:
+        return hashlib.sha1(
+            "\x1f".join((self.huella, str(carril), str(nivel), nombre, efecto)).encode("utf-8")
+        ).hexdigest()
+
+    def render(self, carril: int, nivel: int, nombre: str, efecto: str) -> str:
+        return (self.head
+                + _card_html(carril, nivel, nombre, efecto, self.colors, self.sprites[(carril, nivel)])
+                + self.tail)
+
+
+def _leer_cache(out_dir: str) -> dict:
+    try:
+        with open(os.path.join(out_dir, _CACHE_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _escribir(item: tuple[str, str]):
+    path, html = item
+    with open(path, "w", encoding="utf-8") as f:
         f.write(html)
 
 
+def renderizar_fortunas(
+    df:       pd.DataFrame,
+    out_dir:  str  = _OUT_DIR,
+    colors:   dict = None,
+    atlas:    SpriteAtlas = None,
+    force:    bool = False,
+    workers:  int  = 8,
+    completo: bool = False,
+) -> dict:
+    """
+    Motor de render masivo. Recorre las columnas tipadas con itertuples,
+    rellena la plantilla precompilada y solo escribe (en paralelo) las
+    cartas cuya huella — texto, carril, nivel, paleta, sprites, template —
+    cambió desde el último build.
+    completo: df es el mazo entero; las huellas de cartas que ya no
+    existen se descartan del caché.
+    Devuelve {'escritas', 'sin_cambios'}.
+    """
+    colors    = colors or _get_colors()
+    atlas     = atlas or construir_atlas()
+    plantilla = PlantillaFortuna(colors, out_dir, atlas)
+    os.makedirs(out_dir, exist_ok=True)
+
+    previo     = _leer_cache(out_dir)
+    cache      = {} if force else previo
+    existentes = {e.name for e in os.scandir(out_dir)}
+    huellas    = {} if completo else dict(previo)
+    pendientes = []
+
+    for row in df.itertuples(index=False):
+        carril, nivel = int(row.carril), int(row.nivel)
+        nombre, efecto = str(row.nombre), str(row.efecto)
+        fname = f"fortuna_{carril}_{_safe_name(nombre)}.html"
+        h     = plantilla.huella_carta(carril, nivel, nombre, efecto)
+        huellas[fname] = h
+        if cache.get(fname) == h and fname in existentes:
+            continue
+        pendientes.append((os.path.join(out_dir, fname),
+                           plantilla.render(carril, nivel, nombre, efecto)))
+
+    if pendientes:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pendientes)))) as executor:
+            list(executor.map(_escribir, pendientes))
+
+    _escribir((os.path.join(out_dir, _CACHE_NAME), json.dumps(huellas, indent=0, sort_keys=True)))
+    return {"escritas": len(pendientes), "sin_cambios": len(df) - len(pendientes)}
+
+
+def generar_fortuna(row, force: bool = False, colors: dict = None, out_dir: str = None,
+                    atlas: SpriteAtlas = None):
+    """
+    Genera una tarjeta HTML para una carta de fortuna.
+    El nombre de archivo incluye carril y nivel: fortuna_{carril}_{safe_nombre}.html
+    Se reescribe solo si cambió su contenido (ver renderizar_fortunas).
+    """
+    renderizar_fortunas(pd.DataFrame([dict(row)]), out_dir=out_dir or _OUT_DIR,
+                        colors=colors, atlas=atlas, force=force, workers=1)
+
+
 # =============================================================================
 # CARGA Y GENERACIÓN MASIVA
 # =============================================================================
 
 def cargar_fortunas(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
-    required = ["nombre", "carril", "nivel", "efecto", "tipo", "cantidad"]
-    for col in required:
-        if col not in df.columns:
-            raise ValueError(f"Falta columna requerida en fortunas CSV: '{col}'")
+    """Carga fortunas desde CSV, Excel, Parquet o Arrow IPC (ver propsReader)."""
+    df = leer_tabla(path)
+    # Validación vectorizada: reporta todas las filas malas de una vez
+    # (CatalogError es ValueError) en vez de fallar en el primer astype(int)
+    issues = validar_fortunas(df, path=path)
+    if any(i.nivel == "error" for i in issues):
+        raise CatalogError(issues)
     df["carril"]   = df["carril"].astype(int)
     df["nivel"]    = df["nivel"].astype(int)
     df["cantidad"] = df["cantidad"].astype(int)
     return df
 
 
-def generar_todas(csv_path: str, force: bool = False):
-    """Genera todas las tarjetas de fortuna desde el CSV."""
+def generar_todas(csv_path: str, force: bool = False, out_dir: str = None,
+                  colors: dict = None, hojas: bool = True):
+    """
+    Genera todas las tarjetas de fortuna desde el CSV.
+    out_dir: carpeta de salida (default repo/fortunas; otra para ediciones).
+    hojas: además escribe las hojas de impresión por carril (out_dir/hojas).
+    """
     df     = cargar_fortunas(csv_path)
-    colors = _get_colors()
+    colors = colors or _get_colors()
     total  = len(df)
+    out_dir = out_dir or _OUT_DIR
+    os.makedirs(out_dir, exist_ok=True)
 
-    # Resumen de sprites faltantes
-    faltantes = []
-    for carril in [1, 2, 3]:
-        for nivel in [1, 2, 3, 4, 5]:
-            if not _sprite_exists(carril, nivel):
-                faltantes.append(f"gw_{carril}{nivel}.svg")
+    # Un solo escaneo de src/gw por build (atlas + resumen de faltantes)
+    atlas     = construir_atlas()
+    faltantes = atlas.faltantes()
     if faltantes:
         print(f"[fortunaFactory] ⚠️  Sprites faltantes en src/gw/ (se usará placeholder):")
         for f in faltantes:
             print(f"   {f}")
 
-    for i, (_, row) in enumerate(df.iterrows(), 1):
-        generar_fortuna(row, force=force, colors=colors)
+    res = renderizar_fortunas(df, out_dir=out_dir, colors=colors, atlas=atlas,
+                              force=force, completo=True)
 
-    print(f"[fortunaFactory] {total} tarjetas de fortuna generadas en repo/fortunas/")
+    print(
+        f"[fortunaFactory] {total} tarjetas de fortuna en {os.path.relpath(out_dir, _HERE)}/ "
+        f"({res['escritas']} escritas · {res['sin_cambios']} sin cambios)"
+    )
     print(f"[fortunaFactory] Distribución:")
     for carril, nombre in [(1, "Azul"), (2, "Amarillo"), (3, "Rojo")]:
         sub = df[df["carril"] == carril]
         copias = sub["cantidad"].sum()
         print(f"   Carril {carril} ({nombre}): {len(sub)} tipos · {copias} copias")
 
+    if hojas:
+        generar_hojas(csv_path, out_dir=out_dir, colors=colors, df=df, atlas=atlas)
+
+
+# =============================================================================
+# HOJAS DE IMPRESIÓN (una por carril, N-up con marcas de corte)
+# =============================================================================
+
+# Carta Letter a 96 px/in; las tarjetas miden 350×200 px
+_PAGE_W, _PAGE_H = 816, 1056
+_CARD_W, _CARD_H = 350, 200
+_CUT_LEN, _CUT_GAP = 18, 4          # largo de la marca y separación con la carta
+
+_LANE_SLUG = {1: "azul", 2: "amarillo", 3: "rojo"}
+
+
+def _copias(df: pd.DataFrame, colors: dict, sprites: dict):
+    """
+    Expande perezosamente las copias de cada carta según `cantidad`: el HTML
+    se arma una vez por carta y se repite sin materializar la baraja entera.
+    """
+    for row in df.itertuples(index=False):
+        card = _card_html(row.carril, row.nivel, str(row.nombre), str(row.efecto),
+                          colors, sprites[(row.carril, row.nivel)])
+        yield from itertools.repeat(card, int(row.cantidad))
+
+
+def _cut_marks(cols: int, rows: int, left: float, top: float) -> str:
+    """Marcas de corte en el margen, alineadas con cada línea de la cuadrícula."""
+    right  = left + cols * _CARD_W
+    bottom = top  + rows * _CARD_H
+    marks  = []
+    for i in range(cols + 1):
+        x = left + i * _CARD_W
+        for y in (top - _CUT_GAP - _CUT_LEN, bottom + _CUT_GAP):
+            marks.append(f'<i class="cut cut--v" style="left:{x}px;top:{y}px"></i>')
+    for j in range(rows + 1):
+        y = top + j * _CARD_H
+        for x in (left - _CUT_GAP - _CUT_LEN, right + _CUT_GAP):
+            marks.append(f'<i class="cut cut--h" style="left:{x}px;top:{y}px"></i>')
+    return "".join(marks)
+
+
+def generar_hoja_carril(df: pd.DataFrame, carril: int, out_path: str,
+                        colors: dict, cols: int = 2, rows: int = 4,
+                        atlas: SpriteAtlas = None) -> int:
+    """
+    Escribe un documento con todas las copias de un carril, `cols`×`rows`
+    cartas por página. Fuente, CSS y sprites se declaran una sola vez.
+    Devuelve el número de cartas impresas.
+    """
+    left = (_PAGE_W - cols * _CARD_W) / 2
+    top  = (_PAGE_H - rows * _CARD_H) / 2
+    if min(left, top) < _CUT_GAP + _CUT_LEN:
+        raise ValueError(f"{cols}×{rows} tarjetas no caben en la hoja con marcas de corte")
+
+    # juego_completo/fortunas/hojas tiene la misma profundidad que .../azul
+    fortunas_dir = os.path.dirname(os.path.dirname(out_path))
+    atlas     = atlas or construir_atlas()
+    font_face = _font_face_css(fortunas_dir)
+    gw_url    = _juego_rel(_GW_DIR, fortunas_dir)
+    atlas_url = _juego_rel(atlas.png, fortunas_dir) if atlas.png else None
+    sprites   = {
+        (carril, nivel): _sprite_html(carril, nivel, atlas, gw_url) for nivel in NIVELES
+    }
+
+    lane_name = _lane_info(carril, colors)[0]
+    marks     = _cut_marks(cols, rows, left, top)
+    per_page  = cols * rows
+    cards     = _copias(df[df["carril"] == carril], colors, sprites)
+
+    total = pages = 0
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="UTF-8">
+<title>{lane_name} — hojas de impresión</title>
+{f'<style>{font_face}</style>' if font_face else ''}
+<style>
+    *, *::before, *::after {{
+        box-sizing: border-box; margin: 0; padding: 0;
+        font-family: 'KabelHeavy', 'Century Gothic', 'Futura', sans-serif;
+    }}
+    @page {{ size: letter; margin: 0; }}
+    body {{ background: #777; }}
+    .sheet {{
+        position: relative;
+        width: {_PAGE_W}px; height: {_PAGE_H}px;
+        margin: 16px auto; background: white;
+        break-after: page; page-break-after: always;
+    }}
+    .sheet:last-child {{ break-after: auto; page-break-after: auto; }}
+    .grid {{
+        position: absolute; left: {left}px; top: {top}px;
+        display: grid;
+        grid-template-columns: repeat({cols}, {_CARD_W}px);
+        grid-auto-rows: {_CARD_H}px;
+    }}
+    .cut {{ position: absolute; display: block; background: #000; }}
+    .cut--v {{ width: 0.5px; height: {_CUT_LEN}px; }}
+    .cut--h {{ width: {_CUT_LEN}px; height: 0.5px; }}
+    @media print {{
+        body {{ background: none; }}
+        .sheet {{ margin: 0; }}
+    }}{_card_css(colors["borderBlack"], atlas_url)}
+</style>
+</head>
+<body>
+""")
+        for page in iter(lambda: list(itertools.islice(cards, per_page)), []):
+            f.write(f'<section class="sheet">{marks}<div class="grid">\n')
+            f.write("\n".join(page))
+            f.write("\n</div></section>\n")
+            total += len(page)
+            pages += 1
+        f.write("</body>\n</html>")
+
+    print(f"[fortunaFactory] Hoja {os.path.basename(out_path)}: {total} cartas en {pages} página(s)")
+    return total
+
+
+def generar_hojas(csv_path: str, out_dir: str = None, colors: dict = None,
+                  cols: int = 2, rows: int = 4, df: pd.DataFrame = None,
+                  atlas: SpriteAtlas = None) -> dict:
+    """
+    Genera hojas_{azul,amarillo,rojo}.html en {out_dir}/hojas (default
+    repo/fortunas/hojas). Devuelve {carril: cartas impresas}.
+    """
+    df      = cargar_fortunas(csv_path) if df is None else df
+    colors  = colors or _get_colors()
+    atlas   = atlas or construir_atlas()
+    hojas   = os.path.join(out_dir or _OUT_DIR, "hojas")
+    os.makedirs(hojas, exist_ok=True)
+    return {
+        carril: generar_hoja_carril(
+            df, carril, os.path.join(hojas, f"hojas_{slug}.html"), colors, cols, rows, atlas
+        )
+        for carril, slug in _LANE_SLUG.items()
+    }
+
 
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Generador de tarjetas de fortuna")
     parser.add_argument("--input",  default=os.path.join("props", "fortunas.csv"))
     parser.add_argument("--force",  action="store_true")
+    parser.add_argument("--hojas",  action="store_true",
+                        help="Solo genera las hojas de impresión por carril")
+    parser.add_argument("--por-fila", type=int, default=2, help="Tarjetas por fila (default: 2)")
+    parser.add_argument("--filas",    type=int, default=4, help="Filas por hoja (default: 4)")
     args = parser.parse_args()
-    generar_todas(args.input, force=args.force)
\ No newline at end of file
+    try:
+        if args.hojas:
+            generar_hojas(args.input, cols=args.por_fila, rows=args.filas)
+        else:
+            generar_todas(args.input, force=args.force)
+    except CatalogError as e:
+        print(f"[fortunaFactory] ❌ {e}")
+        raise SystemExit(1)
\ No newline at end of file
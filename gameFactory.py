@@ -12,7 +12,8 @@ Estructura de salida:
   ├── fortunas/
   │   ├── azul/    *.html
   │   ├── amarillo/ *.html
-  │   └── rojo/    *.html
+  │   ├── rojo/    *.html
+  │   └── hojas/   hojas_{carril}.html  (mazos completos para imprimir)
   ├── billetes/
   │   ├── BILLETES IMPRESIÓN.pdf
   │   └── OROS IMPRESIÓN.pdf
@@ -20,21 +21,40 @@ Estructura de salida:
   │   └── instructivo_metropoly.html
   └── indice.html   ← página de inicio con links a todo
 
+La generación corre en el mismo proceso como un grafo de etapas
+(buildGraph.py): casillas, tarjetas, tablero, fortunas e instructivo en
+paralelo donde se puede, omitiendo las que no tienen cambios, y al final el
+ensamblado.
+
 Uso:
-  python gameFactory.py              # solo ensambla
+  python gameFactory.py              # regenera lo que cambió y ensambla
   python gameFactory.py --force      # regenera todo antes de ensamblar
   python gameFactory.py --skip-gen   # salta la generación, solo copia
+  python gameFactory.py --copiar     # copias independientes (sin hardlinks)
+  python gameFactory.py --bundle juego.zip [--sin-directorio]   # archivo para la imprenta
+
+juego_completo/ no se borra: se reconcilia con repo/ (solo se reescribe lo
+que cambió y se borran los huérfanos).
 """
 
 import os
+import html
 import shutil
+import hashlib
 import argparse
-import subprocess
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 _HERE = Path(__file__).parent
 _OUT  = _HERE / "juego_completo"
 
+# Título de la edición ZMG en la raíz (las demás lo toman de src/ediciones.json)
+TITULO = "Metropoly ZMG"
+
+_SUBDIRS = ["tablero", "tarjetas", "fortunas/azul", "fortunas/amarillo",
+            "fortunas/rojo", "fortunas/hojas", "billetes", "instructivo"]
+_FICLONE = 0x40049409       # ioctl de Linux para reflink (btrfs, XFS)
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # HELPERS
@@ -44,56 +64,180 @@ def _mkdir(path: Path):
     path.mkdir(parents=True, exist_ok=True)
 
 
-def _copy(src: Path, dst: Path):
-    """Copia src → dst, crea directorios intermedios si faltan."""
+def _copy(src: Path, dst: Path, plan: dict = None):
+    """
+    Copia src → dst, crea directorios intermedios si faltan.
+    Con `plan` solo lo registra ({dst: src}) para _sincronizar.
+    """
+    if plan is not None:
+        plan[dst] = src
+        return dst
     dst.parent.mkdir(parents=True, exist_ok=True)
     shutil.copy2(src, dst)
     return dst
 
 
-def _copy_dir(src: Path, dst: Path, pattern: str = "*.html"):
-    """Copia todos los archivos que coincidan con pattern de src a dst."""
-    _mkdir(dst)
+def _copy_dir(src: Path, dst: Path, pattern: str = "*.html", plan: dict = None):
+    """Copia (o registra en `plan`) los archivos que coincidan con pattern de src a dst."""
     copied = 0
     for f in sorted(src.glob(pattern)):
-        shutil.copy2(f, dst / f.name)
+        _copy(f, dst / f.name, plan)
         copied += 1
     return copied
 
 
-def _run(cmd: list, label: str):
-    print(f"  [gameFactory] {label}...")
-    result = subprocess.run(cmd, capture_output=True, text=True, cwd=_HERE)
-    if result.returncode != 0:
-        print(f"  ⚠️  Error en {label}:")
-        print(result.stderr[-500:] if result.stderr else "(sin stderr)")
-    return result.returncode == 0
+# ─────────────────────────────────────────────────────────────────────────────
+# SINCRONIZACIÓN INCREMENTAL
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _al_dia(src: Path, dst: Path, enlazar: bool = True) -> bool:
+    """
+    dst ya es src: mismo inodo (enlace), o mismo tamaño y mtime, o mismo
+    contenido. Sin `enlazar`, un enlace se rehace como copia independiente.
+    """
+    try:
+        d = dst.stat()
+    except FileNotFoundError:
+        return False
+    s = src.stat()
+    if (s.st_dev, s.st_ino) == (d.st_dev, d.st_ino):
+        return enlazar
+    if s.st_size != d.st_size:
+        return False
+    if s.st_mtime_ns == d.st_mtime_ns:
+        return True
+    if _sha1(src) == _sha1(dst):
+        os.utime(dst, ns=(s.st_atime_ns, s.st_mtime_ns))   # la próxima vez basta el mtime
+        return True
+    return False
+
+
+def _sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    try:
+        import fcntl
+    except ImportError:          # Windows
+        return False
+    try:
+        with open(src, "rb") as fs, open(dst, "wb") as fd:
+            fcntl.ioctl(fd.fileno(), _FICLONE, fs.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def _transferir(src: Path, dst: Path, enlazar: bool) -> str:
+    """Pone src en dst (reemplazo atómico): hardlink, reflink o copia, en ese orden."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(dst.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    modo = "copia"
+    if enlazar:
+        try:
+            os.link(src, tmp)
+            modo = "enlace"
+        except OSError:          # otro sistema de archivos o sin soporte
+            if _reflink(src, tmp):
+                modo = "reflink"
+    if modo == "copia":
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+    return modo
+
+
+def _sincronizar(out: Path, plan: dict, textos: dict, enlazar: bool = True,
+                 workers: int = 8) -> dict:
+    """
+    Reconcilia `out` con el plan: copia solo lo que cambió, escribe los
+    textos generados solo si difieren y borra los huérfanos.
+    plan: {dst: src}; textos: {dst: contenido}. Devuelve conteos por acción.
+    """
+    conteo = {"enlace": 0, "reflink": 0, "copia": 0, "sin_cambios": 0, "borrados": 0}
+
+    def _uno(item):
+        dst, src = item
+        return "sin_cambios" if _al_dia(src, dst, enlazar) else _transferir(src, dst, enlazar)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for modo in executor.map(_uno, sorted(plan.items())):
+            conteo[modo] += 1
+
+    for dst, texto in textos.items():
+        try:
+            igual = dst.read_text(encoding="utf-8") == texto
+        except (FileNotFoundError, UnicodeDecodeError):
+            igual = False
+        if igual:
+            conteo["sin_cambios"] += 1
+        else:
+            dst.write_text(texto, encoding="utf-8")
+            conteo["copia"] += 1
+
+    # Huérfanos: archivos que ya no vienen de ninguna fuente
+    esperados = set(plan) | set(textos)
+    for f in sorted(out.rglob("*"), reverse=True):
+        if f.is_file() and f not in esperados:
+            f.unlink()
+            conteo["borrados"] += 1
+        elif f.is_dir() and not any(f.iterdir()) and \
+                f.relative_to(out).as_posix() not in _SUBDIRS:
+            f.rmdir()
+    return conteo
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # GENERADORES
 # ─────────────────────────────────────────────────────────────────────────────
 
-def regenerar_todo(force: bool = False):
-    """Corre generator.py y fortunaFactory.py para asegurar que todo está al día."""
-    args = ["python", "generator.py"]
-    if force:
-        args.append("--force")
-    _run(args, "generator.py")
-
-    args2 = ["python", "fortunaFactory.py"]
-    if force:
-        args2.append("--force")
-    _run(args2, "fortunaFactory.py")
-
-    _run(["python", "instructivoFactory.py"], "instructivoFactory.py")
+def regenerar_todo(force: bool = False, jobs: int = 4, workers: int = 1,
+                   ensamblar: bool = True, **opciones) -> bool:
+    """
+    Construye la edición ZMG en proceso con el grafo de buildGraph (casillas,
+    tarjetas, tablero, fortunas, instructivo y, con `ensamblar`, juego_completo/).
+    opciones: enlazar / bundle / directorio / libro, se pasan a ensamblar().
+    Devuelve True si todas las etapas terminaron o se omitieron sin cambios.
+    """
+    from buildGraph import etapas_edicion, construir, reportar
+    etapas = etapas_edicion(force=force, workers=workers, ensamblar=ensamblar,
+                            label="gameFactory", **opciones)
+    resultados = construir(etapas, jobs=jobs, force=force, label="gameFactory",
+                           estado_path=str(_HERE / "repo" / ".build_state.json"))
+    return reportar(resultados, "gameFactory")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # ÍNDICE HTML
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _build_index(stats: dict) -> str:
+def _build_index(stats: dict, titulo: str = TITULO) -> str:
+    titulo = html.escape(titulo)
+    libro = ""
+    if stats.get("libro"):
+        from printBook import LIBRO_NOMBRE
+        libro = f"""
+  <a class="section-card" href="{LIBRO_NOMBRE}">
+    <div class="sc-header">
+      <div class="sc-icon">🖨️</div>
+      <div>
+        <div class="sc-title">Libro de impresión</div>
+        <div class="sc-sub">Instructivo · tarjetas · fortunas</div>
+      </div>
+    </div>
+    <div class="sc-body">
+      <div class="sc-stat"><span>Piezas</span><strong>{stats['libro']['piezas']}</strong></div>
+      <div class="sc-stat"><span>Un solo archivo</span><strong>{stats['libro']['bytes'] / 1e6:.1f} MB</strong></div>
+    </div>
+  </a>
+"""
     return f"""<!DOCTYPE html>
 <html lang="es">
 <head>
@@ -203,7 +347,7 @@ def _build_index(stats: dict) -> str:
     <div class="ring y"></div>
     <div class="ring r"></div>
   </div>
-  <p>Directorio de juego completo · ZMG Edition · listo para imprimir</p>
+  <p>Directorio de juego completo · {titulo} · listo para imprimir</p>
 </div>
 
 <div class="grid">
@@ -260,6 +404,7 @@ def _build_index(stats: dict) -> str:
       <a class="sc-link" href="fortunas/azul/">Azul →</a>
       <a class="sc-link" href="fortunas/amarillo/">Amarillo →</a>
       <a class="sc-link" href="fortunas/rojo/">Rojo →</a>
+      <a class="sc-link" href="fortunas/hojas/">Imprimir →</a>
     </div>
   </div>
 
@@ -296,10 +441,10 @@ def _build_index(stats: dict) -> str:
       <div class="sc-stat"><span>Dinero inicial</span><strong>$25,000,000</strong></div>
     </div>
   </a>
-
+{libro}
 </div>
 
-<footer>Metropoly · ZMG Edition · iroFactory</footer>
+<footer>{titulo} · iroFactory</footer>
 </body>
 </html>"""
 
@@ -308,51 +453,77 @@ def _build_index(stats: dict) -> str:
 # ENSAMBLADO PRINCIPAL
 # ─────────────────────────────────────────────────────────────────────────────
 
-def ensamblar():
-    print("[gameFactory] Ensamblando directorio de juego...")
-
-    # Limpiar y crear estructura
-    if _OUT.exists():
-        shutil.rmtree(_OUT)
-    for sub in ["tablero", "tarjetas", "fortunas/azul", "fortunas/amarillo",
-                "fortunas/rojo", "billetes", "instructivo"]:
-        _mkdir(_OUT / sub)
+def ensamblar(repo_dir: Path = None, out_dir: Path = None, props_path: Path = None,
+              docs: bool = True, enlazar: bool = True, bundle: Path = None,
+              directorio: bool = True, libro: bool = False, fortunas_path: Path = None,
+              titulo: str = TITULO):
+    """
+    Ensambla juego_completo/ a partir de repo/.
+    repo_dir / out_dir / props_path: None = los de la edición ZMG en la raíz.
+    docs: actualiza docs/board.html y docs/samples (solo la edición principal).
+    enlazar: usa hardlinks (o reflinks) si origen y destino comparten sistema
+             de archivos; False = siempre copias independientes.
+    Solo se reescriben los archivos que cambiaron y se borran los huérfanos.
+    bundle: además escribe el juego en un .zip / .tar / .tar.gz reproducible,
+            leyendo cada archivo de su origen (bundleWriter); la fuente y los
+            sprites que los HTML toman de src/ van dentro, en recursos/.
+    directorio: False = no toca juego_completo/ (solo el bundle).
+    libro: además arma libro_metropoly.html, el instructivo, las tarjetas y
+           las fortunas (repetidas según fortunas_path) en un solo documento
+           para imprimir (printBook).
+    titulo: nombre de la edición en el índice y en el libro de impresión.
+    """
+    repo_dir   = Path(repo_dir)   if repo_dir   else _HERE / "repo"
+    out        = Path(out_dir)    if out_dir    else _OUT
+    props_path = Path(props_path) if props_path else _HERE / "props" / "zmg.csv"
+    fortunas_path = Path(fortunas_path) if fortunas_path else _HERE / "props" / "fortunas.csv"
+
+    print(f"[gameFactory] Ensamblando directorio de juego ({out})...")
+
+    # Crear estructura; el contenido se reconcilia al final (_sincronizar)
+    if directorio:
+        for sub in _SUBDIRS:
+            _mkdir(out / sub)
 
     stats = {}
+    plan  = {}
 
     # ── Tablero ────────────────────────────────────────────────────────────
-    tablero_src = _HERE / "repo" / "tableros" / "tablero_metropoly.html"
+    tablero_src = repo_dir / "tableros" / "tablero_metropoly.html"
     if tablero_src.exists():
-        _copy(tablero_src, _OUT / "tablero" / "tablero_metropoly.html")
+        _copy(tablero_src, out / "tablero" / "tablero_metropoly.html", plan)
         print(f"  ✓ Tablero")
     else:
         print(f"  ⚠️  Tablero no encontrado: {tablero_src}")
 
     # ── Tarjetas ───────────────────────────────────────────────────────────
-    tarjetas_src = _HERE / "repo" / "tarjetas"
-    n = _copy_dir(tarjetas_src, _OUT / "tarjetas")
+    tarjetas_src = repo_dir / "tarjetas"
+    n = _copy_dir(tarjetas_src, out / "tarjetas", plan=plan)
     stats["tarjetas"] = n
     print(f"  ✓ Tarjetas: {n} archivos")
 
-    # Calcular estadísticas de tarjetas desde CSV
+    # Calcular estadísticas de tarjetas desde el catálogo indexado
     try:
-        import pandas as pd
-        df = pd.read_csv(_HERE / "props" / "zmg.csv")
-        stats["props"]    = int((df["tipo"] == 1).sum())
-        stats["empresas"] = int(df["tipo"].isin([2, 16]).sum())
-        stats["otros"]    = int(~df["tipo"].isin([1, 2, 16]).sum())
+        from tileCatalog import open_catalog
+        counts = open_catalog(str(props_path)).tipo_counts()
+        stats["props"]    = counts.get(1, 0)
+        stats["empresas"] = counts.get(2, 0) + counts.get(16, 0)
+        stats["otros"]    = sum(counts.values()) - stats["props"] - stats["empresas"]
     except Exception:
         pass
 
     # ── Fortunas ───────────────────────────────────────────────────────────
-    fortunas_src = _HERE / "repo" / "fortunas"
-    n1 = _copy_dir(fortunas_src, _OUT / "fortunas" / "azul",    "fortuna_1_*.html")
-    n2 = _copy_dir(fortunas_src, _OUT / "fortunas" / "amarillo","fortuna_2_*.html")
-    n3 = _copy_dir(fortunas_src, _OUT / "fortunas" / "rojo",    "fortuna_3_*.html")
+    fortunas_src = repo_dir / "fortunas"
+    n1 = _copy_dir(fortunas_src, out / "fortunas" / "azul",    "fortuna_1_*.html", plan)
+    n2 = _copy_dir(fortunas_src, out / "fortunas" / "amarillo","fortuna_2_*.html", plan)
+    n3 = _copy_dir(fortunas_src, out / "fortunas" / "rojo",    "fortuna_3_*.html", plan)
     stats["fortunas_azul"]    = n1
     stats["fortunas_amarillo"] = n2
     stats["fortunas_rojo"]    = n3
     print(f"  ✓ Fortunas: {n1} azul · {n2} amarillo · {n3} rojo")
+    nh = _copy_dir(fortunas_src / "hojas", out / "fortunas" / "hojas", "hojas_*.html", plan)
+    if nh:
+        print(f"  ✓ Hojas de impresión: {nh}")
 
     # ── Billetes ───────────────────────────────────────────────────────────
     feria_src = _HERE / "src" / "feria"
@@ -360,22 +531,74 @@ def ensamblar():
     for nombre in ["BILLETES IMPRESIÓN.pdf", "OROS IMPRESIÓN.pdf"]:
         src = feria_src / nombre
         if src.exists():
-            _copy(src, _OUT / "billetes" / nombre)
+            _copy(src, out / "billetes" / nombre, plan)
             billetes_copied += 1
         else:
             print(f"  ⚠️  Billete no encontrado: {src}")
     print(f"  ✓ Billetes: {billetes_copied}/2 PDFs")
 
     # ── Instructivo ────────────────────────────────────────────────────────
-    inst_src = _HERE / "repo" / "instructivo" / "instructivo_metropoly.html"
+    inst_src = repo_dir / "instructivo" / "instructivo_metropoly.html"
     if inst_src.exists():
-        _copy(inst_src, _OUT / "instructivo" / "instructivo_metropoly.html")
+        _copy(inst_src, out / "instructivo" / "instructivo_metropoly.html", plan)
         print(f"  ✓ Instructivo")
     else:
         print(f"  ⚠️  Instructivo no encontrado: {inst_src}")
 
+    if docs:
+        _publicar_docs(repo_dir)
+
+    textos = {}
+    if libro:
+        from printBook import LIBRO_NOMBRE, construir_libro, copias_fortunas
+        docs_html = {dst.relative_to(out): src for dst, src in plan.items() if dst.suffix == ".html"}
+        copias = copias_fortunas(fortunas_path) if fortunas_path.exists() else {}
+        textos[out / LIBRO_NOMBRE], stats["libro"] = construir_libro(
+            docs_html, copias, out, titulo=f"{titulo} — Libro de impresión")
+        r = stats["libro"]
+        print(f"  ✓ Libro de impresión: {r['piezas']} piezas · {r['estilos']} hojas de estilo · "
+              f"{r['recursos']} imágenes compartidas · {r['bytes'] / 1e6:.1f} MB")
+        for f in r["faltantes"]:
+            print(f"  ⚠️  Recurso del libro no encontrado: {f}")
+        for imp in r["imports"]:
+            print(f"  ❌ @import alterado en el libro: {imp}")
+
+    textos[out / "indice.html"] = _build_index(stats, titulo)
+    print(f"  ✓ Índice generado")
+
+    if bundle:
+        from bundleWriter import escribir_bundle, autocontenido
+        entradas = {dst.relative_to(out): src for dst, src in plan.items()}
+        entradas.update((dst.relative_to(out), texto) for dst, texto in textos.items())
+        # La fuente y los sprites viven en src/: la imprenta solo recibe el bundle
+        entradas, externos = autocontenido(entradas, out)
+        if externos:
+            print(f"  ✓ Bundle: {externos} recurso(s) de fuera del juego en recursos/")
+        b = escribir_bundle(entradas, bundle, prefijo=out.name)
+        print(f"  ✓ Bundle {Path(bundle).name}: {b['archivos']} archivos · "
+              f"{b['comprimidos']} comprimidos · {b['guardados']} sin recomprimir · "
+              f"{b['bytes'] / 1e6:.1f} MB → {b['tamaño'] / 1e6:.1f} MB")
+
+    if not directorio:
+        return out
+
+    c = _sincronizar(out, plan, textos, enlazar)
+    print(f"  ✓ Sincronizado: {c['sin_cambios']} sin cambios · "
+          f"{c['enlace'] + c['reflink'] + c['copia']} actualizados "
+          f"({c['enlace']} enlaces · {c['reflink']} reflinks · {c['copia']} copias) · "
+          f"{c['borrados']} huérfanos borrados")
+
+    # ── Resumen ────────────────────────────────────────────────────────────
+    total = sum(1 for _ in out.rglob("*") if _.is_file())
+    print(f"\n[gameFactory] ✅ Directorio listo: {out.name}/ ({total} archivos)")
+    print(f"[gameFactory] Abre {os.path.relpath(out / 'indice.html', _HERE)} para empezar")
+    return out
+
+
+def _publicar_docs(repo_dir: Path):
+    """Actualiza docs/board.html (tablero inlineado) y docs/samples/."""
     # ── docs/board.html — inline the board ────────────────────────────────
-    board_src  = _HERE / "repo" / "tableros" / "tablero_metropoly.html"
+    board_src  = repo_dir / "tableros" / "tablero_metropoly.html"
     board_doc  = _HERE / "docs" / "board.html"
     if board_src.exists() and board_doc.exists():
         with open(board_src, encoding="utf-8") as f:
@@ -412,7 +635,7 @@ def ensamblar():
     docs_samples = _HERE / "docs" / "samples"
     samples_copied = 0
     for subdir, files in SAMPLES.items():
-        src_dir = _HERE / "repo" / subdir
+        src_dir = repo_dir / subdir
         dst_dir = docs_samples / subdir
         _mkdir(dst_dir)
         for fname in files:
@@ -423,15 +646,6 @@ def ensamblar():
             else:
                 print(f"  ⚠️  Sample not found: {src}")
     print(f"  ✓ docs/samples: {samples_copied} archivos")
-    index_html = _build_index(stats)
-    (_OUT / "indice.html").write_text(index_html, encoding="utf-8")
-    print(f"  ✓ Índice generado")
-
-    # ── Resumen ────────────────────────────────────────────────────────────
-    total = sum(1 for _ in _OUT.rglob("*") if _.is_file())
-    print(f"\n[gameFactory] ✅ Directorio listo: juego_completo/ ({total} archivos)")
-    print(f"[gameFactory] Abre juego_completo/indice.html para empezar")
-    return _OUT
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -442,10 +656,45 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Ensambla el directorio de juego completo")
     parser.add_argument("--force",    action="store_true", help="Regenera todo antes de ensamblar")
     parser.add_argument("--skip-gen", action="store_true", help="Salta la generación, solo copia")
+    parser.add_argument("--jobs",     type=int, default=4, help="Etapas en paralelo (default: 4)")
+    parser.add_argument("--copiar",   action="store_true",
+                        help="Copias independientes en juego_completo/ (sin hardlinks ni reflinks)")
+    parser.add_argument("--bundle",   type=Path,
+                        help="Escribe además el juego en un .zip / .tar / .tar.gz reproducible")
+    parser.add_argument("--sin-directorio", action="store_true",
+                        help="Con --bundle: no actualiza juego_completo/")
+    parser.add_argument("--libro",    action="store_true",
+                        help="Arma también libro_metropoly.html: todo el juego en un documento para imprimir")
+    parser.add_argument("--workers",  type=int, default=1,
+                        help="Workers de scraping/render de casillas (default: 1)")
+    parser.add_argument("--watch",    action="store_true",
+                        help="Se queda vigilando; regenera lo afectado y reensambla (watchMode.py)")
     args = parser.parse_args()
 
-    if not args.skip_gen:
-        print("[gameFactory] Regenerando assets...")
-        regenerar_todo(force=args.force)
+    if args.sin_directorio and not args.bundle:
+        parser.error("--sin-directorio requiere --bundle")
+    opciones = {"enlazar": not args.copiar, "bundle": args.bundle,
+                "directorio": not args.sin_directorio, "libro": args.libro}
+
+    if args.watch:
+        from watchMode import vigilar
+        vigilar(workers=args.workers, label="gameFactory",
+                al_terminar=lambda: ensamblar(docs=False, **opciones))
+    elif args.skip_gen:
+        ensamblar(**opciones)
+    else:
+        # Pre-paso rápido: todos los errores de catálogo antes de renderizar nada
+        from catalogValidator import validar_archivos, reportar
+        issues = validar_archivos(
+            str(_HERE / "props" / "zmg.csv"), str(_HERE / "props" / "fortunas.csv")
+        )
+        if not reportar(issues, "gameFactory"):
+            raise SystemExit(1)
 
-    ensamblar()
\ No newline at end of file
+        print("[gameFactory] Regenerando assets...")
+        ok = regenerar_todo(force=args.force, jobs=args.jobs, workers=args.workers,
+                            **opciones)
+        from imageScraper import reporte_scraper
+        reporte_scraper("gameFactory")
+        if not ok:
+            raise SystemExit(1)
\ No newline at end of file
@@ -1,12 +1,13 @@
 """
 generator.py
 ============
-Punto de entrada principal. Lee el CSV / JSON / XLSX, genera casillas y
+Punto de entrada principal. Lee el CSV / JSON / XLSX / Parquet / Arrow, genera casillas y
 tarjetas (con caché), y construye el tablero HTML.
 
 Uso básico:
     python generator.py                 # usa caché, no regenera lo que ya existe
     python generator.py --force         # regenera todo aunque exista
+    python generator.py --watch         # se queda vigilando y regenera solo lo afectado
 """
 
 import os
@@ -17,6 +18,7 @@ import pandas as pd
 
 from cardFactory  import generar_casilla, generar_tarjeta, cargar_propiedades, _load_config, _get_colors
 from boardFactory import saveBoardHtml
+from propsReader  import leer_tabla, coerce_numeric, SUPPORTED
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CONFIGURACIÓN
@@ -32,7 +34,7 @@ OUTPUT_FILE = os.path.join("repo", "tableros", "tablero_metropoly.html")
 
 def cargar_propiedades_generico(path: str):
     """
-    Carga propiedades desde JSON, CSV o Excel.
+    Carga propiedades desde JSON, CSV, Excel, Parquet o Arrow IPC.
     Siempre devuelve una lista de objetos con atributos:
         .nombre  .color  .carril  .imagen  .precio  .renta_base  .tipo
     """
@@ -41,12 +43,9 @@ def cargar_propiedades_generico(path: str):
     if ext == ".json":
         return cargar_propiedades(path)
 
-    if ext == ".csv":
-        df = pd.read_csv(path)
-    elif ext in (".xlsx", ".xls"):
-        df = pd.read_excel(path)
-    else:
+    if ext not in SUPPORTED:
         raise ValueError(f"Extensión no soportada: {ext}")
+    df = leer_tabla(path)
 
     columnas_esperadas = ["nombre", "color", "carril", "imagen",
                           "precio", "renta_base", "tipo"]
@@ -58,69 +57,11 @@ def cargar_propiedades_generico(path: str):
     df["tipo"]     = df["tipo"].astype(int)
 
     # Rellenar NaN en precio / renta_base con 0
-    df["precio"]     = df["precio"].fillna(0)
-    df["renta_base"] = df["renta_base"].fillna(0)
+    coerce_numeric(df, ("precio", "renta_base"))
 
     return [SimpleNamespace(**row) for row in df.to_dict(orient="records")]
 
 
-# ══════════════════════════════════════════════════════════════════════════════
-# NOMBRES DE CARRILES Y ESQUINAS
-# ══════════════════════════════════════════════════════════════════════════════
-
-blueLane = [
-    "Chapalita", "Providencia", "Americana", "Santa Tere", "Arcos Vallarta",
-    "Country Club", "Jardines del Bosque", "Puerta de Hierro", "Andares",
-    "Colonia Seattle", "Lomas de Atemajac", "Ciudad del Sol", "La Estancia",
-    "Altamira", "Real Vallarta", "La Calma", "Monraz", "Ladrón de Guevara",
-    "Colinas de San Javier", "Colonia Moderna",
-    "Estación Centro (Línea 1)", "Estación Zapopan Centro",
-    "Estación Tetlán", "Estación Tlaquepaque",
-    "Aeropuerto Internacional de Guadalajara (GDL)", "Aeropuerto de Zapopan",
-    "Aeropuerto de Toluquilla", "Helipuerto Puerta de Hierro",
-    "Fortuna de Chapultepec", "Fortuna de Andares",
-    "Fortuna del Centro Histórico", "El Colli",
-]
-
-yellowLane = [
-    "Plaza del Sol", "Galerías Guadalajara", "Midtown Jalisco",
-    "Mercado San Juan de Dios", "Plaza Patria", "Landmark", "Plaza Andares",
-    "Templo Expiatorio", "Mercado de Atemajac", "Plaza Fórum Tlaquepaque",
-    "Mercado de Abastos", "Plaza Bugambilias", "Plaza Ciudadela",
-    "Mercado Libertad", "Tonalá", "Tlaquepaque",
-    "Twin Lions", "Casino Majestic", "PlayCity", "Caliente",
-    "Av. López Mateos", "Av. Vallarta", "Av. Patria", "Av. Hidalgo",
-    "Av. Juárez", "Periférico Norte", "Lázaro Cárdenas", "Niños Héroes",
-]
-
-redLane = [
-    "Colapso del Periférico", "Tráfico de López Mateos",
-    "Lluvia en la Glorieta", "Marcha del Centro",
-    "Desvío del Tren Ligero", "El Parquímetro", "El Multón",
-    "Asalto", "El Gasolinazo", "Manifestación",
-    "Inspección Municipal", "Apagón",
-    "Casa de Cambio Chapultepec", "Casa de Cambio Providencia",
-    "Casa de Cambio Tlaquepaque", "Casa de Cambio Centro",
-    "Día de Paga Norte", "Día de Paga Sur",
-    "Día de Paga Oriente", "Día de Paga Poniente",
-    "La Seca", "El Temblor", "El Bache", "La Lluvia Ácida",
-]
-
-blueCorners = [
-    "Caseta de Zapotlanejo", "IMSS Jalisco", "SIAPA", "Telcel Jalisco",
-]
-
-yellowCorners = [
-    "Megacable Guadalajara", "UdeG",
-    "Palacio Municipal de Guadalajara", "CFE Jalisco",
-]
-
-redCorners = [
-    "Puente Grande", "Gas Natural del Occidente",
-    "Caabsa Eagle", "Pemex López Mateos",
-]
-
-
 # ══════════════════════════════════════════════════════════════════════════════
 # MAIN
 # ══════════════════════════════════════════════════════════════════════════════
@@ -177,89 +118,194 @@ def main():
         "--workers", type=int, default=1,
         help="Número de workers paralelos para scraping (default: 1, recomendado: 2-3)"
     )
+    parser.add_argument(
+        "--rescrape", action="store_true",
+        help="Vuelve a buscar imágenes de casillas en la caché negativa (fallas recientes)"
+    )
+    parser.add_argument(
+        "--solo-cache", action="store_true",
+        help="No scrapea: usa solo imágenes ya en src/img/ (p. ej. con scrapeQueue.py scrape en segundo plano)"
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Se queda vigilando props/, src/ y las plantillas; regenera solo lo afectado (watchMode.py)"
+    )
     args = parser.parse_args()
 
+    if args.watch:
+        _check_fonts()
+        from watchMode import vigilar
+        vigilar(props_path=args.input, tablero_path=args.output, workers=args.workers,
+                label="generator")
+        return
+
     force = args.force
     if force:
         print("[generator] Modo FORCE: se regenerarán todas las casillas y tarjetas.")
 
     _check_fonts()
 
-    cfg    = _load_config()
-    colors = _get_colors()
-
-    # ── Cargar CSV ───────────────────────────────────────────────────────────
-    import pandas as pd
+    ok = generar_edicion(
+        input_path  = args.input,
+        output_path = args.output,
+        force       = force,
+        workers     = args.workers,
+        rescrape    = args.rescrape,
+        solo_cache  = args.solo_cache,
+    )
+    from imageScraper import reporte_scraper
+    reporte_scraper("generator")
+    if not ok:
+        sys.exit(1)
+
+
+def generar_edicion(
+    input_path:   str  = INPUT_FILE,
+    output_path:  str  = OUTPUT_FILE,
+    force:        bool = False,
+    workers:      int  = 1,
+    cfg:          dict = None,
+    colors:       dict = None,
+    casillas_dir: str  = None,
+    tarjetas_dir: str  = None,
+    corners:      dict = None,
+    label:        str  = "generator",
+    rescrape:     bool = False,
+    solo_cache:   bool = False,
+) -> bool:
+    """
+    Genera casillas, tarjetas y tablero de una edición.
+    casillas_dir / tarjetas_dir: None = repo/casillas y repo/tarjetas.
+    corners: {carril: [nombres]} que reemplaza las esquinas derivadas del
+             catálogo (empresas tipo 2/16 de cada carril); None = sin cambios.
+    rescrape: ignora la caché negativa del scraper (casillas sin imagen).
+    solo_cache: no scrapea; las casillas sin imagen en src/img/ van con fondo de color.
+    Devuelve False si la validación del catálogo falla (no se renderiza nada)
+    o si alguna casilla/tarjeta falló (el tablero se guarda de todos modos).
+    """
+    cfg     = cfg    or _load_config()
+    colors  = colors or _get_colors()
+    if rescrape or solo_cache:
+        cfg = {**cfg, "scraper": {**cfg.get("scraper", {}),
+                                  "rescrape": rescrape, "solo_cache": solo_cache}}
+
+    edicion = preparar_edicion(input_path, corners, label)
+    if edicion is None:
+        return False
 
-    raw_df = pd.read_csv(args.input)
-    raw_df['precio']     = pd.to_numeric(raw_df['precio'],     errors='coerce').fillna(0)
-    raw_df['renta_base'] = pd.to_numeric(raw_df['renta_base'], errors='coerce').fillna(0)
+    def procesar(prop):
+        generar_casilla(prop, force=force, cfg=cfg, colors=colors, out_dir=casillas_dir)
+        generar_tarjeta(prop, force=force, cfg=cfg, colors=colors, out_dir=tarjetas_dir)
 
-    # ── Construir listas de carriles ordenadas por precio ────────────────────
-    def build_sorted_lane(df, carril, slots):
-        sub       = df[df['carril'] == carril]
-        props     = sub[sub['tipo'] == 1].sort_values('precio').reset_index(drop=True)
-        non_props = sub[(sub['tipo'] != 1) & (sub['tipo'] != 2) & (sub['tipo'] != 16)].reset_index(drop=True)
-        return pd.concat([props, non_props], ignore_index=True)['nombre'].tolist()[:slots]
+    errores = renderizar_propiedades(edicion.propiedades, procesar, workers, label)
+    guardar_tablero(edicion.layout, input_path, output_path, casillas_dir, label)
+    if errores:
+        print(f"[{label}] ❌ {errores} de {len(edicion.propiedades)} casillas fallaron")
+    return errores == 0
 
-    from boardFactory import sideLengthFromPerimeter, BLUE_CANONICAL
-    boardSize    = sideLengthFromPerimeter(BLUE_CANONICAL)
-    blue_slots   = (boardSize - 1 - 1) * 4
-    yellow_slots = (boardSize - 2 - 1 - 1) * 4
-    red_slots    = (boardSize - 4 - 1 - 1) * 4
 
-    sorted_blue   = build_sorted_lane(raw_df, 1, blue_slots)
-    sorted_yellow = build_sorted_lane(raw_df, 2, yellow_slots)
-    sorted_red    = build_sorted_lane(raw_df, 3, red_slots)
+def preparar_edicion(input_path: str = INPUT_FILE, corners: dict = None,
+                     label: str = "generator"):
+    """
+    Valida el catálogo, sincroniza el índice SQLite y deriva carriles y
+    esquinas. Devuelve SimpleNamespace(layout, propiedades), o None si la
+    validación falla.
+    """
+    # ── Validación previa: todos los errores del catálogo antes de renderizar ─
+    from catalogValidator import validar_casillas, validar_carriles, reportar
+    tabular = os.path.splitext(input_path)[1].lower() != ".json"
+    if tabular:
+        raw_df = leer_tabla(input_path)
+        if not reportar(validar_casillas(raw_df, path=input_path), label):
+            return None
+
+    # ── Catálogo indexado (SQLite, se sincroniza desde el CSV) ───────────────
+    from tileCatalog import open_catalog
+    catalog = open_catalog(input_path)
+
+    # ── Carriles y esquinas derivados del catálogo (carril + tipo + posicion) ─
+    from boardFactory import buildLaneLayout
+    layout = buildLaneLayout(catalog, cornerOverrides=corners)
+
+    if tabular:
+        issues = validar_carriles(
+            raw_df,
+            lanes   = layout.lanes,
+            corners = layout.corners,
+            path    = input_path,
+        )
+        if not reportar(issues, label):
+            return None
 
-    print(f"[generator] Lanes: azul={len(sorted_blue)}, amarillo={len(sorted_yellow)}, rojo={len(sorted_red)}")
+    print(
+        f"[{label}] Lanes: azul={len(layout.lanes[1])}, amarillo={len(layout.lanes[2])}, "
+        f"rojo={len(layout.lanes[3])} · esquinas="
+        + "/".join(str(len(layout.corners[n])) for n in (1, 2, 3))
+    )
 
     # Cargar propiedades — colores ya están explícitos en el CSV
-    propiedades = cargar_propiedades_generico(args.input)
+    return SimpleNamespace(layout=layout, propiedades=cargar_propiedades_generico(input_path))
+
+
+def renderizar_propiedades(propiedades: list, procesar, workers: int = 1,
+                           label: str = "generator") -> int:
+    """
+    Aplica procesar(prop) a cada propiedad, con `workers` hilos y progreso.
+    Devuelve cuántas fallaron (con workers > 1 un error no detiene a las demás).
+    """
     total = len(propiedades)
+    errores = 0
 
     # ── Contadores de progreso thread-safe ───────────────────────────────────
     import threading
     lock      = threading.Lock()
     completed = [0]   # lista mutable para poder modificar desde dentro del closure
 
-    def procesar(prop):
-        generar_casilla(prop, force=force, cfg=cfg, colors=colors)
-        generar_tarjeta(prop, force=force, cfg=cfg, colors=colors)
+    def _uno(prop):
+        procesar(prop)
         with lock:
             completed[0] += 1
             remaining = total - completed[0]
-            print(f"[generator] [{completed[0]}/{total}] {prop.nombre} — {remaining} restantes")
+            print(f"[{label}] [{completed[0]}/{total}] {prop.nombre} — {remaining} restantes")
 
     # ── Ejecución ─────────────────────────────────────────────────────────────
-    workers = max(1, args.workers)
+    workers = max(1, workers)
     if workers == 1:
         for prop in propiedades:
-            procesar(prop)
+            _uno(prop)
     else:
-        print(f"[generator] Usando {workers} workers paralelos")
+        print(f"[{label}] Usando {workers} workers paralelos")
         from concurrent.futures import ThreadPoolExecutor, as_completed
         with ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = {executor.submit(procesar, prop): prop for prop in propiedades}
+            futures = {executor.submit(_uno, prop): prop for prop in propiedades}
             for future in as_completed(futures):
                 try:
                     future.result()
                 except Exception as e:
                     prop = futures[future]
-                    print(f"[generator] Error en '{prop.nombre}': {e}")
+                    print(f"[{label}] Error en '{prop.nombre}': {e}")
+                    errores += 1
+    return errores
+
 
-    print("[generator] Generando tablero HTML...")
+def guardar_tablero(layout, input_path: str = INPUT_FILE, output_path: str = OUTPUT_FILE,
+                    casillas_dir: str = None, label: str = "generator") -> None:
+    print(f"[{label}] Generando tablero HTML...")
+    board_kwargs = {"tilesDir": casillas_dir} if casillas_dir else {}
     saveBoardHtml(
-        outputPath        = args.output,
-        blueLaneNames     = sorted_blue,
-        yellowLaneNames   = sorted_yellow,
-        redLaneNames      = sorted_red,
-        blueCornerNames   = blueCorners,
-        yellowCornerNames = yellowCorners,
-        redCornerNames    = redCorners,
+        outputPath        = output_path,
+        blueLaneNames     = layout.lanes[1],
+        yellowLaneNames   = layout.lanes[2],
+        redLaneNames      = layout.lanes[3],
+        blueCornerNames   = layout.corners[1],
+        yellowCornerNames = layout.corners[2],
+        redCornerNames    = layout.corners[3],
+        propsPath         = input_path,
         fit               = False,
+        laneIndex         = layout.index,
+        **board_kwargs,
     )
-    print(f"[generator] Tablero guardado en '{args.output}'")
+    print(f"[{label}] Tablero guardado en '{output_path}'")
 
 
 if __name__ == "__main__":
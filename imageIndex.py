@@ -0,0 +1,339 @@
+"""
+imageIndex.py
+=============
+Índice de hashes perceptuales de las imágenes de casillas (src/img/) para
+detectar y colapsar fotos casi idénticas entre casillas distintas (p. ej.
+las cuatro Casa de Cambio o las variantes de Día de Paga que resuelven a la
+misma foto de stock).
+
+Por cada imagen se calculan dos hashes de 64 bits con Pillow:
+  dhash  (difference hash, 9×8 en grises: ¿cada píxel es menor que el de su derecha?)
+  ahash  (average hash, 8×8 en grises: ¿cada píxel es mayor que la media?)
+Dos imágenes son duplicadas si la distancia de Hamming de ambos hashes es
+≤ `umbral` (dhash) y ≤ 2·umbral (ahash).
+
+Archivos:
+  src/img/.phash_index.json   {ruta relativa: {mtime, size, w, h, dhash, ahash}}
+                              (solo se rehashean las imágenes que cambiaron)
+  src/img/.alias.json         {safe_nombre: ruta relativa de la copia canónica}
+  src/img/.imageIndex.lock    bloqueo entre procesos (generator.py y un
+                              `scrapeQueue.py scrape` en segundo plano)
+
+Al colapsar un grupo se conserva la imagen de mayor resolución (canónica);
+las demás se borran y su casilla queda como alias de la canónica, que es lo
+que devuelve cardFactory._cached_image. Casilla y tarjeta de todas las
+casillas del grupo incrustan entonces la misma imagen (un solo base64 en la
+caché de _img_to_b64).
+
+Uso:
+    python imageIndex.py                 # reporte de duplicadas
+    python imageIndex.py --aplicar       # colapsa las duplicadas en su canónica
+    python imageIndex.py --umbral 8      # más tolerante
+"""
+
+import os
+import json
+import contextlib
+import threading
+import functools
+
+from PIL import Image
+
+from cardFactory import _IMG_DIR, _mtime, _safe_name
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+_INDEX_PATH = os.path.join(_IMG_DIR, ".phash_index.json")
+_ALIAS_PATH = os.path.join(_IMG_DIR, ".alias.json")
+_IMG_EXTS   = (".jpg", ".jpeg", ".png", ".webp")
+UMBRAL      = 5
+
+_LOCK        = threading.RLock()   # canonica() toma el lock y llama a actualizar_indice / colapsar
+_PROFUNDIDAD = [0]                 # anidamiento de _bloqueo() en el hilo que tiene _LOCK
+
+
+def _flock(f, tomar: bool) -> None:
+    try:
+        import fcntl
+    except ImportError:          # Windows
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if tomar else msvcrt.LK_UNLCK, 1)
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX if tomar else fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def _bloqueo(img_dir: str):
+    """
+    Exclusión entre hilos (_LOCK) y entre procesos (flock sobre
+    .imageIndex.lock): el render y un `scrape` en segundo plano leen y
+    reescriben .alias.json y borran archivos del mismo grupo. Reentrante.
+    """
+    with _LOCK:
+        if _PROFUNDIDAD[0]:
+            _PROFUNDIDAD[0] += 1
+            try:
+                yield
+            finally:
+                _PROFUNDIDAD[0] -= 1
+            return
+        os.makedirs(img_dir, exist_ok=True)
+        with open(os.path.join(img_dir, ".imageIndex.lock"), "a+b") as f:
+            _flock(f, True)
+            _PROFUNDIDAD[0] = 1
+            try:
+                yield
+            finally:
+                _PROFUNDIDAD[0] = 0
+                _flock(f, False)
+
+
+# =============================================================================
+# HASHES
+# =============================================================================
+
+def _bits(pixels, ref) -> int:
+    h = 0
+    for p, r in zip(pixels, ref):
+        h = (h << 1) | (p > r)
+    return h
+
+
+def hashes(path: str) -> dict:
+    """dhash y ahash (enteros de 64 bits) y tamaño de una imagen."""
+    with Image.open(path) as im:
+        w, h = im.size
+        gris = im.convert("L")
+        d = list(gris.resize((9, 8), Image.LANCZOS).tobytes())   # modo L: un byte por píxel
+        a = list(gris.resize((8, 8), Image.LANCZOS).tobytes())
+    # dhash: compara cada píxel con su vecino derecho (8 comparaciones por fila)
+    izq = [d[r * 9 + c]     for r in range(8) for c in range(8)]
+    der = [d[r * 9 + c + 1] for r in range(8) for c in range(8)]
+    media = sum(a) / len(a)
+    return {"w": w, "h": h, "dhash": _bits(der, izq), "ahash": _bits(a, [media] * 64)}
+
+
+def distancia(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+# =============================================================================
+# ÍNDICE
+# =============================================================================
+
+def _leer(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _escribir(path: str, data: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _imagenes(img_dir: str) -> list[str]:
+    """Rutas relativas (safe/archivo) de todas las imágenes de casilla."""
+    out = []
+    with os.scandir(img_dir) as it:
+        for d in it:
+            if not d.is_dir():
+                continue
+            with os.scandir(d.path) as files:
+                out.extend(
+                    f"{d.name}/{f.name}" for f in files
+                    if f.is_file() and f.name.lower().endswith(_IMG_EXTS)
+                )
+    return sorted(out)
+
+
+def actualizar_indice(img_dir: str = _IMG_DIR) -> dict:
+    """Sincroniza .phash_index.json con src/img/: hashea solo lo nuevo o modificado."""
+    index_path = os.path.join(img_dir, ".phash_index.json")
+    with _bloqueo(img_dir):
+        previo = _leer(index_path)
+        indice, nuevos = {}, 0
+        for rel in _imagenes(img_dir):
+            full = os.path.join(img_dir, rel)
+            st   = os.stat(full)
+            e    = previo.get(rel)
+            if e and e["mtime"] == st.st_mtime and e["size"] == st.st_size:
+                indice[rel] = e
+                continue
+            try:
+                indice[rel] = {"mtime": st.st_mtime, "size": st.st_size, **hashes(full)}
+                nuevos += 1
+            except Exception as ex:
+                print(f"[imageIndex] No se pudo leer {rel}: {ex}")
+        if nuevos or len(indice) != len(previo):
+            _escribir(index_path, indice)
+    return indice
+
+
+def _es_duplicada(a: dict, b: dict, umbral: int) -> bool:
+    return (distancia(a["dhash"], b["dhash"]) <= umbral
+            and distancia(a["ahash"], b["ahash"]) <= 2 * umbral)
+
+
+def _peso(indice: dict, rel: str) -> tuple:
+    """Orden de canónica: mayor resolución, luego mayor archivo."""
+    e = indice[rel]
+    return (e["w"] * e["h"], e["size"], rel)
+
+
+def grupos_duplicados(indice: dict, umbral: int = UMBRAL) -> list[list[str]]:
+    """
+    Grupos (≥ 2 imágenes de casillas distintas) de imágenes casi idénticas.
+    La primera de cada grupo es la canónica: mayor resolución, luego mayor archivo.
+    La unión es transitiva (A≈B y B≈C juntan A y C), así que de cada grupo
+    solo quedan las que están a `umbral` de la canónica: colapsar() borra
+    esas, y nada que no se parezca a la imagen que la reemplaza.
+    """
+    rels   = list(indice)
+    padre  = list(range(len(rels)))
+
+    def raiz(i):
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+
+    for i in range(len(rels)):
+        for j in range(i + 1, len(rels)):
+            if _es_duplicada(indice[rels[i]], indice[rels[j]], umbral):
+                padre[raiz(j)] = raiz(i)
+
+    grupos: dict[int, list[str]] = {}
+    for i, rel in enumerate(rels):
+        grupos.setdefault(raiz(i), []).append(rel)
+
+    out = []
+    for g in grupos.values():
+        canonica, *resto = sorted(g, key=lambda rel: _peso(indice, rel), reverse=True)
+        g = [canonica] + [rel for rel in resto
+                          if _es_duplicada(indice[canonica], indice[rel], umbral)]
+        if len({rel.split("/")[0] for rel in g}) < 2:
+            continue
+        out.append(g)
+    return sorted(out, key=lambda g: g[0])
+
+
+# =============================================================================
+# ALIAS
+# =============================================================================
+
+def alias_de(nombre: str, img_dir: str = _IMG_DIR) -> str | None:
+    """Ruta absoluta de la imagen canónica si la casilla es alias de otra."""
+    path = os.path.join(img_dir, ".alias.json")
+    rel  = _alias_cached(path, _mtime(path)).get(_safe_name(nombre))
+    if rel:
+        full = os.path.join(img_dir, rel)
+        if os.path.isfile(full):
+            return full
+    return None
+
+
+@functools.lru_cache(maxsize=4)
+def _alias_cached(path: str, _mtime: float) -> dict:
+    return _leer(path)
+
+
+def colapsar(grupos: list[list[str]], img_dir: str = _IMG_DIR) -> int:
+    """
+    Deja solo la canónica de cada grupo; las casillas de las demás apuntan a
+    ella en .alias.json. Devuelve cuántos archivos se borraron.
+    """
+    alias_path = os.path.join(img_dir, ".alias.json")
+    borrados = 0
+    with _bloqueo(img_dir):
+        alias = _leer(alias_path)
+        for canonica, *dups in grupos:
+            for rel in dups:
+                safe = rel.split("/")[0]
+                if safe == canonica.split("/")[0]:
+                    continue   # dos fotos de la misma casilla: no se tocan
+                with contextlib.suppress(FileNotFoundError):   # otro worker ya la borró
+                    os.remove(os.path.join(img_dir, rel))
+                    borrados += 1
+                alias[safe] = canonica
+            # alias que apuntaban a una imagen ahora borrada → a la canónica
+            for safe, destino in alias.items():
+                if destino in dups:
+                    alias[safe] = canonica
+        _escribir(alias_path, alias)
+    if borrados:
+        actualizar_indice(img_dir)
+    return borrados
+
+
+def canonica(path: str, umbral: int = UMBRAL, img_dir: str = _IMG_DIR) -> str:
+    """
+    Para una imagen recién guardada: si duplica la de otra casilla, la borra,
+    registra el alias y devuelve la canónica; si no, devuelve `path`.
+    Revisar y colapsar van bajo el mismo bloqueo (hilos y procesos): los
+    workers de scraping la llaman en paralelo y dos no deben colapsar el
+    mismo grupo a la vez. Solo se compara la imagen nueva contra el índice.
+    """
+    with _bloqueo(img_dir):
+        indice = actualizar_indice(img_dir)
+        rel    = os.path.relpath(path, img_dir).replace(os.sep, "/")
+        if rel not in indice:
+            # ya colapsada por otro worker: su casilla apunta a la canónica
+            destino = _leer(os.path.join(img_dir, ".alias.json")).get(rel.split("/")[0])
+            return os.path.join(img_dir, destino) if destino else path
+        safe   = rel.split("/")[0]
+        mejor  = max(
+            (r for r in indice
+             if r.split("/")[0] != safe and _es_duplicada(indice[rel], indice[r], umbral)),
+            key=lambda r: _peso(indice, r), default=None,
+        )
+        if mejor is not None and _peso(indice, mejor) > _peso(indice, rel):
+            colapsar([[mejor, rel]], img_dir)
+            print(f"[imageIndex] {rel} duplica a {mejor}: se usa la canónica")
+            return os.path.join(img_dir, mejor)
+    return path
+
+
+# =============================================================================
+# REPORTE
+# =============================================================================
+
+def reportar(grupos: list[list[str]], indice: dict) -> None:
+    if not grupos:
+        print("[imageIndex] Sin imágenes duplicadas entre casillas")
+        return
+    ahorro = sum(indice[rel]["size"] for g in grupos for rel in g[1:])
+    print(f"[imageIndex] {len(grupos)} grupo(s) de duplicadas · "
+          f"{sum(len(g) - 1 for g in grupos)} copia(s) de más · {ahorro / 1024:.0f} KB")
+    for canonica, *dups in grupos:
+        e = indice[canonica]
+        print(f"   {canonica}  ({e['w']}x{e['h']})")
+        for rel in dups:
+            d = distancia(indice[rel]["dhash"], e["dhash"])
+            print(f"     ≈ {rel}  (dist {d})")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Duplicadas perceptuales en src/img/")
+    parser.add_argument("--umbral", type=int, default=UMBRAL,
+                        help=f"Distancia de Hamming máxima del dhash (default: {UMBRAL})")
+    parser.add_argument("--aplicar", action="store_true",
+                        help="Colapsa cada grupo en su imagen canónica")
+    parser.add_argument("--img-dir", default=_IMG_DIR)
+    args = parser.parse_args()
+
+    indice = actualizar_indice(args.img_dir)
+    grupos = grupos_duplicados(indice, args.umbral)
+    print(f"[imageIndex] {len(indice)} imágenes indexadas")
+    reportar(grupos, indice)
+    if args.aplicar and grupos:
+        n = colapsar(grupos, args.img_dir)
+        print(f"[imageIndex] {n} archivo(s) colapsados en su canónica (.alias.json)")
@@ -0,0 +1,1194 @@
+"""
+imageScraper.py
+===============
+Obtención de imágenes para las casillas. Los proveedores se configuran en
+board_config.json (scraper.providers) y se consultan en orden de prioridad,
+cada uno con su límite de concurrencia: carpeta/zip local, servidor HTTP y
+Google Imágenes vía Selenium (opt-in). Un build sin red lista solo los
+locales y nunca espera a la red.
+
+Antes cada casilla levantaba su propio Chrome (opciones, service con
+ChromeDriverManager().install() y webdriver.Chrome) y lo cerraba tras una
+sola búsqueda; el arranque del navegador era casi todo el costo. Aquí un
+DriverPool mantiene un navegador headless por worker, reutilizado entre
+búsquedas:
+
+  - la ruta de chromedriver se resuelve una sola vez por proceso
+  - entre búsquedas se borran cookies y se navega a about:blank
+  - un navegador que truena (WebDriverException, sesión muerta) se descarta
+    y el siguiente acquire levanta uno nuevo; la búsqueda se reintenta
+
+Las candidatas se descargan con una sesión HTTP compartida (keep-alive), en
+tandas concurrentes: la resolución se revisa con el header de la imagen
+(sin decodificarla) y en cuanto una califica las demás se cancelan.
+
+Las búsquedas sin imagen usable se recuerdan en src/img/.sin_imagen.json
+(NegativeCache) durante `negative_ttl_hours`; mientras tanto la casilla usa
+el fondo de color. `--rescrape` en generator.py / editionBuilder.py las
+vuelve a buscar. Si faltó un proveedor por dependencia (Selenium o
+chromedriver ausentes) se recuerdan solo SIN_DEPENDENCIA_TTL_HOURS; las fallas
+pasajeras (timeouts, 429, CAPTCHA) no se recuerdan.
+
+Nada de esperas fijas: cada paso espera una condición concreta con
+WebDriverWait (cuadrícula de resultados presente, src de la imagen de alta
+resolución disponible) con timeout por paso (scraper.timeouts); la latencia
+de cada paso se acumula en un histograma que sale en el reporte.
+
+Todas las búsquedas de un proveedor pasan por un RateLimiter compartido por
+el proceso (token bucket): con más workers no se pide más rápido, sino que
+se reparte la misma tasa. Un 429/503, un CAPTCHA o una página sin
+resultados bajan la tasa y pausan a todos con backoff exponencial; los
+éxitos la recuperan. reporte_scraper() imprime throughput y bloqueos.
+
+Para probar sin Chrome ni red: DriverPool(factory=...) acepta cualquier
+callable que devuelva un objeto con la interfaz de WebDriver (get,
+find_elements, execute_script, page_source, delete_all_cookies, quit), y
+`search_url` y las URLs candidatas pueden apuntar a un servidor local.
+
+Con scraper.capturas (o --capturar) cada página de resultados se guarda con
+sus URLs candidatas en src/img/.capturas/; scrapeCapture.py vuelve a correr
+las estrategias de extracción (extraer_urls) sobre esas capturas sin
+navegador ni red, para probar cambios de selectores en toda la edición.
+
+Uso:
+    python imageScraper.py "Torre Minerva"               # proveedores configurados
+    python imageScraper.py "Torre Minerva" --visible     # con ventana
+"""
+
+import io
+import os
+import json
+import re
+import sys
+import time
+import shutil
+import zipfile
+import atexit
+import threading
+import functools
+import contextlib
+import urllib.parse
+from urllib.parse import urlparse
+from abc import ABC, abstractmethod
+
+import requests
+from PIL import Image
+
+from cardFactory import _HERE, _IMG_DIR, _WEBDRIVER_DIR, _safe_name
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+SEARCH_URL = "https://www.google.com/search?q={q}&tbm=isch&hl=es"
+MAX_BROWSERS = 4          # tope de navegadores vivos en el pool compartido
+NEGATIVE_TTL_HOURS = 72   # horas que se recuerda una búsqueda fallida
+SIN_DEPENDENCIA_TTL_HOURS = 1   # ... si además faltó un proveedor (Selenium / chromedriver)
+
+_NEGATIVE_PATH = os.path.join(_IMG_DIR, ".sin_imagen.json")
+_INICIO        = time.time()   # arranque del proceso (para --rescrape)
+
+_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/148.0.0.0 Safari/537.36"
+)
+
+
+# =============================================================================
+# SELENIUM / CHROMEDRIVER
+# =============================================================================
+
+def _webdriver_exe() -> str:
+    return "chromedriver" if sys.platform != "win32" else "chromedriver.exe"
+
+
+def _selenium():
+    """Importa Selenium en tiempo de ejecución (detecta instalaciones posteriores)."""
+    try:
+        from selenium import webdriver
+        return webdriver
+    except ImportError:
+        print(
+            "[imageScraper] Selenium no instalado. Ejecuta:\n"
+            "    pip install selenium\n"
+            "y asegúrate de tener chromedriver en la carpeta webdriver/"
+        )
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _driver_path() -> str | None:
+    """
+    Ruta de chromedriver, resuelta una vez por proceso: webdriver-manager si
+    está instalado (versión según el Chrome local), si no webdriver/.
+    """
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        return ChromeDriverManager().install()
+    except ImportError:
+        pass
+    except Exception as e:
+        print(f"[imageScraper] Error configurando chromedriver: {e}")
+        return None
+
+    driver_path = os.path.join(_WEBDRIVER_DIR, _webdriver_exe())
+    if not os.path.isfile(driver_path):
+        print(
+            "[imageScraper] chromedriver no encontrado. Instala webdriver-manager:\n"
+            "    pip install webdriver-manager\n"
+            "o coloca chromedriver.exe manualmente en la carpeta webdriver/"
+        )
+        return None
+    return driver_path
+
+
+def chrome_factory(headless: bool = True):
+    """Devuelve un callable que levanta un Chrome configurado para el scraper."""
+    def _crear():
+        webdriver = _selenium()
+        if webdriver is None:
+            raise RuntimeError("Selenium no disponible")
+        path = _driver_path()
+        if path is None:
+            raise RuntimeError("chromedriver no disponible")
+
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+
+        options = Options()
+        if headless:
+            options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--window-size=1400,1050")
+        options.add_argument(f"user-agent={_USER_AGENT}")
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option("useAutomationExtension", False)
+
+        driver = webdriver.Chrome(service=Service(path), options=options)
+        driver.set_window_size(1400, 1050)
+        return driver
+    return _crear
+
+
+# =============================================================================
+# POOL DE NAVEGADORES
+# =============================================================================
+
+class DriverPool:
+    """
+    Pool de navegadores de larga vida. Cada `with pool.driver() as d:` toma un
+    navegador libre (o levanta uno nuevo si hay menos de `max_size`, o espera);
+    al salir se limpia y se devuelve. Si el bloque lanza una excepción el
+    navegador se descarta, por si la sesión quedó muerta.
+    """
+
+    def __init__(self, max_size: int = 1, factory=None, headless: bool = True):
+        self.max_size  = max(1, max_size)
+        self.factory   = factory or chrome_factory(headless)
+        self._libres   = []                     # LIFO: el navegador más caliente primero
+        self._cond     = threading.Condition()
+        self._vivos    = 0
+        self.creados   = 0
+        self.reinicios = 0
+
+    def _tomar(self):
+        # Espera mientras no haya libres ni cupo; un navegador devuelto o
+        # descartado (o un max_size mayor) despierta a quien espera
+        with self._cond:
+            while not self._libres and self._vivos >= self.max_size:
+                self._cond.wait()
+            if self._libres:
+                return self._libres.pop()
+            self._vivos += 1
+        try:
+            d = self.factory()
+        except Exception:
+            with self._cond:
+                self._vivos -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.creados += 1
+        return d
+
+    def _descartar(self, d) -> None:
+        with self._cond:
+            self._vivos    -= 1
+            self.reinicios += 1
+            self._cond.notify()
+        with contextlib.suppress(Exception):
+            d.quit()
+
+    def _devolver(self, d) -> None:
+        """Limpia el estado de la búsqueda anterior; si falla, el navegador se descarta."""
+        try:
+            d.delete_all_cookies()
+            d.get("about:blank")
+        except Exception:
+            self._descartar(d)
+            return
+        with self._cond:
+            self._libres.append(d)
+            self._cond.notify()
+
+    def ampliar(self, max_size: int) -> None:
+        with self._cond:
+            if max_size > self.max_size:
+                self.max_size = max_size
+                self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def driver(self):
+        d = self._tomar()
+        try:
+            yield d
+        except BaseException:
+            self._descartar(d)
+            raise
+        self._devolver(d)
+
+    def close(self) -> None:
+        with self._cond:
+            libres, self._libres = self._libres, []
+            self._vivos -= len(libres)
+            self._cond.notify_all()
+        for d in libres:
+            with contextlib.suppress(Exception):
+                d.quit()
+
+
+_POOLS: dict[bool, DriverPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(headless: bool = True, max_size: int = MAX_BROWSERS) -> DriverPool:
+    """Pool compartido del proceso (uno por modo headless/visible)."""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(headless)
+        if pool is None:
+            pool = _POOLS[headless] = DriverPool(max_size=max_size, headless=headless)
+        else:
+            pool.ampliar(max_size)
+        return pool
+
+
+@atexit.register
+def close_pools() -> None:
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.close()
+        _POOLS.clear()
+
+
+# =============================================================================
+# LÍMITE DE PETICIONES (token bucket adaptativo)
+# =============================================================================
+
+class RateLimiter:
+    """
+    Token bucket compartido por todos los workers del proceso. Cada petición
+    toma un token; los tokens se reponen a `por_segundo` hasta `rafaga`.
+    Un bloqueo (HTTP 429/503, CAPTCHA, página sin resultados) reduce la tasa
+    a la mitad y pausa a todos con backoff exponencial; cada éxito la sube de
+    nuevo poco a poco hasta `maximo`.
+    """
+
+    def __init__(self, por_segundo: float = 0.5, rafaga: int = 2,
+                 minimo: float = None, maximo: float = None, pausa_max: float = 60):
+        self.tasa      = por_segundo
+        self.maximo    = maximo or por_segundo
+        self.minimo    = minimo or por_segundo / 16
+        self.rafaga    = max(1, rafaga)
+        self.pausa_max = pausa_max
+        self._lock     = threading.Lock()
+        self._tokens   = float(self.rafaga)
+        self._t        = time.monotonic()
+        self._pausa    = 0.0      # monotonic hasta el que nadie pide
+        self._racha    = 0        # bloqueos seguidos
+        self._inicio   = None
+        self.peticiones     = 0
+        self.exitos         = 0
+        self.esperado       = 0.0
+        self.penalizaciones = {}
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._tokens = min(self.rafaga, self._tokens + (ahora - self._t) * self.tasa)
+                self._t = ahora
+                espera = self._pausa - ahora
+                if espera <= 0 and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.peticiones += 1
+                    self._inicio = self._inicio or ahora
+                    return
+                if espera <= 0:
+                    espera = (1 - self._tokens) / self.tasa
+            time.sleep(espera)
+            with self._lock:
+                self.esperado += espera
+
+    def penalizar(self, motivo: str, pausa: float = None) -> None:
+        with self._lock:
+            self._racha += 1
+            self.tasa    = max(self.minimo, self.tasa / 2)
+            self._tokens = 0.0
+            pausa = pausa if pausa is not None else min(self.pausa_max, 2 ** self._racha)
+            self._pausa  = max(self._pausa, time.monotonic() + pausa)
+            self.penalizaciones[motivo] = self.penalizaciones.get(motivo, 0) + 1
+        print(f"[imageScraper] Bloqueo ({motivo}): pausa {pausa:.0f}s, tasa {self.tasa:.2f} req/s")
+
+    def exito(self) -> None:
+        with self._lock:
+            self._racha = 0
+            self.tasa   = min(self.maximo, self.tasa + self.maximo / 10)
+            self.exitos += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            transcurrido = time.monotonic() - self._inicio if self._inicio else 0.0
+            return {
+                "peticiones":     self.peticiones,
+                "exitos":         self.exitos,
+                "por_minuto":     60 * self.exitos / transcurrido if transcurrido else 0.0,
+                "tasa":           self.tasa,
+                "esperado":       self.esperado,
+                "penalizaciones": dict(self.penalizaciones),
+                "en_pausa":       max(0.0, self._pausa - time.monotonic()),
+            }
+
+
+_LIMITERS: dict[str, RateLimiter] = {}
+
+
+def get_limiter(clave: str, **params) -> RateLimiter:
+    """Limitador compartido del proceso para `clave` (p. ej. "google")."""
+    with _POOLS_LOCK:
+        lim = _LIMITERS.get(clave)
+        if lim is None:
+            lim = _LIMITERS[clave] = RateLimiter(**params)
+        return lim
+
+
+def reporte_scraper(label: str = "imageScraper") -> None:
+    """Resumen de throughput y backoff por proveedor (para el reporte del build)."""
+    for clave, lim in sorted(_LIMITERS.items()):
+        st = lim.stats()
+        if not st["peticiones"]:
+            continue
+        pen = ", ".join(f"{m} ×{n}" for m, n in st["penalizaciones"].items()) or "ninguno"
+        print(f"[{label}] Scraper {clave}: {st['peticiones']} peticiones · {st['exitos']} con imagen · "
+              f"{st['por_minuto']:.1f}/min · tasa {st['tasa']:.2f} req/s · "
+              f"{st['esperado']:.1f}s de espera acumulada · bloqueos: {pen}")
+    for paso, st in latencias().items():
+        print(f"[{label}] Espera '{paso}': {st['n']} · p50 ≤{st['p50']}s · p90 ≤{st['p90']}s · "
+              f"máx {st['max']:.2f}s · {st['agotados']} timeout(s)")
+    for headless, pool in sorted(_POOLS.items()):
+        if pool.creados:
+            print(f"[{label}] Navegadores ({'headless' if headless else 'visible'}): "
+                  f"{pool.creados} iniciados · {pool.reinicios} reinicios · máx. {pool.max_size}")
+
+
+# =============================================================================
+# LATENCIAS (para ajustar scraper.timeouts)
+# =============================================================================
+
+_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16)
+
+
+class Histograma:
+    """Histograma de latencias de un paso del scraper (buckets fijos en segundos)."""
+
+    def __init__(self):
+        self.conteos  = [0] * (len(_BUCKETS) + 1)
+        self.n        = 0
+        self.agotados = 0
+        self.maximo   = 0.0
+        self.total    = 0.0
+
+    def agregar(self, segundos: float, agotado: bool) -> None:
+        i = next((k for k, b in enumerate(_BUCKETS) if segundos <= b), len(_BUCKETS))
+        self.conteos[i] += 1
+        self.n         += 1
+        self.agotados  += agotado
+        self.maximo     = max(self.maximo, segundos)
+        self.total     += segundos
+
+    def percentil(self, p: float) -> float:
+        """Cota superior del bucket que contiene el percentil p (0–1)."""
+        objetivo, acumulado = p * self.n, 0
+        for k, c in enumerate(self.conteos):
+            acumulado += c
+            if acumulado >= objetivo:
+                return _BUCKETS[k] if k < len(_BUCKETS) else self.maximo
+        return self.maximo
+
+
+_LATENCIAS: dict[str, Histograma] = {}
+_LATENCIAS_LOCK = threading.Lock()
+
+
+def registrar_latencia(paso: str, segundos: float, agotado: bool = False) -> None:
+    with _LATENCIAS_LOCK:
+        _LATENCIAS.setdefault(paso, Histograma()).agregar(segundos, agotado)
+
+
+def latencias() -> dict[str, dict]:
+    """{paso: {n, p50, p90, max, media, agotados, buckets}} de lo medido en el proceso."""
+    with _LATENCIAS_LOCK:
+        return {
+            paso: {
+                "n":        h.n,
+                "p50":      h.percentil(0.5),
+                "p90":      h.percentil(0.9),
+                "max":      h.maximo,
+                "media":    h.total / h.n if h.n else 0.0,
+                "agotados": h.agotados,
+                "buckets":  dict(zip([*map(str, _BUCKETS), "inf"], h.conteos)),
+            }
+            for paso, h in _LATENCIAS.items()
+        }
+
+
+# =============================================================================
+# BÚSQUEDA
+# =============================================================================
+
+def _by():
+    """selenium By; sin Selenium (driver falso en pruebas) basta con sus valores."""
+    try:
+        from selenium.webdriver.common.by import By
+        return By
+    except ImportError:
+        class By:
+            XPATH        = "xpath"
+            CSS_SELECTOR = "css selector"
+        return By
+
+
+def _bloqueado(driver) -> bool:
+    """Google respondió con su página de tráfico inusual / CAPTCHA."""
+    try:
+        url = driver.current_url or ""
+        return "/sorry/" in url or "unusual traffic" in (driver.page_source or "")
+    except Exception:
+        return False
+
+
+# Selectores de Google Imágenes (varios por compatibilidad entre versiones)
+_THUMB_SELECTORS = [
+    'div[jsname="dTDiAc"]',
+    'div[data-id]',
+    'g-img > img',
+    '.rg_i',
+    'img.YQ4gaf',
+    'img.t0fcAb',
+]
+_HIRES_SELECTORS = ['img.sFlh5c', 'img.r48jcc', 'img.iPVvYb', 'img.n3VNCb']
+_COOKIE_TEXTS    = ["Aceptar todo", "Accept all", "Aceptar"]
+
+# Timeouts por paso (s); scraper.timeouts en board_config.json los reemplaza
+TIMEOUTS = {"resultados": 8.0, "cookies": 4.0, "imagen": 3.0}
+
+
+def _esperar(driver, condicion, timeout: float, paso: str, poll: float = 0.1):
+    """
+    Espera a que condicion(driver) devuelva algo verdadero (WebDriverWait) y
+    lo devuelve; None si se agota `timeout`. La latencia queda en el
+    histograma de `paso`.
+    """
+    t0 = time.perf_counter()
+    valor = None
+    try:
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException
+        try:
+            valor = WebDriverWait(driver, timeout, poll_frequency=poll).until(condicion)
+        except TimeoutException:
+            valor = None
+    except ImportError:
+        # Sin Selenium (driver falso en pruebas): mismo sondeo a mano
+        limite = t0 + timeout
+        while True:
+            try:
+                valor = condicion(driver)
+            except Exception:
+                valor = None
+            if valor or time.perf_counter() >= limite:
+                break
+            time.sleep(poll)
+    registrar_latencia(paso, time.perf_counter() - t0, agotado=not valor)
+    return valor or None
+
+
+def _collect_urls(driver, nombre: str, search_url: str = SEARCH_URL,
+                  timeouts: dict = None, capturas=None) -> list[str]:
+    """
+    Abre la búsqueda de `nombre` en `driver` y devuelve URLs candidatas.
+    Con `capturas` (scrapeCapture.CaptureStore) guarda la página y las URLs.
+    """
+    By = _by()
+    t  = {**TIMEOUTS, **(timeouts or {})}
+
+    def boton_cookies(d):
+        for btn_text in _COOKIE_TEXTS:
+            btns = d.find_elements(By.XPATH, f"//button[contains(., '{btn_text}')]")
+            if btns:
+                return btns[0]
+        return None
+
+    driver.get(search_url.format(q=urllib.parse.quote(nombre)))
+    # Página lista: cuadrícula de resultados, diálogo de cookies o bloqueo
+    _esperar(driver, lambda d: _hay_resultados(d) or boton_cookies(d) or _bloqueado(d),
+             t["resultados"], "resultados")
+
+    # Aceptar cookies si aparece el diálogo y esperar a la cuadrícula
+    try:
+        btn = boton_cookies(driver)
+        if btn is not None:
+            btn.click()
+            _esperar(driver, _hay_resultados, t["cookies"], "cookies")
+    except Exception:
+        pass
+
+    image_urls, estrategia = extraer_urls(driver, t)
+    if capturas is not None:
+        capturas.guardar(nombre, driver, image_urls, estrategia)
+    return image_urls
+
+
+def _hay_resultados(d) -> bool:
+    By = _by()
+    return any(d.find_elements(By.CSS_SELECTOR, sel)
+               for sel in (*_THUMB_SELECTORS, "img[src^='http']"))
+
+
+# Estrategia 1: click en miniaturas y extraer imagen de alta resolución
+def _hires_src(d):
+    By = _by()
+    for hi_sel in _HIRES_SELECTORS:
+        for hi in d.find_elements(By.CSS_SELECTOR, hi_sel):
+            src = hi.get_attribute("src") or ""
+            if src.startswith("http") and "encrypted" not in src and len(src) > 50:
+                return src
+    return None
+
+
+def try_click_thumbnails(driver, timeout: float = TIMEOUTS["imagen"]) -> list:
+    By = _by()
+    thumbs = []
+    for sel in _THUMB_SELECTORS:
+        thumbs = driver.find_elements(By.CSS_SELECTOR, sel)
+        if thumbs:
+            break
+
+    for thumb in thumbs[:5]:
+        try:
+            driver.execute_script("arguments[0].click();", thumb)
+            # Panel lateral: esperar a que la imagen de alta res tenga src http
+            src = _esperar(driver, _hires_src, timeout, "imagen")
+            if src:
+                return [src]
+        except Exception:
+            continue
+    return []
+
+
+# Estrategia 2: extraer URLs de imágenes directamente del HTML/JS de la página
+# Google incrusta las URLs en atributos data-src y src de las miniaturas
+def extract_urls_from_page(driver) -> list:
+    By = _by()
+    found = []
+    # Buscar imágenes con src de http (no data:image)
+    imgs = driver.find_elements(By.CSS_SELECTOR, "img[src^='http']")
+    for img in imgs:
+        src = img.get_attribute("src") or ""
+        if src.startswith("http") and "encrypted" not in src and "gstatic" not in src:
+            found.append(src)
+    # También buscar en data-src
+    imgs2 = driver.find_elements(By.CSS_SELECTOR, "img[data-src^='http']")
+    for img in imgs2:
+        src = img.get_attribute("data-src") or ""
+        if src.startswith("http") and "encrypted" not in src:
+            found.append(src)
+    return list(set(found))
+
+
+# Estrategia 3: extraer URLs del page source (Google embebe JSON con URLs)
+def extract_from_source(driver) -> list:
+    found = []
+    try:
+        src = driver.page_source
+        # Google embebe URLs de imagen en formato ["https://...","width","height"]
+        matches = re.findall(r'"(https://[^"]+\.(?:jpg|jpeg|png|webp))"', src)
+        for m in matches:
+            if "encrypted" not in m and "gstatic" not in m:
+                found.append(m)
+    except Exception:
+        pass
+    return list(set(found))
+
+
+def extraer_urls(driver, timeouts: dict = None) -> tuple[list[str], str | None]:
+    """
+    Aplica las tres estrategias en orden sobre la página ya abierta en
+    `driver` (navegador real o scrapeCapture.ReplayDriver) y devuelve las
+    URLs y el nombre de la estrategia que las encontró.
+    """
+    t = {**TIMEOUTS, **(timeouts or {})}
+
+    # Primero intentar clicks para imagen de mayor calidad
+    image_urls = try_click_thumbnails(driver, t["imagen"])
+    if image_urls:
+        return image_urls, "clicks"
+
+    # Si no funcionó, extracción directa de miniaturas
+    image_urls = extract_urls_from_page(driver)
+    if image_urls:
+        return image_urls, "miniaturas"
+
+    # Último recurso: parsear el page source
+    image_urls = extract_from_source(driver)
+    print(f"[imageScraper] Estrategia page source: {len(image_urls)} URLs")
+    return image_urls, "page_source" if image_urls else None
+
+
+# =============================================================================
+# DESCARGA DE CANDIDATAS
+# =============================================================================
+
+_PROBE_CHUNK = 4096          # bytes por lectura mientras se busca el header
+_PROBE_MAX   = 256 * 1024    # si el header no apareció en esto, se descarta
+
+
+@functools.lru_cache(maxsize=1)
+def _http() -> requests.Session:
+    """Sesión HTTP compartida (keep-alive, pool de conexiones) para las descargas."""
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount("http://",  adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = _USER_AGENT
+    return session
+
+
+def _probe_size(buf: bytes) -> tuple[int, int] | None:
+    """(ancho, alto) leyendo solo el header; None si aún faltan bytes."""
+    try:
+        with Image.open(io.BytesIO(buf)) as pil:   # lazy: no decodifica píxeles
+            return pil.size
+    except Exception:
+        return None
+
+
+class Limitado(Exception):
+    """El servidor respondió 429/503 (rate limiting)."""
+
+    def __init__(self, status: int, retry_after: str = None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        try:
+            self.retry_after = float(retry_after) if retry_after else None
+        except ValueError:
+            self.retry_after = None
+
+
+def _fetch_candidate(idx: int, url: str, min_res, max_res, timeout: float,
+                     ganador: threading.Event) -> bytes | None:
+    """
+    Descarga una candidata en streaming. Corta en cuanto el header da una
+    resolución fuera de rango o en cuanto otra candidata ya ganó.
+    """
+    with _http().get(url, timeout=timeout, stream=True) as resp:
+        if resp.status_code in (429, 503):
+            raise Limitado(resp.status_code, resp.headers.get("Retry-After"))
+        if resp.status_code != 200:
+            print(f"[imageScraper]   URL {idx}: HTTP {resp.status_code}")
+            return None
+        buf, size = b"", None
+        for chunk in resp.iter_content(_PROBE_CHUNK):
+            if ganador.is_set():
+                return None
+            buf += chunk
+            if size is None:
+                size = _probe_size(buf)
+                if size is None:
+                    if len(buf) >= _PROBE_MAX:
+                        print(f"[imageScraper]   URL {idx}: no es una imagen reconocible")
+                        return None
+                    continue
+                w, h = size
+                if w < min_res[0] or h < min_res[1] or w > max_res[0] or h > max_res[1]:
+                    print(f"[imageScraper]   URL {idx}: resolución {w}x{h} fuera de rango")
+                    return None
+        return buf if size else None
+
+
+def _save_first_valid(nombre: str, image_urls: list[str],
+                      min_res=(80, 80), max_res=(3840, 2160),
+                      concurrencia: int = 4, timeout: float = 5,
+                      limiter: RateLimiter | None = None) -> str | None:
+    """
+    Descarga candidatas en tandas de `concurrencia` y guarda la primera que
+    califica; las demás de la tanda se cancelan.
+    Con `limiter` (servidor propio), un 429/503 frena al limitador y, si
+    ninguna candidata sirvió, se reporta como falla pasajera.
+    """
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+    concurrencia = max(1, concurrencia)
+    limitado = False
+    executor = ThreadPoolExecutor(max_workers=concurrencia)
+    try:
+        for start in range(0, len(image_urls), concurrencia):
+            ganador = threading.Event()
+            pending = {
+                executor.submit(_fetch_candidate, idx, url, min_res, max_res, timeout, ganador): (idx, url)
+                for idx, url in enumerate(image_urls[start:start + concurrencia], start)
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx, url = pending.pop(future)
+                    try:
+                        data = future.result()
+                    except Limitado as e:
+                        print(f"[imageScraper]   URL {idx}: {e}")
+                        if limiter is not None:
+                            limiter.penalizar(str(e), e.retry_after)
+                            limitado = True
+                        continue
+                    except Exception as e:
+                        print(f"[imageScraper]   URL {idx}: error — {e}")
+                        continue
+                    if data is not None:
+                        ganador.set()     # las descargas en curso cortan en su siguiente chunk
+                        return _guardar(nombre, idx, url, data)
+    finally:
+        # No esperar a las perdedoras (pueden seguir conectando hasta `timeout`)
+        executor.shutdown(wait=False, cancel_futures=True)
+    if limitado:
+        raise ProveedorNoDisponible("servidor limitando peticiones (429/503)")
+    return None
+
+
+def _guardar(nombre: str, idx: int, url: str, data: bytes) -> str | None:
+    save_dir = os.path.join(_IMG_DIR, _safe_name(nombre))
+    os.makedirs(save_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(urlparse(url).path))[0] or f"img_{idx}"
+    out_path = os.path.join(save_dir, f"{stem}.jpg")
+    try:
+        with Image.open(io.BytesIO(data)) as pil:
+            pil.convert("RGB").save(out_path, "JPEG")
+    except Exception as e:
+        print(f"[imageScraper]   URL {idx}: error — {e}")
+        return None
+    print(f"[imageScraper] Imagen guardada: {out_path}")
+    return out_path
+
+
+# =============================================================================
+# CACHÉ NEGATIVA
+# =============================================================================
+
+class NegativeCache:
+    """
+    Casillas cuya búsqueda no dio imagen usable: {safe_nombre: {nombre, ts,
+    motivo}} en src/img/.sin_imagen.json. Mientras no expire el TTL no se
+    vuelven a scrapear (la casilla usa el fondo de color), ni en esta
+    construcción (casilla + tarjeta) ni en las siguientes.
+    """
+
+    def __init__(self, path: str = _NEGATIVE_PATH, ttl_hours: float = NEGATIVE_TTL_HOURS):
+        self.path      = path
+        self.ttl       = ttl_hours * 3600
+        self._lock     = threading.Lock()
+        self._entradas = None
+
+    def _cargar(self) -> dict:
+        if self._entradas is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entradas = json.load(f)
+            except (OSError, ValueError):
+                self._entradas = {}
+        return self._entradas
+
+    def _escribir(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entradas, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def get(self, nombre: str) -> dict | None:
+        """Entrada vigente para `nombre`, o None si no hay o ya expiró."""
+        with self._lock:
+            e = self._cargar().get(_safe_name(nombre))
+        if e and time.time() - e["ts"] < e.get("ttl", self.ttl):
+            return e
+        return None
+
+    def record(self, nombre: str, motivo: str, ttl_hours: float | None = None) -> None:
+        """ttl_hours: vigencia propia de esta entrada (None = la de la caché)."""
+        entrada = {"nombre": nombre, "ts": time.time(), "motivo": motivo}
+        if ttl_hours is not None:
+            entrada["ttl"] = ttl_hours * 3600
+        with self._lock:
+            self._cargar()[_safe_name(nombre)] = entrada
+            self._escribir()
+
+    def forget(self, nombre: str) -> None:
+        with self._lock:
+            if self._cargar().pop(_safe_name(nombre), None) is not None:
+                self._escribir()
+
+
+_NEGATIVAS: dict[str, NegativeCache] = {}
+
+
+def get_negative_cache(ttl_hours: float = NEGATIVE_TTL_HOURS,
+                       path: str = _NEGATIVE_PATH) -> NegativeCache:
+    """Caché negativa compartida del proceso (una por archivo)."""
+    with _POOLS_LOCK:
+        cache = _NEGATIVAS.get(path)
+        if cache is None:
+            cache = _NEGATIVAS[path] = NegativeCache(path, ttl_hours)
+        cache.ttl = ttl_hours * 3600
+        return cache
+
+
+# =============================================================================
+# PROVEEDORES
+# =============================================================================
+#
+# board_config.json → scraper.providers, en orden de prioridad:
+#   {"tipo": "directorio", "ruta": "/mnt/nas/metropoly", "concurrencia": 8}
+#       carpeta o .zip con {safe_nombre}.jpg o {safe_nombre}/*.jpg
+#   {"tipo": "http", "urls": ["http://img.local:8000/{safe}.jpg"], "concurrencia": 4}
+#       plantillas con {safe} (_safe_name) y {q} (nombre url-encoded)
+#   {"tipo": "google", "concurrencia": 2}
+#       Selenium + Google Imágenes (opt-in: solo si está en la lista)
+# Sin "providers" se usa solo la carpeta src/curadas/ (PROVEEDORES_DEFECTO).
+# Un proveedor que no puede funcionar en esta corrida (Selenium o
+# chromedriver ausentes) se desactiva tras la primera falla.
+
+PROVEEDORES_DEFECTO = [{"tipo": "directorio", "ruta": "src/curadas"}]
+
+_IMG_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+class ProveedorNoDisponible(Exception):
+    """
+    Falla del proveedor. Pasajera (sin red, navegador caído, 429, CAPTCHA): no
+    va a la caché negativa. Si el proveedor quedó `deshabilitado` (falta una
+    dependencia) sí va, con SIN_DEPENDENCIA_TTL_HOURS.
+    """
+
+
+class ImageProvider(ABC):
+    tipo = "base"
+
+    def __init__(self, concurrencia: int = 4):
+        self.concurrencia  = max(1, concurrencia)
+        self._sem          = threading.BoundedSemaphore(self.concurrencia)
+        self.deshabilitado = None     # motivo, si ya no se consulta en este proceso
+
+    @abstractmethod
+    def buscar(self, nombre: str, min_res, max_res) -> str | None:
+        """Guarda una imagen para `nombre` en src/img/{safe}/ y devuelve su ruta."""
+
+
+class DirectoryProvider(ImageProvider):
+    """Imágenes curadas en una carpeta (p. ej. el NAS) o en un .zip, por _safe_name."""
+    tipo = "directorio"
+
+    def __init__(self, ruta: str, concurrencia: int = 8):
+        super().__init__(concurrencia)
+        self.ruta    = ruta
+        self._indice = None
+        self._lock   = threading.Lock()
+
+    def _indexar(self) -> dict[str, str]:
+        """{safe: archivo o miembro del zip}, construido una vez."""
+        with self._lock:
+            if self._indice is not None:
+                return self._indice
+            indice = {}
+            if zipfile.is_zipfile(self.ruta):
+                with zipfile.ZipFile(self.ruta) as zf:
+                    miembros = sorted(zf.namelist())
+            elif os.path.isdir(self.ruta):
+                miembros = sorted(
+                    os.path.relpath(os.path.join(root, f), self.ruta).replace(os.sep, "/")
+                    for root, _, files in os.walk(self.ruta) for f in files
+                )
+            else:
+                print(f"[imageScraper] Directorio de imágenes no encontrado: {self.ruta}")
+                miembros = []
+            for m in miembros:
+                if not m.lower().endswith(_IMG_EXTS):
+                    continue
+                partes = m.split("/")
+                safe = partes[-2] if len(partes) > 1 else os.path.splitext(partes[-1])[0]
+                indice.setdefault(safe, m)
+            self._indice = indice
+            return indice
+
+    def buscar(self, nombre, min_res, max_res):
+        miembro = self._indexar().get(_safe_name(nombre))
+        if miembro is None:
+            return None
+        save_dir = os.path.join(_IMG_DIR, _safe_name(nombre))
+        os.makedirs(save_dir, exist_ok=True)
+        out_path = os.path.join(save_dir, os.path.basename(miembro))
+        if zipfile.is_zipfile(self.ruta):
+            with zipfile.ZipFile(self.ruta) as zf, zf.open(miembro) as src, open(out_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        else:
+            shutil.copyfile(os.path.join(self.ruta, miembro), out_path)
+        print(f"[imageScraper] Imagen copiada de {self.tipo}: {out_path}")
+        return out_path
+
+
+class HttpProvider(ImageProvider):
+    """Servidor HTTP propio (o de prueba) que sirve imágenes por nombre."""
+    tipo = "http"
+
+    def __init__(self, urls: list[str], concurrencia: int = 4, timeout: float = 5,
+                 limiter: RateLimiter | None = None):
+        super().__init__(concurrencia)
+        self.urls    = urls
+        self.timeout = timeout
+        self.limiter = limiter or RateLimiter(por_segundo=20, rafaga=concurrencia)
+
+    def buscar(self, nombre, min_res, max_res):
+        candidatas = [
+            u.format(safe=_safe_name(nombre), q=urllib.parse.quote(nombre))
+            for u in self.urls
+        ]
+        self.limiter.acquire()
+        out_path = _save_first_valid(nombre, candidatas, min_res, max_res,
+                                     len(candidatas), self.timeout, self.limiter)
+        if out_path:
+            self.limiter.exito()
+        return out_path
+
+
+class GoogleProvider(ImageProvider):
+    """Google Imágenes vía Selenium con el pool de navegadores."""
+    tipo = "google"
+
+    def __init__(self, pool: DriverPool, concurrencia: int = MAX_BROWSERS,
+                 search_url: str = SEARCH_URL, intentos: int = 2,
+                 descargas: int = 4, timeout: float = 5,
+                 limiter: RateLimiter | None = None, timeouts: dict = None,
+                 capturas=None):
+        super().__init__(concurrencia)
+        self.limiter    = limiter or get_limiter("google")
+        self.timeouts   = timeouts
+        self.capturas   = capturas
+        self.pool       = pool
+        self.search_url = search_url
+        self.intentos   = intentos
+        self.descargas  = descargas
+        self.timeout    = timeout
+
+    def buscar(self, nombre, min_res, max_res):
+        if self.deshabilitado:
+            raise ProveedorNoDisponible(self.deshabilitado)
+        image_urls, bloqueado = None, False
+        for intento in range(1, self.intentos + 1):
+            try:
+                with self.pool.driver() as driver:
+                    self.limiter.acquire()      # después de levantar Chrome: sin Selenium no se espera
+                    image_urls = _collect_urls(driver, nombre, self.search_url,
+                                               self.timeouts, self.capturas)
+                    bloqueado  = not image_urls and _bloqueado(driver)
+                break
+            except RuntimeError as e:          # Selenium / chromedriver ausentes
+                # No se arregla dentro de la misma corrida: no se reintenta
+                self.deshabilitado = f"No se pudo iniciar Chrome: {e}"
+                print(f"[imageScraper] {self.tipo} desactivado para esta corrida — {e}")
+                raise ProveedorNoDisponible(self.deshabilitado)
+            except Exception as e:
+                print(f"[imageScraper] '{nombre}': navegador caído ({type(e).__name__}), "
+                      f"intento {intento}/{self.intentos}")
+        if image_urls is None:
+            raise ProveedorNoDisponible("navegador caído")
+        if bloqueado:
+            self.limiter.penalizar("CAPTCHA")
+            raise ProveedorNoDisponible("Google pidió CAPTCHA")
+        if not image_urls:
+            self.limiter.penalizar("sin resultados")
+
+        print(f"[imageScraper] '{nombre}': {len(image_urls)} URLs encontradas")
+        for i, u in enumerate(image_urls[:3]):
+            print(f"[imageScraper]   [{i}] {u[:80]}")
+        out_path = _save_first_valid(nombre, image_urls, min_res, max_res,
+                                     self.descargas, self.timeout)
+        if image_urls:
+            self.limiter.exito()
+        return out_path
+
+
+_PROVIDERS: dict[str, list[ImageProvider]] = {}
+
+
+def _capture_store(valor):
+    """scraper.capturas: false/ausente, true (src/img/.capturas/) o una ruta."""
+    if not valor:
+        return None
+    from scrapeCapture import CaptureStore
+    if valor is True:
+        return CaptureStore()
+    return CaptureStore(valor if os.path.isabs(valor) else os.path.join(_HERE, valor))
+
+
+def get_providers(sc: dict) -> list[ImageProvider]:
+    """Proveedores configurados en la sección `scraper`, compartidos por el proceso."""
+    specs = sc.get("providers") or PROVEEDORES_DEFECTO
+    clave = json.dumps([specs, sc.get("headless", True), sc.get("capturas")], sort_keys=True)
+    with _POOLS_LOCK:
+        if clave in _PROVIDERS:
+            return _PROVIDERS[clave]
+
+    timeout = sc.get("download_timeout", 5)
+    proveedores = []
+    for spec in specs:
+        tipo = spec.get("tipo")
+        if tipo == "directorio":
+            ruta = spec["ruta"]
+            ruta = ruta if os.path.isabs(ruta) else os.path.join(_HERE, ruta)
+            proveedores.append(DirectoryProvider(ruta, spec.get("concurrencia", 8)))
+        elif tipo == "http":
+            concurrencia = spec.get("concurrencia", 4)
+            proveedores.append(HttpProvider(
+                spec["urls"], concurrencia, spec.get("timeout", timeout),
+                limiter=get_limiter(
+                    "http " + urlparse(spec["urls"][0]).netloc,
+                    por_segundo=spec.get("por_segundo", 20), rafaga=concurrencia,
+                ),
+            ))
+        elif tipo == "google":
+            max_browsers = sc.get("max_browsers", MAX_BROWSERS)
+            rl = sc.get("rate_limit", {})
+            proveedores.append(GoogleProvider(
+                get_pool(sc.get("headless", True), max_browsers),
+                limiter      = get_limiter(
+                    "google",
+                    por_segundo = rl.get("por_segundo", 0.5),
+                    rafaga      = rl.get("rafaga", 2),
+                    minimo      = rl.get("minimo"),
+                    pausa_max   = rl.get("pausa_max", 60),
+                ),
+                concurrencia = spec.get("concurrencia", max_browsers),
+                descargas    = sc.get("download_concurrency", 4),
+                timeouts     = sc.get("timeouts"),
+                timeout      = timeout,
+                capturas     = _capture_store(sc.get("capturas")),
+            ))
+        else:
+            raise ValueError(f"Proveedor de imágenes desconocido: {tipo}")
+
+    with _POOLS_LOCK:
+        return _PROVIDERS.setdefault(clave, proveedores)
+
+
+# =============================================================================
+# API
+# =============================================================================
+
+def buscar_imagen(nombre: str, proveedores: list[ImageProvider],
+                  min_res=(80, 80), max_res=(3840, 2160),
+                  negativas: NegativeCache | None = None,
+                  rescrape: bool = False) -> str | None:
+    """
+    Consulta los proveedores en orden (cada uno con su límite de concurrencia)
+    y devuelve la ruta de la primera imagen obtenida, o None.
+    Con `negativas`, una falla reciente se salta sin buscar (salvo `rescrape`)
+    y cada búsqueda sin resultado se registra.
+    """
+    if negativas is not None:
+        previa = negativas.get(nombre)
+        # --rescrape ignora fallas de corridas anteriores, no las de esta misma
+        if previa and (not rescrape or previa["ts"] >= _INICIO):
+            print(f"[imageScraper] '{nombre}': sin imagen ({previa['motivo']}), "
+                  f"se omite hasta que expire la caché negativa (--rescrape)")
+            return None
+
+    pasajera, ausentes = False, []
+    for prov in proveedores:
+        if prov.deshabilitado:
+            ausentes.append(prov)
+            continue
+        try:
+            with prov._sem:
+                out_path = prov.buscar(nombre, min_res, max_res)
+        except ProveedorNoDisponible as e:
+            print(f"[imageScraper] '{nombre}': {prov.tipo} no disponible — {e}")
+            if prov.deshabilitado:
+                ausentes.append(prov)
+            else:
+                pasajera = True
+            continue
+        if out_path:
+            if negativas is not None:
+                negativas.forget(nombre)
+            from imageIndex import canonica
+            return canonica(out_path)     # si duplica la foto de otra casilla, se usa esa
+
+    print(f"[imageScraper] '{nombre}': sin imagen válida")
+    if negativas is not None and not pasajera:
+        consultados = [p.tipo for p in proveedores if p not in ausentes]
+        motivo = "; ".join(
+            (["sin imagen en " + ", ".join(consultados)] if consultados else [])
+            + [f"{p.tipo}: {p.deshabilitado}" for p in ausentes]
+        )
+        negativas.record(nombre, motivo, SIN_DEPENDENCIA_TTL_HOURS if ausentes else None)
+    return None
+
+
+def scrape_images(nombre: str, n: int = 1, headless: bool = True,
+                  min_res=(80, 80), max_res=(3840, 2160), max_missed: int = 5,
+                  pool: DriverPool | None = None, search_url: str = SEARCH_URL,
+                  intentos: int = 2, concurrencia: int = 4, timeout: float = 5,
+                  negativas: NegativeCache | None = None,
+                  rescrape: bool = False) -> str | None:
+    """
+    Scrapea Google Imágenes buscando `nombre`, guarda la primera imagen válida
+    en src/img/{safe_nombre}/ y devuelve la ruta absoluta.
+    Usa el pool compartido salvo que se pase uno. Devuelve None si falla o si
+    Selenium no está instalado.
+    """
+    google = GoogleProvider(pool or get_pool(headless), search_url=search_url,
+                            intentos=intentos, descargas=concurrencia, timeout=timeout)
+    return buscar_imagen(nombre, [google], min_res, max_res, negativas, rescrape)
+
+
+if __name__ == "__main__":
+    import argparse
+    from cardFactory import _load_config
+    parser = argparse.ArgumentParser(description="Scraper de imágenes de casillas")
+    parser.add_argument("nombres", nargs="+", help="Nombres de casilla a buscar")
+    parser.add_argument("--visible", action="store_true", help="Chrome con ventana")
+    parser.add_argument("--capturar", action="store_true",
+                        help="Guarda cada página de resultados en src/img/.capturas/")
+    args = parser.parse_args()
+
+    sc = dict(_load_config().get("scraper", {}), headless=not args.visible)
+    if args.capturar:
+        sc["capturas"] = sc.get("capturas") or True
+    proveedores = get_providers(sc)
+    t0 = time.perf_counter()
+    for nombre in args.nombres:
+        buscar_imagen(nombre, proveedores, sc.get("min_resolution", (80, 80)),
+                      sc.get("max_resolution", (3840, 2160)))
+    pool = get_pool(sc["headless"])
+    print(f"[imageScraper] {len(args.nombres)} búsqueda(s) · "
+          f"{', '.join(p.tipo for p in proveedores)} · {pool.creados} navegador(es) · "
+          f"{pool.reinicios} reinicio(s) · {time.perf_counter() - t0:.1f}s")
@@ -819,8 +819,10 @@ drawDust();
 </body>
 </html>"""
 
-def generar():
-    out_path = os.path.join(_OUT, "instructivo_metropoly.html")
+def generar(out_dir: str = None):
+    out_dir  = out_dir or _OUT
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, "instructivo_metropoly.html")
     with open(out_path, "w", encoding="utf-8") as f:
         f.write(HTML)
     print(f"[instructivoFactory] {out_path}")
@@ -1,92 +1,261 @@
-from selenium import webdriver
-from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import WebDriverException, SessionNotCreatedException
 import sys
 import os
 import urllib.request
+import urllib.error
 import re
 import zipfile
 import stat
 import json
 import shutil
+import time
+import hashlib
 from sys import platform
 
+# Chrome for Testing manifest + local driver cache:
+#   webdriver/.cache/manifest.json           last manifest (+ etag / last-modified)
+#   webdriver/.cache/{platform}-{milestone}/  chromedriver + driver.json (version, size, sha256)
+# A cached driver whose hash still matches is reused without touching the network;
+# downloads are streamed to a .part file and resumed with a Range request.
+
+MANIFEST_URL = 'https://googlechromelabs.github.io/chrome-for-testing/latest-versions-per-milestone-with-downloads.json'
+MANIFEST_TTL = 24 * 3600    # seconds before the cached manifest is revalidated
+CHUNK = 256 * 1024
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+WEBDRIVER_DIR = os.path.join(_HERE, 'webdriver')
+
+
 def webdriver_executable():
     if platform == "linux" or platform == "linux2" or platform == "darwin":
         return 'chromedriver'
     return 'chromedriver.exe'
 
-def download_lastest_chromedriver(current_chrome_version=""):
-    def get_platform_filename():
-        filename = ''
-        is_64bits = sys.maxsize > 2**32
-    
-        if platform == "linux" or platform == "linux2":
-            # linux
-            filename += 'linux64'
-        
-        elif platform == "darwin":
-            # OS X
-            filename += 'mac-x64'
-        elif platform == "win32":
-            # Windows...
-            filename += 'win32'
-
-        return filename
-    
-    # Find the latest chromedriver, download, unzip, set permissions to executable.
-    
+
+def get_platform_filename():
+    if platform == "linux" or platform == "linux2":
+        return 'linux64'
+    elif platform == "darwin":
+        return 'mac-x64'
+    elif platform == "win32":
+        return 'win32'
+    return ''
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+
+
+# =============================================================================
+# MANIFEST
+# =============================================================================
+
+def load_manifest(cache_dir, url=MANIFEST_URL, ttl=MANIFEST_TTL):
+    """
+    Milestone manifest, cached in cache_dir/manifest.json. Within `ttl` the
+    cached copy is used as is; after that it is revalidated with
+    If-None-Match / If-Modified-Since (304 keeps it). If the network fails,
+    a stale cached manifest is still returned.
+    """
+    path = os.path.join(cache_dir, 'manifest.json')
+    cached = _read_json(path)
+    if cached and cached.get('url') == url and time.time() - cached['checked'] < ttl:
+        return cached['content']
+
+    request = urllib.request.Request(url)
+    if cached and cached.get('url') == url:
+        if cached.get('etag'):
+            request.add_header('If-None-Match', cached['etag'])
+        if cached.get('last_modified'):
+            request.add_header('If-Modified-Since', cached['last_modified'])
+    try:
+        with urllib.request.urlopen(request, timeout=30) as stream:
+            content = json.loads(stream.read().decode('utf-8'))
+            cached = {
+                'url': url,
+                'etag': stream.headers.get('ETag'),
+                'last_modified': stream.headers.get('Last-Modified'),
+                'content': content,
+            }
+    except urllib.error.HTTPError as e:
+        if e.code != 304 or not cached:
+            raise
+    except (urllib.error.URLError, OSError):
+        if not cached:
+            raise
+        print('[WARN] manifest unreachable, using the cached copy')
+        return cached['content']
+
+    cached['checked'] = time.time()
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_json(path, cached)
+    return cached['content']
+
+
+def pick_download(manifest, current_chrome_version=""):
+    """(milestone, version, url) of the chromedriver for this platform."""
+    milestones = manifest["milestones"]
+    if current_chrome_version != "":
+        milestone = re.search(r'\d+', current_chrome_version).group()
+    else:
+        milestone = max(milestones, key=int)
+    entry = milestones[milestone]
+    for download in entry["downloads"]["chromedriver"]:
+        if download["platform"] == get_platform_filename():
+            return milestone, entry["version"], download["url"]
+    raise LookupError('no chromedriver for %s in milestone %s' % (get_platform_filename(), milestone))
+
+
+# =============================================================================
+# DOWNLOAD
+# =============================================================================
+
+def download_resumable(url, file_path, retries=3):
+    """
+    Streams `url` into `file_path`. Bytes already in file_path + '.part'
+    are kept and the rest is requested with a Range header; the result is
+    checked against the total size announced by the server.
+    """
+    part = file_path + '.part'
+    for attempt in range(1, retries + 1):
+        have = os.path.getsize(part) if os.path.exists(part) else 0
+        request = urllib.request.Request(url)
+        if have:
+            request.add_header('Range', 'bytes=%d-' % have)
+        try:
+            with urllib.request.urlopen(request, timeout=60) as stream:
+                if have and stream.status == 206:
+                    total = int(stream.headers['Content-Range'].rsplit('/', 1)[1])
+                    mode = 'ab'
+                else:                       # server ignored the Range: start over
+                    have = 0
+                    length = stream.headers.get('Content-Length')
+                    total = int(length) if length else None
+                    mode = 'wb'
+                with open(part, mode) as f:
+                    shutil.copyfileobj(stream, f, CHUNK)
+        except urllib.error.HTTPError as e:
+            if e.code == 416:               # Range past the end: .part is bogus
+                os.remove(part)
+            print('[WARN] download attempt %d/%d failed: %s' % (attempt, retries, e))
+            continue
+        except (urllib.error.URLError, OSError) as e:
+            print('[WARN] download attempt %d/%d interrupted at %d bytes: %s'
+                  % (attempt, retries, os.path.getsize(part) if os.path.exists(part) else 0, e))
+            continue
+
+        size = os.path.getsize(part)
+        if total is not None and size != total:
+            print('[WARN] download attempt %d/%d: got %d of %d bytes' % (attempt, retries, size, total))
+            continue
+        os.replace(part, file_path)
+        return size
+    raise IOError('unable to download %s after %d attempts' % (url, retries))
+
+
+def _extract_driver(zip_path, target):
+    """Verifies the archive and extracts only the chromedriver executable."""
+    exe = webdriver_executable()
+    with zipfile.ZipFile(zip_path, 'r') as zip_file:
+        members = [m for m in zip_file.namelist() if os.path.basename(m) == exe]
+        if not members:
+            raise LookupError('%s not found in %s' % (exe, os.path.basename(zip_path)))
+        tmp = target + '.tmp'
+        with zip_file.open(members[0]) as source, open(tmp, 'wb') as dest:
+            shutil.copyfileobj(source, dest, CHUNK)     # ZipExtFile checks the CRC at EOF
+    st = os.stat(tmp)
+    os.chmod(tmp, st.st_mode | stat.S_IEXEC)
+    os.replace(tmp, target)
+
+
+def _cached_driver(driver_dir, version):
+    """Path of the cached driver if it is this version and its hash still matches."""
+    meta = _read_json(os.path.join(driver_dir, 'driver.json'))
+    exe = os.path.join(driver_dir, webdriver_executable())
+    if (meta and meta.get('version') == version and os.path.isfile(exe)
+            and os.path.getsize(exe) == meta['size'] and _sha256(exe) == meta['sha256']):
+        return exe
+    return None
+
+
+def _install(exe, webdriver_path):
+    """Copies the cached driver to webdriver/ unless an identical one is already there."""
+    target = os.path.join(webdriver_path, webdriver_executable())
+    if (os.path.isfile(target) and os.path.getsize(target) == os.path.getsize(exe)
+            and _sha256(target) == _sha256(exe)):
+        return target
+    tmp = target + '.tmp'
+    shutil.copy2(exe, tmp)
+    os.replace(tmp, target)
+    return target
+
+
+def download_lastest_chromedriver(current_chrome_version="", manifest_url=MANIFEST_URL,
+                                  webdriver_path=WEBDRIVER_DIR):
+    # Find the chromedriver for the milestone (latest if no version is given),
+    # reuse the cached one if valid, otherwise download, verify and unzip it.
+
     result = False
     try:
-        url = 'https://googlechromelabs.github.io/chrome-for-testing/latest-versions-per-milestone-with-downloads.json'
-    
-        # Download latest chromedriver.
-        stream = urllib.request.urlopen(url)
-        content = json.loads(stream.read().decode('utf-8'))
-
-        # Parse the latest version.
-        
-        if current_chrome_version != "":
-            match = re.search(r'\d+', current_chrome_version)
-            downloads = content["milestones"][match.group()]
-        
+        cache_dir = os.path.join(webdriver_path, '.cache')
+        manifest = load_manifest(cache_dir, manifest_url)
+        milestone, version, driver_url = pick_download(manifest, current_chrome_version)
+
+        driver_dir = os.path.join(cache_dir, '%s-%s' % (get_platform_filename(), milestone))
+        exe = _cached_driver(driver_dir, version)
+        if exe:
+            print('[INFO] chromedriver %s already cached' % version)
         else:
-            for milestone in content["milestones"]:
-                downloads = content["milestones"][milestone]
-        
-        for download in downloads["downloads"]["chromedriver"]:
-            if (download["platform"] == get_platform_filename()):
-                driver_url = download["url"]
-        
-        # Download the file.
-        print('[INFO] downloading chromedriver ver: %s: %s'% (current_chrome_version, driver_url))
-        file_name = driver_url.split("/")[-1]
-        app_path = os.getcwd()
-        chromedriver_path = os.path.normpath(os.path.join(app_path, 'webdriver', webdriver_executable()))
-        file_path = os.path.normpath(os.path.join(app_path, 'webdriver', file_name))
-        urllib.request.urlretrieve(driver_url, file_path)
-
-        # Unzip the file into folde
-        
-        webdriver_path = os.path.normpath(os.path.join(app_path, 'webdriver'))
-        with zipfile.ZipFile(file_path, 'r') as zip_file:
-            for member in zip_file.namelist():
-                filename = os.path.basename(member)
-                if not filename:
-                    continue
-                source = zip_file.open(member)
-                target = open(os.path.join(webdriver_path, filename), "wb")
-                with source, target:
-                    shutil.copyfileobj(source, target)
-            
-        st = os.stat(chromedriver_path)
-        os.chmod(chromedriver_path, st.st_mode | stat.S_IEXEC)
-        print('[INFO] lastest chromedriver downloaded')
-        # Cleanup.
-        os.remove(file_path)
+            print('[INFO] downloading chromedriver ver: %s: %s' % (version, driver_url))
+            os.makedirs(driver_dir, exist_ok=True)
+            file_path = os.path.join(driver_dir, driver_url.split("/")[-1])
+            size = download_resumable(driver_url, file_path)
+            zip_sha256 = _sha256(file_path)
+
+            exe = os.path.join(driver_dir, webdriver_executable())
+            try:
+                _extract_driver(file_path, exe)
+            except (zipfile.BadZipFile, LookupError):
+                os.remove(file_path)            # corrupt archive: never resume from it
+                raise
+            _write_json(os.path.join(driver_dir, 'driver.json'), {
+                'version': version,
+                'url': driver_url,
+                'zip_size': size,
+                'zip_sha256': zip_sha256,
+                'size': os.path.getsize(exe),
+                'sha256': _sha256(exe),
+            })
+            # Cleanup.
+            os.remove(file_path)
+            print('[INFO] lastest chromedriver downloaded')
+
+        _install(exe, webdriver_path)
         result = True
     except Exception as e:
         print(e)
         print("[WARN] unable to download lastest chromedriver. the system will use the local version instead.")
-    
-    return result
\ No newline at end of file
+
+    return result
+
+
+if __name__ == "__main__":
+    download_lastest_chromedriver(sys.argv[1] if len(sys.argv) > 1 else "")
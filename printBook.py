@@ -0,0 +1,439 @@
+"""
+printBook.py
+============
+Libro de impresión: un solo HTML autocontenido con el instructivo, todas las
+tarjetas y todas las fortunas, paginado para imprimir.
+
+El juego impreso vivía en 100+ HTML sueltos (juego_completo/tarjetas/ y
+fortunas/{azul,amarillo,rojo}/), cada uno con su propia copia del CSS, del
+@font-face y de sus imágenes. Aquí cada documento se desarma y se vuelve a
+armar dentro del libro:
+
+  - CSS: los <style> de cada documento se encapsulan bajo una clase
+    (.pb-sN): html / body / :root pasan a ser la sección del documento. Dos
+    documentos con el mismo CSS comparten la clase, así que el bloque se
+    escribe una vez (las tarjetas de un mismo color de franja, por ejemplo)
+  - imágenes: cada url() (data: o ruta local relativa a su lugar en
+    juego_completo/) se guarda una sola vez como variable en :root
+    (--pb-rN); el CSS del documento la usa a través de --pb-uN, que se fija
+    en la sección. Los <img> pasan a <span> con esa imagen de fondo
+  - fuentes: cada @font-face se incrusta en base64 una sola vez
+  - @import externos (Google Fonts del instructivo) una sola vez al inicio,
+    idénticos byte por byte al original (se verifica al armar el libro);
+    los <script> se omiten (el libro es para imprimir) y con ellos los
+    botones que dependían de ellos
+
+Cada sección (instructivo, tarjetas, fortunas por carril) empieza en página
+nueva; las cartas fluyen en cuadrícula sin partirse entre páginas. Las
+fortunas se repiten según su `cantidad` en fortunas.csv.
+
+Uso:
+    python printBook.py                               # juego_completo/ → juego_completo/libro_metropoly.html
+    python printBook.py --sin-copias                  # una fortuna de cada una
+    python gameFactory.py --libro                     # lo arma en cada ensamblado
+"""
+
+import os
+import re
+import html
+import base64
+import hashlib
+import mimetypes
+from pathlib import Path
+
+# =============================================================================
+# PATHS Y CONSTANTES
+# =============================================================================
+
+_HERE       = Path(__file__).parent
+_JUEGO      = _HERE / "juego_completo"
+LIBRO_NOMBRE = "libro_metropoly.html"
+
+_RE_COMENTARIO = re.compile(r"/\*.*?\*/", re.S)
+_RE_URL        = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+_RE_STYLE      = re.compile(r"<style[^>]*>(.*?)</style>", re.S | re.I)
+_RE_BODY       = re.compile(r"<body([^>]*)>(.*?)</body>", re.S | re.I)
+_RE_SCRIPT     = re.compile(r"<script\b.*?</script>", re.S | re.I)
+_RE_IMG        = re.compile(r"<img\b([^>]*?)/?>", re.S | re.I)
+_RE_ATTR       = re.compile(r"""([\w:-]+)\s*=\s*("[^"]*"|'[^']*')""")
+_RE_IMPORT     = re.compile(r"""@import\s+(?:url\([^)]*\)|"[^"]*"|'[^']*')[^;{}]*;""", re.I)
+_RE_RAIZ       = re.compile(r"^(?:(?:html|body|:root)(?=$|[\s>.:#\[])\s*>?\s*)+")
+
+_SECCIONES = [
+    # (id, título, carpeta en juego_completo, patrón, cuadrícula)
+    ("instructivo", "Instructivo",      "instructivo",       "*.html", False),
+    ("tarjetas",    "Tarjetas",         "tarjetas",          "*.html", True),
+    ("azul",        "Fortunas Azul",    "fortunas/azul",     "*.html", True),
+    ("amarillo",    "Fortunas Amarillo", "fortunas/amarillo", "*.html", True),
+    ("rojo",        "Fortunas Rojo",    "fortunas/rojo",     "*.html", True),
+]
+
+_LIBRO_CSS = """
+@page { size: letter; margin: 8mm; }
+* { -webkit-print-color-adjust: exact; print-color-adjust: exact; }
+html, body { margin: 0; padding: 0; background: #fff; }
+.pb-seccion { break-before: page; }
+.pb-seccion:first-of-type { break-before: auto; }
+.pb-titulo {
+  font: 700 14px/1.2 sans-serif; letter-spacing: .12em; text-transform: uppercase;
+  color: #555; margin: 6mm 0 4mm;
+}
+.pb-grid { display: flex; flex-wrap: wrap; gap: 3mm; align-content: flex-start; }
+.pb-doc  { position: relative; flex: none; }
+.pb-grid > .pb-doc { break-inside: avoid; }
+.pb-doc button { display: none; }
+.pb-img  { display: inline-block; background: center / contain no-repeat; }
+@media print { .pb-indice, .pb-titulo { display: none; } }
+"""
+
+
+# =============================================================================
+# RECURSOS COMPARTIDOS
+# =============================================================================
+
+class _Recursos:
+    """Imágenes y fuentes del libro, cada una una sola vez (por contenido)."""
+
+    def __init__(self):
+        self.vars:    dict[str, str] = {}     # huella → nombre de variable
+        self.uris:    dict[str, str] = {}     # nombre de variable → data URI
+        self._leidos: dict[str, str] = {}     # ruta absoluta → data URI
+        self.faltantes = set()
+
+    def data_uri(self, url: str, base: Path) -> str | None:
+        """url tal cual si ya es data:, la de un archivo local en base64, o None si falta."""
+        if url.startswith("data:"):
+            return url
+        ruta = os.path.normpath(os.path.join(base, url.split("#")[0].split("?")[0]))
+        if ruta not in self._leidos:
+            try:
+                with open(ruta, "rb") as f:
+                    datos = f.read()
+            except OSError:
+                self.faltantes.add(os.path.relpath(ruta, _HERE))
+                return None
+            mime = mimetypes.guess_type(ruta)[0] or "application/octet-stream"
+            if ruta.lower().endswith(".ttf"):
+                mime = "font/ttf"
+            self._leidos[ruta] = f"data:{mime};base64,{base64.b64encode(datos).decode('ascii')}"
+        return self._leidos[ruta]
+
+    def var(self, uri: str) -> str:
+        """Nombre de la variable de :root que guarda `uri` (la crea si es nueva)."""
+        h = hashlib.sha1(uri.encode("ascii", "replace")).hexdigest()
+        if h not in self.vars:
+            nombre = f"--pb-r{len(self.vars)}"
+            self.vars[h] = nombre
+            self.uris[nombre] = uri
+        return self.vars[h]
+
+    def css(self) -> str:
+        lineas = [f"  {n}: url('{u}');" for n, u in self.uris.items()]
+        return ":root {\n" + "\n".join(lineas) + "\n}" if lineas else ""
+
+
+def _externa(url: str) -> bool:
+    return url.startswith(("http:", "https:", "//"))
+
+
+# =============================================================================
+# CSS
+# =============================================================================
+
+def _saltar(css: str, j: int) -> int:
+    """
+    Si css[j] abre una cadena ('…' / "…") o un paréntesis (url(…), var(…)),
+    índice justo después de su cierre; si no, j + 1. Un ; { } dentro de
+    ellos (el wght@400;600 de Google Fonts) no corta la regla.
+    """
+    c, n = css[j], len(css)
+    if c in "'\"":
+        k = j + 1
+        while k < n and css[k] != c:
+            k += 2 if css[k] == "\\" else 1
+        return k + 1
+    if c == "(":
+        nivel, k = 1, j + 1
+        while k < n and nivel:
+            if css[k] in "'\"":
+                k = _saltar(css, k)
+                continue
+            nivel += {"(": 1, ")": -1}.get(css[k], 0)
+            k += 1
+        return k
+    return j + 1
+
+
+def _reglas(css: str):
+    """(preludio, bloque) de cada regla de primer nivel; bloque None en @import ...;"""
+    i, n = 0, len(css)
+    while i < n:
+        j = i
+        while j < n and css[j] not in "{;":
+            j = _saltar(css, j)
+        if j >= n:
+            return
+        preludio = css[i:j].strip()
+        if css[j] == ";":
+            if preludio:
+                yield preludio, None
+            i = j + 1
+            continue
+        nivel, k = 1, j + 1
+        while k < n and nivel:
+            if css[k] == "{":
+                nivel += 1
+            elif css[k] == "}":
+                nivel -= 1
+            elif css[k] in "'\"(":
+                k = _saltar(css, k)
+                continue
+            k += 1
+        yield preludio, css[j + 1:k - 1]
+        i = k
+
+
+def _encapsular_selector(sel: str, scope: str) -> str:
+    sel = sel.strip()
+    m = _RE_RAIZ.match(sel)
+    if not m:
+        return f"{scope} {sel}"
+    resto = sel[m.end():]
+    if not resto:
+        return scope
+    if resto[0] in ".:#[":            # body.light → .pb-s3.light
+        return scope + resto
+    return f"{scope} {resto}"
+
+
+def _encapsular(css: str, scope: str, globales: dict) -> str:
+    """
+    CSS de un documento con cada selector bajo `scope`. @import y @keyframes
+    van a `globales` (se escriben una vez); @page se descarta.
+    """
+    out = []
+    for preludio, bloque in _reglas(css):
+        low = preludio.lower()
+        if bloque is None:
+            if low.startswith("@import"):
+                globales.setdefault(preludio + ";", None)
+            continue
+        if low.startswith("@page"):
+            continue
+        elif low.startswith(("@media", "@supports")):
+            out.append(f"{preludio} {{\n{_encapsular(bloque, scope, globales)}\n}}")
+        elif low.startswith("@"):
+            globales.setdefault(f"{preludio} {{{bloque}}}", None)
+        else:
+            sels = ", ".join(dict.fromkeys(_encapsular_selector(s, scope) for s in preludio.split(",")))
+            out.append(f"{sels} {{{bloque}}}")
+    return "\n".join(out)
+
+
+# =============================================================================
+# DOCUMENTOS
+# =============================================================================
+
+class _Libro:
+    def __init__(self):
+        self.recursos = _Recursos()
+        self.globales: dict[str, None] = {}     # @import / @font-face / @keyframes (orden de llegada)
+        self.hojas:    dict[str, str]  = {}     # huella del CSS → clase .pb-sN
+        self.css:      list[str]       = []
+
+    def _urls_a_vars(self, texto: str, base: Path, locales: list) -> str:
+        """
+        Reemplaza cada url() de `texto` por var(--pb-uN) y anota en `locales`
+        la variable compartida de esa imagen. Las externas se dejan.
+        """
+        def _sub(m):
+            url = m.group(2).strip()
+            if _externa(url):
+                return m.group(0)
+            uri = self.recursos.data_uri(url, base)
+            if uri is None:
+                return "none"
+            locales.append(self.recursos.var(uri))
+            return f"var(--pb-u{len(locales) - 1})"
+        return _RE_URL.sub(_sub, texto)
+
+    def _font_faces(self, css: str, base: Path) -> str:
+        """
+        Saca los @font-face de `css` a los globales con la fuente incrustada
+        (los descriptores de @font-face no aceptan var()). Devuelve el resto.
+        """
+        def _face(m):
+            def _sub(u):
+                url = u.group(2).strip()
+                uri = None if _externa(url) else self.recursos.data_uri(url, base)
+                return f"url('{uri}')" if uri else u.group(0)
+            self.globales.setdefault(" ".join(_RE_URL.sub(_sub, m.group(0)).split()), None)
+            return ""
+        return re.sub(r"@font-face\s*\{[^}]*\}", _face, css, flags=re.I)
+
+    def documento(self, texto: str, base: Path, extra_clase: str = "") -> str:
+        """HTML de una sección del libro a partir de un documento completo."""
+        texto = _RE_SCRIPT.sub("", texto)
+        locales: list[str] = []
+
+        css = _RE_COMENTARIO.sub("", "\n".join(_RE_STYLE.findall(texto)))
+        css = self._urls_a_vars(self._font_faces(css, base), base, locales)
+        huella = hashlib.sha1(css.encode("utf-8")).hexdigest()
+        if huella not in self.hojas:
+            clase = f"pb-s{len(self.hojas)}"
+            self.hojas[huella] = clase
+            self.css.append(_encapsular(css, "." + clase, self.globales))
+        clase = self.hojas[huella]
+
+        m = _RE_BODY.search(texto)
+        attrs, cuerpo = (m.group(1), m.group(2)) if m else ("", texto)
+        cuerpo = _RE_STYLE.sub("", cuerpo)
+        cuerpo = _RE_IMG.sub(lambda im: self._img(im.group(1), base), cuerpo)
+        cuerpo = re.sub(
+            r"""style=(["'])(.*?)\1""",
+            lambda sm: f'style={sm.group(1)}{self._estilo_inline(sm.group(2), base)}{sm.group(1)}',
+            cuerpo, flags=re.S,
+        )
+
+        body = dict((k.lower(), v[1:-1]) for k, v in _RE_ATTR.findall(attrs))
+        clases = " ".join(c for c in ("pb-doc", clase, body.get("class", ""), extra_clase) if c)
+        estilo = "".join(f"--pb-u{i}:var({v});" for i, v in enumerate(locales)) + body.get("style", "")
+        estilo = f' style="{html.escape(estilo, quote=True)}"' if estilo else ""
+        return f'<section class="{clases}"{estilo}>{cuerpo.strip()}</section>'
+
+    def _estilo_inline(self, estilo: str, base: Path) -> str:
+        def _sub(m):
+            url = m.group(2).strip()
+            if _externa(url):
+                return m.group(0)
+            uri = self.recursos.data_uri(url, base)
+            return f"var({self.recursos.var(uri)})" if uri else "none"
+        return _RE_URL.sub(_sub, html.unescape(estilo)).replace('"', "'")
+
+    def _img(self, attrs: str, base: Path) -> str:
+        """<img src=…> → <span> con la imagen compartida de fondo."""
+        a = dict((k.lower(), v[1:-1]) for k, v in _RE_ATTR.findall(attrs))
+        src, alt = a.get("src", ""), a.get("alt", "")
+        uri = None if not src or _externa(src) else self.recursos.data_uri(src, base)
+        if uri is None:
+            return f"<img{attrs}>"
+        estilo = f"background-image:var({self.recursos.var(uri)});{a.get('style', '')}"
+        clases = " ".join(c for c in ("pb-img", a.get("class", "")) if c)
+        return (f'<span class="{clases}" role="img" aria-label="{html.escape(alt, quote=True)}" '
+                f'style="{html.escape(estilo, quote=True)}"></span>')
+
+    def html(self, secciones: list[str], titulo: str) -> str:
+        imports = [g for g in self.globales if g.lower().startswith("@import")]
+        resto   = [g for g in self.globales if not g.lower().startswith("@import")]
+        estilos = "\n".join([*imports, *resto, self.recursos.css(), _LIBRO_CSS, *self.css])
+        return (
+            "<!DOCTYPE html>\n<html lang=\"es\">\n<head>\n<meta charset=\"UTF-8\">\n"
+            f"<title>{html.escape(titulo)}</title>\n<style>\n{estilos}\n</style>\n</head>\n<body>\n"
+            + "\n".join(secciones) + "\n</body>\n</html>"
+        )
+
+
+# =============================================================================
+# API
+# =============================================================================
+
+def copias_fortunas(fortunas_path) -> dict[str, int]:
+    """{nombre de archivo de la carta: cantidad} desde fortunas.csv."""
+    from fortunaFactory import cargar_fortunas, _safe_name
+    df = cargar_fortunas(str(fortunas_path))
+    return {
+        f"fortuna_{int(r.carril)}_{_safe_name(str(r.nombre))}.html": int(r.cantidad)
+        for r in df.itertuples(index=False)
+    }
+
+
+def construir_libro(archivos: dict, copias: dict = None, juego_dir: Path = _JUEGO,
+                    titulo: str = "Metropoly — Libro de impresión") -> tuple[str, dict]:
+    """
+    Arma el libro. archivos: {ruta relativa en juego_completo/: Path de origen}
+    (la de gameFactory.ensamblar); las URLs relativas de cada documento se
+    resuelven contra su lugar en `juego_dir`. copias: {nombre de archivo: n}.
+    Devuelve (html, resumen).
+    """
+    copias = copias or {}
+    libro  = _Libro()
+    por_dir: dict[str, list] = {}
+    for rel, src in archivos.items():
+        rel = Path(rel)
+        por_dir.setdefault(rel.parent.as_posix(), []).append((rel, Path(src)))
+
+    secciones, indice, documentos, paginas = [], [], 0, 0
+    imports: dict[str, None] = {}
+    for sid, titulo_sec, carpeta, patron, cuadricula in _SECCIONES:
+        docs = sorted(
+            (rel, src) for rel, src in por_dir.get(carpeta, []) if rel.match(patron)
+        )
+        if not docs:
+            continue
+        partes = []
+        for rel, src in docs:
+            texto = src.read_text(encoding="utf-8")
+            for css in _RE_STYLE.findall(_RE_COMENTARIO.sub("", texto)):
+                imports.update(dict.fromkeys(_RE_IMPORT.findall(css)))
+            sec   = libro.documento(texto, juego_dir / rel.parent)
+            partes.extend([sec] * max(1, copias.get(rel.name, 1)))
+            documentos += 1
+        paginas += len(partes)
+        contenedor = "pb-grid" if cuadricula else "pb-flujo"
+        secciones.append(
+            f'<div class="pb-seccion" id="{sid}">\n<h2 class="pb-titulo">{titulo_sec}</h2>\n'
+            f'<div class="{contenedor}">\n' + "\n".join(partes) + "\n</div>\n</div>"
+        )
+        indice.append(f'<a href="#{sid}">{titulo_sec} ({len(partes)})</a>')
+
+    nav = '<nav class="pb-indice pb-titulo">' + " · ".join(indice) + "</nav>"
+    out = libro.html([nav, *secciones], titulo)
+    return out, {
+        "documentos": documentos,
+        "piezas":     paginas,
+        "estilos":    len(libro.hojas),
+        "recursos":   len(libro.recursos.uris),
+        "faltantes":  sorted(libro.recursos.faltantes),
+        "imports":    verificar_imports(imports, out),
+        "bytes":      len(out.encode("utf-8")),
+    }
+
+
+def verificar_imports(imports, libro_html: str) -> list[str]:
+    """@import de los documentos que no llegaron byte por byte al libro."""
+    return [imp for imp in imports if imp not in libro_html]
+
+
+def reportar(resumen: dict, label: str = "printBook") -> None:
+    print(f"[{label}] Libro: {resumen['documentos']} documentos · {resumen['piezas']} piezas · "
+          f"{resumen['estilos']} hojas de estilo · {resumen['recursos']} imágenes compartidas · "
+          f"{resumen['bytes'] / 1e6:.1f} MB")
+    for f in resumen["faltantes"]:
+        print(f"[{label}] ⚠️  Recurso no encontrado: {f}")
+    for imp in resumen["imports"]:
+        print(f"[{label}] ❌ @import alterado en el libro: {imp}")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Libro de impresión autocontenido")
+    parser.add_argument("--juego",    type=Path, default=_JUEGO, help="Carpeta juego_completo/")
+    parser.add_argument("--fortunas", type=Path, default=_HERE / "props" / "fortunas.csv")
+    parser.add_argument("--sin-copias", action="store_true",
+                        help="Una fortuna de cada una (sin repetir por cantidad)")
+    parser.add_argument("--output",   type=Path, help=f"Default: <juego>/{LIBRO_NOMBRE}")
+    args = parser.parse_args()
+
+    archivos = {
+        f.relative_to(args.juego): f
+        for _, _, carpeta, patron, _ in _SECCIONES
+        for f in (args.juego / carpeta).glob(patron)
+    }
+    copias = {} if args.sin_copias else copias_fortunas(args.fortunas)
+    texto, resumen = construir_libro(archivos, copias, args.juego)
+    out = args.output or args.juego / LIBRO_NOMBRE
+    out.write_text(texto, encoding="utf-8")
+    reportar(resumen)
+    print(f"[printBook] {out}")
+    if resumen["imports"]:
+        raise SystemExit(1)
@@ -0,0 +1,92 @@
+"""
+propsReader.py
+==============
+Lectura de tablas de props (casillas y fortunas) desde cualquier formato
+soportado, devolviendo siempre un DataFrame de pandas.
+
+Formatos:
+  .csv                      → pandas.read_csv
+  .xlsx / .xls              → pandas.read_excel
+  .parquet                  → pyarrow.parquet (opcional)
+  .arrow / .feather / .ipc  → Arrow IPC con memory-map (opcional)
+
+Con Parquet/Arrow las columnas numéricas (precio, renta_base, tipo, carril,
+nivel, cantidad) ya vienen tipadas: se entregan como arreglos NumPy sin
+copia (vista directa sobre el buffer Arrow / el archivo mapeado) y no pasan
+por el parseo de texto ni por la coerción de tipos del CSV.
+
+pyarrow es opcional; solo se importa si se pide un archivo Arrow/Parquet.
+"""
+
+import os
+
+import pandas as pd
+
+ARROW_EXTS   = (".arrow", ".feather", ".ipc")
+PARQUET_EXTS = (".parquet", ".pq")
+SUPPORTED    = (".csv", ".xlsx", ".xls") + PARQUET_EXTS + ARROW_EXTS
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "[propsReader] pyarrow no instalado. Ejecuta:\n"
+            "    pip install pyarrow\n"
+            "para leer archivos Parquet / Arrow IPC."
+        )
+
+
+def leer_arrow(path: str):
+    """
+    Devuelve un pyarrow.Table.
+    Arrow IPC se abre con memory-map: los buffers apuntan directo al archivo.
+    """
+    _require_pyarrow()
+    import pyarrow as pa
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext in PARQUET_EXTS:
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True)
+
+    source = pa.memory_map(path, "r")
+    try:
+        return pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        # Formato stream (sin footer) en vez de file
+        source.seek(0)
+        return pa.ipc.open_stream(source).read_all()
+
+
+def leer_tabla(path: str) -> pd.DataFrame:
+    """Lee CSV / Excel / Parquet / Arrow IPC y devuelve un DataFrame."""
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".csv":
+        return pd.read_csv(path)
+    if ext in (".xlsx", ".xls"):
+        return pd.read_excel(path)
+    if ext in PARQUET_EXTS + ARROW_EXTS:
+        table = leer_arrow(path)
+        # split_blocks=True: cada columna numérica sin nulos queda como vista
+        # sobre el buffer Arrow en lugar de consolidarse (copiarse) en un bloque
+        return table.to_pandas(split_blocks=True)
+
+    raise ValueError(f"Extensión no soportada: {ext}")
+
+
+def coerce_numeric(df: pd.DataFrame, columnas, fill: float = 0) -> pd.DataFrame:
+    """
+    Convierte columnas a numérico y rellena NaN. Las columnas que ya son
+    numéricas sin nulos (caso Arrow/Parquet) no se tocan — ni copia ni parseo.
+    """
+    for col in columnas:
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if pd.api.types.is_numeric_dtype(s) and not s.isna().any():
+            continue
+        df[col] = pd.to_numeric(s, errors="coerce").fillna(fill)
+    return df
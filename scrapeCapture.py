@@ -0,0 +1,220 @@
+"""
+scrapeCapture.py
+================
+Capturas de las páginas de resultados del scraper y reproducción offline de
+las estrategias de extracción de URLs.
+
+Cuando Google cambia su HTML, probar selectores nuevos obligaba a levantar
+Chrome y repetir la búsqueda de cada casilla. Con scraper.capturas en
+board_config.json (o `imageScraper.py --capturar`) cada búsqueda guarda:
+
+  src/img/.capturas/{safe_nombre}.json.gz
+      {nombre, url, ts, estrategia, urls, page_source}
+
+page_source se toma después de correr las estrategias, así que incluye el
+panel de alta resolución si el click en una miniatura lo abrió.
+
+La reproducción carga cada captura en un ReplayDriver (BeautifulSoup sobre
+el page_source guardado, con la interfaz de WebDriver que usan las
+estrategias), vuelve a correr imageScraper.extraer_urls con los selectores
+actuales y compara contra las URLs capturadas. Sin navegador ni red: toda
+la edición en segundos.
+
+Uso:
+    python scrapeCapture.py                      # reproduce todas las capturas
+    python scrapeCapture.py "Torre Minerva"      # solo esas casillas
+    python scrapeCapture.py --detalle            # lista URLs nuevas / perdidas
+"""
+
+import os
+import re
+import gzip
+import json
+import time
+
+from bs4 import BeautifulSoup
+
+from cardFactory import _IMG_DIR, _safe_name
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+_CAPTURE_DIR = os.path.join(_IMG_DIR, ".capturas")
+_EXT         = ".json.gz"
+
+# //button[contains(., 'Aceptar todo')] — el único XPath que usa el scraper
+_XPATH_CONTAINS = re.compile(r"^//(\w+)\[contains\(\., '([^']*)'\)\]$")
+
+
+# =============================================================================
+# ALMACÉN
+# =============================================================================
+
+class CaptureStore:
+    """Una captura comprimida por casilla; la más reciente reemplaza a la anterior."""
+
+    def __init__(self, ruta: str = _CAPTURE_DIR):
+        self.ruta = ruta
+
+    def _path(self, nombre: str) -> str:
+        return os.path.join(self.ruta, _safe_name(nombre) + _EXT)
+
+    def guardar(self, nombre: str, driver, urls: list[str], estrategia: str | None) -> None:
+        try:
+            captura = {
+                "nombre":      nombre,
+                "url":         driver.current_url,
+                "ts":          time.time(),
+                "estrategia":  estrategia,
+                "urls":        sorted(urls),
+                "page_source": driver.page_source,
+            }
+        except Exception as e:          # navegador caído a media captura
+            print(f"[scrapeCapture] '{nombre}': no se pudo capturar ({type(e).__name__})")
+            return
+        os.makedirs(self.ruta, exist_ok=True)
+        path = self._path(nombre)
+        tmp  = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(captura, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def cargar(self, nombre: str) -> dict | None:
+        try:
+            with gzip.open(self._path(nombre), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def nombres(self) -> list[str]:
+        """Nombres de casilla con captura, en orden alfabético."""
+        if not os.path.isdir(self.ruta):
+            return []
+        out = []
+        for fn in sorted(os.listdir(self.ruta)):
+            if fn.endswith(_EXT):
+                cap = self.cargar(fn[:-len(_EXT)])
+                if cap:
+                    out.append(cap["nombre"])
+        return out
+
+
+# =============================================================================
+# DRIVER DE REPRODUCCIÓN
+# =============================================================================
+
+class _ReplayElement:
+    def __init__(self, tag):
+        self._tag = tag
+
+    @property
+    def text(self) -> str:
+        return self._tag.get_text(" ", strip=True)
+
+    def get_attribute(self, name: str):
+        valor = self._tag.get(name)
+        return " ".join(valor) if isinstance(valor, list) else valor
+
+    def click(self) -> None:
+        pass
+
+
+class ReplayDriver:
+    """
+    Página capturada con la parte de la interfaz de WebDriver que usan las
+    estrategias de extracción. Los clicks no cambian nada: lo que abrieron
+    en la corrida original ya está en el page_source.
+    """
+
+    def __init__(self, page_source: str, url: str = "about:blank"):
+        self.page_source = page_source
+        self.current_url = url
+        self._soup       = BeautifulSoup(page_source, "html.parser")
+
+    def find_elements(self, by: str, selector: str) -> list:
+        if by == "css selector":
+            return [_ReplayElement(t) for t in self._soup.select(selector)]
+        m = _XPATH_CONTAINS.match(selector) if by == "xpath" else None
+        if m is None:
+            raise ValueError(f"Selector no soportado en reproducción: {by} {selector}")
+        tag, texto = m.groups()
+        return [_ReplayElement(t) for t in self._soup.find_all(tag)
+                if texto in t.get_text(" ", strip=True)]
+
+    def execute_script(self, *args):
+        return None
+
+    def get(self, url: str) -> None:
+        self.current_url = url
+
+    def delete_all_cookies(self) -> None:
+        pass
+
+    def quit(self) -> None:
+        pass
+
+
+# =============================================================================
+# REPRODUCCIÓN
+# =============================================================================
+
+def reproducir(store: CaptureStore, nombres: list[str] | None = None) -> list[dict]:
+    """
+    Corre las estrategias actuales sobre cada captura. Por casilla devuelve
+    la estrategia y las URLs de la captura (antes) y de ahora, con las URLs
+    nuevas y perdidas.
+    """
+    from imageScraper import extraer_urls
+
+    resultados = []
+    for nombre in nombres or store.nombres():
+        cap = store.cargar(nombre)
+        if cap is None:
+            print(f"[scrapeCapture] '{nombre}': sin captura")
+            continue
+        driver = ReplayDriver(cap["page_source"], cap.get("url") or "about:blank")
+        urls, estrategia = extraer_urls(driver, {"imagen": 0})   # sin panel que esperar
+        antes, ahora = set(cap["urls"]), set(urls)
+        resultados.append({
+            "nombre":           cap["nombre"],
+            "estrategia_antes": cap["estrategia"],
+            "estrategia":       estrategia,
+            "antes":            len(antes),
+            "ahora":            len(ahora),
+            "nuevas":           sorted(ahora - antes),
+            "perdidas":         sorted(antes - ahora),
+        })
+    return resultados
+
+
+def reportar(resultados: list[dict], segundos: float, detalle: bool = False) -> None:
+    cambiaron = [r for r in resultados if r["nuevas"] or r["perdidas"]]
+    for r in resultados:
+        marca = "≠" if r in cambiaron else " "
+        print(f"   {marca} {r['nombre']:<32} {r['estrategia_antes'] or '—':>11} → "
+              f"{r['estrategia'] or '—':<11} {r['antes']:>3} → {r['ahora']:<3} URLs"
+              + (f"  +{len(r['nuevas'])} −{len(r['perdidas'])}" if r in cambiaron else ""))
+        if detalle and r in cambiaron:
+            for u in r["nuevas"]:
+                print(f"        + {u[:100]}")
+            for u in r["perdidas"]:
+                print(f"        − {u[:100]}")
+    con_antes = sum(1 for r in resultados if r["antes"])
+    con_ahora = sum(1 for r in resultados if r["ahora"])
+    print(f"[scrapeCapture] {len(resultados)} captura(s) en {segundos:.1f}s · "
+          f"con URLs: {con_antes} → {con_ahora} · {len(cambiaron)} con cambios")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Reproduce las estrategias de extracción sobre las capturas guardadas")
+    parser.add_argument("nombres", nargs="*", help="Casillas a reproducir (default: todas)")
+    parser.add_argument("--dir", default=_CAPTURE_DIR, help="Carpeta de capturas")
+    parser.add_argument("--detalle", action="store_true", help="Lista URLs nuevas y perdidas")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    resultados = reproducir(CaptureStore(args.dir), args.nombres or None)
+    reportar(resultados, time.perf_counter() - t0, args.detalle)
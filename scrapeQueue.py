@@ -0,0 +1,396 @@
+"""
+scrapeQueue.py
+==============
+Cola persistente (SQLite) de trabajos de scraping de imágenes de casillas.
+
+Cada casilla sin imagen en src/img/ es un trabajo en src/img/scrape_queue.sqlite:
+
+  trabajos (nombre, estado, intentos, worker, error, ruta, actualizado)
+      estado: pendiente → en_curso → hecho | fallido
+      (una falla pasajera regresa a pendiente hasta `max_intentos`)
+
+Los workers reclaman trabajos de forma atómica (BEGIN IMMEDIATE), así que
+varios hilos o procesos (generator.py y un `scrape` en segundo plano)
+comparten la cola sin repetir búsquedas. Si el proceso se interrumpe, lo ya
+hecho queda registrado; un trabajo en_curso abandonado se vuelve a reclamar
+pasados `_STALE_SECS` o con `recuperar`.
+
+Uso:
+    python scrapeQueue.py scrape                          # precalienta imágenes de props/zmg.csv
+    python scrapeQueue.py scrape --input props/gdl.csv --workers 3 &
+    python generator.py --solo-cache                      # renderiza con lo que ya haya
+    python scrapeQueue.py estado
+    python scrapeQueue.py recuperar                       # en_curso → pendiente
+    python scrapeQueue.py scrape --reintentar             # también los fallidos
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+# =============================================================================
+# PATHS Y CONSTANTES
+# =============================================================================
+
+_HERE    = os.path.dirname(os.path.abspath(__file__))
+_DB_PATH = os.path.join(_HERE, "src", "img", "scrape_queue.sqlite")
+
+ESTADOS      = ("pendiente", "en_curso", "hecho", "fallido")
+MAX_INTENTOS = 3
+_STALE_SECS  = 600    # un en_curso sin actividad por más tiempo se da por abandonado
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trabajos (
+    nombre      TEXT    PRIMARY KEY,
+    estado      TEXT    NOT NULL DEFAULT 'pendiente',
+    intentos    INTEGER NOT NULL DEFAULT 0,
+    worker      TEXT,
+    error       TEXT,
+    ruta        TEXT,
+    creado      REAL,
+    actualizado REAL
+);
+CREATE INDEX IF NOT EXISTS idx_trabajos_estado ON trabajos (estado, intentos, creado);
+"""
+
+
+def _worker_id() -> str:
+    return f"{os.getpid()}:{threading.get_ident()}"
+
+
+# =============================================================================
+# COLA
+# =============================================================================
+
+class ScrapeQueue:
+
+    def __init__(self, db_path: str = _DB_PATH, max_intentos: int = MAX_INTENTOS):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path      = db_path
+        self.max_intentos = max_intentos
+        # autocommit: cada operación abre su propia transacción explícita
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    def _tx(self, fn):
+        """Ejecuta fn(conn) dentro de BEGIN IMMEDIATE (bloqueo de escritura entre procesos)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return out
+
+    def encolar(self, nombres: list[str], reintentar: bool = False) -> int:
+        """
+        Agrega trabajos pendientes. Un `hecho` cuya imagen ya no existe vuelve
+        a pendiente (el llamador solo pasa casillas sin imagen); un `fallido`
+        solo con `reintentar`. Devuelve cuántos quedaron pendientes.
+        """
+        ahora   = time.time()
+        revivir = ("hecho", "fallido") if reintentar else ("hecho",)
+
+        def _fn(conn):
+            conn.executemany(
+                f"""INSERT INTO trabajos (nombre, creado, actualizado) VALUES (?, ?, ?)
+                    ON CONFLICT(nombre) DO UPDATE SET
+                        estado = 'pendiente', intentos = 0, error = NULL, actualizado = excluded.actualizado
+                    WHERE trabajos.estado IN ({", ".join("?" * len(revivir))})""",
+                [(n, ahora, ahora, *revivir) for n in nombres],
+            )
+            return conn.execute(
+                "SELECT COUNT(*) FROM trabajos WHERE estado = 'pendiente'"
+            ).fetchone()[0]
+        return self._tx(_fn)
+
+    def reclamar(self, nombre: str = None, worker: str = None,
+                 reintentar: bool = False) -> str | None:
+        """
+        Marca un trabajo como en_curso para `worker` y devuelve su nombre.
+        Con `nombre` reclama esa casilla (creándola si no estaba), salvo que
+        otro worker la tenga en curso o que ya haya fallado `max_intentos`
+        veces (con `reintentar` se reclama con los intentos en cero); sin
+        `nombre` toma el siguiente pendiente.
+        Devuelve None si no hay nada que reclamar.
+        """
+        worker = worker or _worker_id()
+        ahora  = time.time()
+
+        def _fn(conn):
+            if nombre is None:
+                row = conn.execute(
+                    """SELECT nombre FROM trabajos
+                       WHERE estado = 'pendiente'
+                          OR (estado = 'en_curso' AND actualizado < ?)
+                       ORDER BY intentos, creado LIMIT 1""",
+                    (ahora - _STALE_SECS,),
+                ).fetchone()
+                if row is None:
+                    return None
+                elegido = row["nombre"]
+            else:
+                row = conn.execute(
+                    "SELECT estado, intentos, worker, actualizado FROM trabajos WHERE nombre = ?",
+                    (nombre,),
+                ).fetchone()
+                if (row and row["estado"] == "en_curso" and row["worker"] != worker
+                        and row["actualizado"] >= ahora - _STALE_SECS):
+                    return None
+                if row and row["estado"] == "fallido" and row["intentos"] >= self.max_intentos:
+                    if not reintentar:
+                        return None
+                    conn.execute("UPDATE trabajos SET intentos = 0 WHERE nombre = ?", (nombre,))
+                elegido = nombre
+                conn.execute(
+                    "INSERT OR IGNORE INTO trabajos (nombre, creado, actualizado) VALUES (?, ?, ?)",
+                    (nombre, ahora, ahora),
+                )
+            conn.execute(
+                """UPDATE trabajos SET estado = 'en_curso', worker = ?, intentos = intentos + 1,
+                                       actualizado = ?
+                   WHERE nombre = ?""",
+                (worker, ahora, elegido),
+            )
+            return elegido
+        return self._tx(_fn)
+
+    def terminar(self, nombre: str, ruta: str = None, error: str = None,
+                 definitivo: bool = True) -> str:
+        """
+        Cierra un trabajo: hecho si hay `ruta`; si no, fallido (o pendiente
+        de nuevo si la falla es pasajera y quedan intentos). Devuelve el estado.
+        """
+        def _fn(conn):
+            row = conn.execute("SELECT intentos FROM trabajos WHERE nombre = ?", (nombre,)).fetchone()
+            intentos = row["intentos"] if row else 0
+            if ruta:
+                estado = "hecho"
+            elif definitivo or intentos >= self.max_intentos:
+                estado = "fallido"
+            else:
+                estado = "pendiente"
+            conn.execute(
+                """UPDATE trabajos SET estado = ?, ruta = ?, error = ?, worker = NULL, actualizado = ?
+                   WHERE nombre = ?""",
+                (estado, ruta, error, time.time(), nombre),
+            )
+            return estado
+        return self._tx(_fn)
+
+    def liberar(self, nombre: str) -> None:
+        """Regresa a pendiente un trabajo interrumpido (Ctrl+C) sin contarlo como intento."""
+        self._tx(lambda conn: conn.execute(
+            """UPDATE trabajos SET estado = 'pendiente', worker = NULL,
+                                   intentos = MAX(intentos - 1, 0), actualizado = ?
+               WHERE nombre = ? AND estado = 'en_curso'""",
+            (time.time(), nombre),
+        ))
+
+    def recuperar(self) -> int:
+        """Todos los en_curso → pendiente (tras una interrupción). Devuelve cuántos."""
+        return self._tx(lambda conn: conn.execute(
+            "UPDATE trabajos SET estado = 'pendiente', worker = NULL WHERE estado = 'en_curso'"
+        ).rowcount)
+
+    def resumen(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT estado, COUNT(*) AS n FROM trabajos GROUP BY estado"
+            ).fetchall()
+        out = dict.fromkeys(ESTADOS, 0)
+        out.update({r["estado"]: r["n"] for r in rows})
+        return out
+
+    def trabajo(self, nombre: str) -> sqlite3.Row | None:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT * FROM trabajos WHERE nombre = ?", (nombre,)
+            ).fetchone()
+
+    def fallidos(self) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT nombre, intentos, error FROM trabajos WHERE estado = 'fallido' ORDER BY nombre"
+            ).fetchall()
+
+
+_OPEN: dict[str, ScrapeQueue] = {}
+_OPEN_LOCK = threading.Lock()
+
+
+def open_queue(db_path: str = _DB_PATH) -> ScrapeQueue:
+    """Cola compartida del proceso para `db_path`."""
+    key = os.path.abspath(db_path)
+    with _OPEN_LOCK:
+        q = _OPEN.get(key)
+        if q is None:
+            q = _OPEN[key] = ScrapeQueue(db_path)
+        return q
+
+
+# =============================================================================
+# EJECUCIÓN
+# =============================================================================
+
+def _ejecutar(q: ScrapeQueue, nombre: str, cfg: dict) -> str | None:
+    """Busca la imagen de un trabajo ya reclamado y registra el resultado."""
+    from imageScraper import buscar_imagen, get_providers, get_negative_cache, NEGATIVE_TTL_HOURS
+
+    sc        = cfg.get("scraper", {})
+    negativas = get_negative_cache(sc.get("negative_ttl_hours", NEGATIVE_TTL_HOURS))
+    try:
+        ruta = buscar_imagen(
+            nombre,
+            get_providers(sc),
+            min_res=sc.get("min_resolution", [80, 80]),
+            max_res=sc.get("max_resolution", [3840, 2160]),
+            negativas=negativas,
+            rescrape=sc.get("rescrape", False),
+        )
+    except Exception as e:
+        q.terminar(nombre, error=f"{type(e).__name__}: {e}", definitivo=False)
+        raise
+    except BaseException:
+        q.liberar(nombre)
+        raise
+
+    if ruta:
+        q.terminar(nombre, ruta=ruta)
+    else:
+        # Sin entrada negativa = falla pasajera (sin red, navegador caído): se reintenta
+        sin_imagen = negativas.get(nombre)
+        q.terminar(nombre, error=sin_imagen["motivo"] if sin_imagen else "proveedor no disponible",
+                   definitivo=sin_imagen is not None)
+    return ruta
+
+
+def scrape_tile(nombre: str, cfg: dict, q: ScrapeQueue = None) -> str | None:
+    """
+    Scrapea una casilla a través de la cola (la usa cardFactory). Si otro
+    worker o proceso ya la está buscando, o ya agotó sus intentos (salvo
+    scraper.rescrape), no espera: devuelve None y la casilla se renderiza
+    con el fondo de color.
+    """
+    q = q or open_queue()
+    if q.reclamar(nombre, reintentar=cfg.get("scraper", {}).get("rescrape", False)) is None:
+        row = q.trabajo(nombre)
+        if row and row["estado"] == "fallido":
+            print(f"[scrapeQueue] '{nombre}': agotó sus {row['intentos']} intentos ({row['error']}), "
+                  f"se usa el fondo de color (--rescrape o scrape --reintentar)")
+        else:
+            print(f"[scrapeQueue] '{nombre}': se está buscando en otro proceso, se usa el fondo de color")
+        return None
+    return _ejecutar(q, nombre, cfg)
+
+
+def scrape(input_path: str, cfg: dict = None, workers: int = 2,
+           reintentar: bool = False, db_path: str = _DB_PATH) -> dict[str, int]:
+    """
+    Precalienta las imágenes de una edición: encola las casillas de
+    `input_path` sin imagen en caché y las procesa con `workers` hilos.
+    """
+    from cardFactory import _load_config, _cached_image
+    from tileCatalog import open_catalog
+
+    cfg = cfg or _load_config()
+    q   = open_queue(db_path)
+
+    nombres = [r["nombre"] for r in open_catalog(input_path).rows()]
+    faltan  = [n for n in nombres if not _cached_image(n)]
+    pendientes = q.encolar(faltan, reintentar=reintentar)
+    print(f"[scrapeQueue] {len(nombres)} casillas · {len(nombres) - len(faltan)} con imagen · "
+          f"{pendientes} pendiente(s)")
+
+    lock    = threading.Lock()
+    hechos  = [0]
+    activos = {}     # worker → casilla en curso (para liberarlas si se interrumpe)
+
+    def _worker(i: int):
+        worker = f"{_worker_id()}#{i}"
+        while True:
+            nombre = q.reclamar(worker=worker)
+            if nombre is None:
+                return
+            activos[worker] = nombre
+            if _cached_image(nombre):        # otro proceso ya la trajo
+                q.terminar(nombre, ruta=_cached_image(nombre))
+                activos.pop(worker, None)
+                continue
+            try:
+                _ejecutar(q, nombre, cfg)
+            except Exception as e:
+                print(f"[scrapeQueue] Error en '{nombre}': {e}")
+            activos.pop(worker, None)
+            with lock:
+                hechos[0] += 1
+                print(f"[scrapeQueue] [{hechos[0]}] {nombre}")
+
+    t0 = time.perf_counter()
+    hilos = [threading.Thread(target=_worker, args=(i,), daemon=True) for i in range(max(1, workers))]
+    for h in hilos:
+        h.start()
+    try:
+        for h in hilos:
+            h.join()
+    except KeyboardInterrupt:
+        for nombre in list(activos.values()):
+            q.liberar(nombre)
+        print("[scrapeQueue] Interrumpido: el progreso queda en la cola (python scrapeQueue.py scrape reanuda)")
+        raise SystemExit(130)
+
+    res = q.resumen()
+    print(f"[scrapeQueue] {hechos[0]} procesadas en {time.perf_counter() - t0:.1f}s · "
+          + " · ".join(f"{k}={v}" for k, v in res.items()))
+    from imageScraper import reporte_scraper
+    reporte_scraper("scrapeQueue")
+    return res
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Cola persistente de scraping de imágenes")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_sc = sub.add_parser("scrape", help="Precalienta las imágenes de una edición")
+    p_sc.add_argument("--input",   default=os.path.join("props", "zmg.csv"))
+    p_sc.add_argument("--workers", type=int, default=2)
+    p_sc.add_argument("--reintentar", action="store_true", help="Reencola también los fallidos")
+    p_sc.add_argument("--rescrape",   action="store_true", help="Ignora la caché negativa")
+    p_sc.add_argument("--db", default=_DB_PATH)
+
+    p_st = sub.add_parser("estado", help="Resumen de la cola y trabajos fallidos")
+    p_st.add_argument("--db", default=_DB_PATH)
+
+    p_rc = sub.add_parser("recuperar", help="Regresa a pendiente los trabajos en curso")
+    p_rc.add_argument("--db", default=_DB_PATH)
+
+    args = parser.parse_args()
+
+    if args.cmd == "scrape":
+        from cardFactory import _load_config
+        cfg = _load_config()
+        if args.rescrape:
+            cfg = {**cfg, "scraper": {**cfg.get("scraper", {}), "rescrape": True}}
+        scrape(args.input, cfg=cfg, workers=args.workers, reintentar=args.reintentar, db_path=args.db)
+    elif args.cmd == "estado":
+        q = open_queue(args.db)
+        print("[scrapeQueue] " + " · ".join(f"{k}={v}" for k, v in q.resumen().items()))
+        for r in q.fallidos():
+            print(f"   {r['nombre']:<36} ×{r['intentos']}  {r['error'] or ''}")
+    else:
+        print(f"[scrapeQueue] {open_queue(args.db).recuperar()} trabajo(s) regresados a pendiente")
@@ -0,0 +1,415 @@
+"""
+tileCatalog.py
+==============
+Catálogo SQLite indexado de casillas, construido a partir de los CSV de props/
+(o de sus equivalentes Excel / Parquet / Arrow, ver propsReader.py).
+
+Cada CSV (zmg.csv, o el de cualquier otra ciudad) se importa como un
+"catálogo" dentro de props/catalog.sqlite, identificado por su ruta absoluta
+(dos zmg.csv en carpetas distintas son catálogos distintos). Un nombre
+repetido dentro del CSV es un error (CatalogError), no una fila que pisa a
+otra. Las consultas de carril, tipo y precio usan índices en vez de filtrar
+el DataFrame completo cada vez.
+
+Tablas:
+  casillas  (catalogo, nombre, color, carril, imagen, precio, renta_base,
+             tipo, posicion, orden, row_hash)
+      índice (catalogo, carril, tipo, precio)   ← carriles ordenados por precio
+      índice (nombre)                           ← búsquedas por nombre
+  fuentes   (catalogo, path, mtime, size)       ← detecta CSV sin cambios
+
+Columna opcional `posicion` (1-based): fija el slot de la casilla dentro de
+su carril, o dentro de las esquinas si es tipo 2/16. Las casillas sin
+posición llenan los huecos en el orden por defecto (propiedades por precio,
+luego el resto en orden del CSV; esquinas en orden del CSV).
+
+Sincronización incremental:
+  - Si el CSV no cambió (mtime + tamaño) no se toca la base.
+  - Si cambió, se calcula un hash por fila y solo se insertan/actualizan las
+    filas cuyo hash difiere; las que ya no existen en el CSV se borran.
+
+Uso:
+    python tileCatalog.py import props/zmg.csv        # sincroniza el catálogo
+    python tileCatalog.py import props/*.csv --force  # reimporta fila por fila
+    python tileCatalog.py stats  props/zmg.csv        # resumen por carril/tipo
+"""
+
+import os
+import sqlite3
+import hashlib
+import threading
+
+import pandas as pd
+
+from propsReader import leer_tabla, coerce_numeric
+from catalogValidator import CatalogError, ValidationIssue
+
+# =============================================================================
+# PATHS
+# =============================================================================
+
+_HERE    = os.path.dirname(os.path.abspath(__file__))
+_DB_PATH = os.path.join(_HERE, "props", "catalog.sqlite")
+
+COLUMNAS = ["nombre", "color", "carril", "imagen", "precio", "renta_base", "tipo"]
+
+# Tipos que nunca ocupan un slot de carril (empresas y empresa+salida van en esquinas)
+TIPOS_ESQUINA = (2, 16)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS casillas (
+    catalogo   TEXT    NOT NULL,
+    nombre     TEXT    NOT NULL,
+    color      TEXT,
+    carril     INTEGER NOT NULL,
+    imagen     TEXT,
+    precio     REAL    NOT NULL DEFAULT 0,
+    renta_base REAL    NOT NULL DEFAULT 0,
+    tipo       INTEGER NOT NULL,
+    posicion   INTEGER,
+    orden      INTEGER NOT NULL,
+    row_hash   TEXT    NOT NULL,
+    PRIMARY KEY (catalogo, nombre)
+);
+CREATE INDEX IF NOT EXISTS idx_casillas_carril
+    ON casillas (catalogo, carril, tipo, precio);
+CREATE INDEX IF NOT EXISTS idx_casillas_nombre
+    ON casillas (nombre);
+CREATE TABLE IF NOT EXISTS fuentes (
+    catalogo TEXT PRIMARY KEY,
+    path     TEXT    NOT NULL,
+    mtime    REAL    NOT NULL,
+    size     INTEGER NOT NULL
+);
+"""
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def catalog_name(path: str) -> str:
+    """
+    Clave del catálogo para un archivo de props: su ruta absoluta normalizada.
+    Con solo el nombre base, props/zmg.csv y otra_edicion/zmg.csv compartirían
+    filas dentro de la misma base.
+    """
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    cols = {r["name"] for r in conn.execute("PRAGMA table_info(casillas)")}
+    if "posicion" not in cols:
+        # Base creada antes de la columna `posicion`: se agrega y se fuerza
+        # la resincronización de todos los catálogos
+        with conn:
+            conn.execute("ALTER TABLE casillas ADD COLUMN posicion INTEGER")
+            conn.execute("DELETE FROM fuentes")
+    viejos = [
+        r["catalogo"] for r in conn.execute("SELECT catalogo FROM fuentes")
+        if not os.path.isabs(r["catalogo"])
+    ]
+    if viejos:
+        # Catálogos indexados por nombre base (antes de usar la ruta absoluta):
+        # se descartan y se reimportan con la clave nueva al abrirlos
+        with conn:
+            conn.executemany("DELETE FROM casillas WHERE catalogo = ?", [(c,) for c in viejos])
+            conn.executemany("DELETE FROM fuentes WHERE catalogo = ?", [(c,) for c in viejos])
+    return conn
+
+
+def _row_hash(values: tuple) -> str:
+    return hashlib.sha1("\x1f".join(str(v) for v in values).encode("utf-8")).hexdigest()
+
+
+def _read_rows(path: str) -> list[tuple]:
+    """
+    Lee el archivo de props (CSV / Excel / Parquet / Arrow) y devuelve tuplas
+    (nombre, color, carril, imagen, precio, renta_base, tipo, posicion, orden).
+    """
+    df = leer_tabla(path)
+    for col in COLUMNAS:
+        if col not in df.columns:
+            raise ValueError(f"Falta la columna requerida: '{col}'")
+
+    coerce_numeric(df, ("precio", "renta_base"))
+
+    def _text(col):
+        return [None if pd.isna(v) else str(v) for v in df[col]]
+
+    if "posicion" in df.columns:
+        pos      = pd.to_numeric(df["posicion"], errors="coerce")
+        posicion = [None if pd.isna(v) else int(v) for v in pos]
+    else:
+        posicion = [None] * len(df)
+
+    # Columnas completas en vez de fila por fila: con Arrow/Parquet los
+    # numéricos son vistas NumPy sin copia y tolist() es una sola pasada en C.
+    return list(zip(
+        df["nombre"].astype(str).tolist(),
+        _text("color"),
+        df["carril"].to_numpy().astype(int, copy=False).tolist(),
+        _text("imagen"),
+        df["precio"].to_numpy().astype(float, copy=False).tolist(),
+        df["renta_base"].to_numpy().astype(float, copy=False).tolist(),
+        df["tipo"].to_numpy().astype(int, copy=False).tolist(),
+        posicion,
+        range(len(df)),
+    ))
+
+
+def _place_by_posicion(rows: list[sqlite3.Row]) -> list[str]:
+    """
+    Ordena (nombre, posicion) ya en orden por defecto: las filas con posicion
+    (1-based) quedan fijas en ese slot y el resto llena los huecos en orden.
+    """
+    fixed = {r["posicion"] - 1: r["nombre"] for r in rows if r["posicion"] is not None}
+    if not fixed:
+        return [r["nombre"] for r in rows]
+    free = iter([r["nombre"] for r in rows if r["posicion"] is None])
+    out  = []
+    for i in range(max(len(rows), max(fixed) + 1)):
+        name = fixed.get(i) or next(free, None)
+        if name is not None:
+            out.append(name)
+    return out
+
+
+# =============================================================================
+# SINCRONIZACIÓN
+# =============================================================================
+
+def sync_catalog(path: str, db_path: str = _DB_PATH, force: bool = False,
+                 conn: sqlite3.Connection = None) -> dict:
+    """
+    Sincroniza el catálogo de `path` dentro de la base SQLite.
+    Devuelve un resumen {'insertadas', 'actualizadas', 'borradas', 'sin_cambios'}.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = _connect(db_path)
+
+    catalogo = catalog_name(path)
+    st       = os.stat(path)
+    summary  = {"insertadas": 0, "actualizadas": 0, "borradas": 0, "sin_cambios": 0}
+
+    try:
+        fuente = conn.execute(
+            "SELECT mtime, size FROM fuentes WHERE catalogo = ?", (catalogo,)
+        ).fetchone()
+        if not force and fuente and fuente["mtime"] == st.st_mtime and fuente["size"] == st.st_size:
+            summary["sin_cambios"] = conn.execute(
+                "SELECT COUNT(*) FROM casillas WHERE catalogo = ?", (catalogo,)
+            ).fetchone()[0]
+            return summary
+
+        existing = {
+            r["nombre"]: r["row_hash"]
+            for r in conn.execute(
+                "SELECT nombre, row_hash FROM casillas WHERE catalogo = ?", (catalogo,)
+            )
+        }
+
+        upserts  = []
+        seen     = {}
+        repetido = []
+        for row in _read_rows(path):
+            nombre = row[0]
+            if nombre in seen:
+                # INSERT OR REPLACE se quedaría solo con la última fila
+                repetido.append(ValidationIssue(
+                    path, row[8] + 2, "nombre",
+                    f"duplicado '{nombre}' (también en la línea {seen[nombre] + 2})",
+                ))
+                continue
+            seen[nombre] = row[8]
+            h = _row_hash(row)
+            old = existing.get(nombre)
+            if old == h:
+                summary["sin_cambios"] += 1
+                continue
+            summary["actualizadas" if old else "insertadas"] += 1
+            upserts.append((catalogo, *row, h))
+
+        if repetido:
+            raise CatalogError(repetido)
+
+        borradas = [(catalogo, n) for n in existing if n not in seen]
+        summary["borradas"] = len(borradas)
+
+        with conn:
+            conn.executemany(
+                """INSERT OR REPLACE INTO casillas
+                   (catalogo, nombre, color, carril, imagen, precio, renta_base,
+                    tipo, posicion, orden, row_hash)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                upserts,
+            )
+            conn.executemany(
+                "DELETE FROM casillas WHERE catalogo = ? AND nombre = ?", borradas
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO fuentes (catalogo, path, mtime, size) VALUES (?, ?, ?, ?)",
+                (catalogo, os.path.abspath(path), st.st_mtime, st.st_size),
+            )
+    finally:
+        if own_conn:
+            conn.close()
+
+    return summary
+
+
+# =============================================================================
+# CONSULTAS
+# =============================================================================
+
+class TileCatalog:
+    """
+    Vista de solo lectura sobre un catálogo ya sincronizado.
+    Al abrirse sincroniza el CSV (si cambió), así que siempre refleja props/.
+    """
+
+    def __init__(self, path: str, db_path: str = _DB_PATH):
+        self.path     = path
+        self.catalogo = catalog_name(path)
+        self._conn    = _connect(db_path)
+        self._lock    = threading.Lock()
+        sync_catalog(path, conn=self._conn)
+
+    def close(self):
+        self._conn.close()
+
+    def _query(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def lane_names(self, carril: int, slots: int = None) -> list[str]:
+        """
+        Nombres del carril en orden de tablero: propiedades (tipo 1) por precio
+        ascendente y después el resto en el orden del CSV, respetando la
+        columna `posicion` si existe. Las empresas (tipos 2 y 16) se excluyen
+        porque van en las esquinas.
+        """
+        props = self._query(
+            """SELECT nombre, posicion FROM casillas
+               WHERE catalogo = ? AND carril = ? AND tipo = 1
+               ORDER BY precio, orden""",
+            (self.catalogo, carril),
+        )
+        others = self._query(
+            f"""SELECT nombre, posicion FROM casillas
+                WHERE catalogo = ? AND carril = ? AND tipo != 1
+                  AND tipo NOT IN ({", ".join("?" * len(TIPOS_ESQUINA))})
+                ORDER BY orden""",
+            (self.catalogo, carril, *TIPOS_ESQUINA),
+        )
+        names = _place_by_posicion(props + others)
+        return names[:slots] if slots is not None else names
+
+    def corner_names(self, carril: int, slots: int = None) -> list[str]:
+        """Empresas (tipos 2 y 16) del carril en orden del CSV / `posicion`."""
+        rows = self._query(
+            f"""SELECT nombre, posicion FROM casillas
+                WHERE catalogo = ? AND carril = ?
+                  AND tipo IN ({", ".join("?" * len(TIPOS_ESQUINA))})
+                ORDER BY orden""",
+            (self.catalogo, carril, *TIPOS_ESQUINA),
+        )
+        names = _place_by_posicion(rows)
+        return names[:slots] if slots is not None else names
+
+    def rows(self, carril: int = None, tipo: int = None, by_price: bool = False) -> list[dict]:
+        """
+        Filas del catálogo (como dicts), opcionalmente filtradas por carril y/o
+        tipo. Por defecto en orden del CSV; by_price=True ordena por precio.
+        """
+        sql    = "SELECT * FROM casillas WHERE catalogo = ?"
+        params = [self.catalogo]
+        if carril is not None:
+            sql += " AND carril = ?"
+            params.append(carril)
+        if tipo is not None:
+            sql += " AND tipo = ?"
+            params.append(tipo)
+        sql += " ORDER BY precio, orden" if by_price else " ORDER BY orden"
+        return [dict(r) for r in self._query(sql, tuple(params))]
+
+    def get(self, nombre: str) -> dict | None:
+        rows = self._query(
+            "SELECT * FROM casillas WHERE catalogo = ? AND nombre = ?",
+            (self.catalogo, nombre),
+        )
+        return dict(rows[0]) if rows else None
+
+    def props_by_name(self) -> dict[str, dict]:
+        return {r["nombre"]: r for r in self.rows()}
+
+    def tipo_counts(self) -> dict[int, int]:
+        return {
+            r["tipo"]: r["n"]
+            for r in self._query(
+                "SELECT tipo, COUNT(*) AS n FROM casillas WHERE catalogo = ? GROUP BY tipo",
+                (self.catalogo,),
+            )
+        }
+
+
+_OPEN: dict[str, TileCatalog] = {}
+_OPEN_LOCK = threading.Lock()
+
+
+def open_catalog(path: str, db_path: str = _DB_PATH) -> TileCatalog:
+    """
+    Devuelve un TileCatalog para `path`, reutilizando la conexión si ya se abrió
+    en este proceso. Siempre resincroniza (barato si el CSV no cambió).
+    """
+    key = (os.path.abspath(path), os.path.abspath(db_path))
+    with _OPEN_LOCK:
+        cat = _OPEN.get(key)
+        if cat is None:
+            cat = TileCatalog(path, db_path)
+            _OPEN[key] = cat
+        else:
+            with cat._lock:
+                sync_catalog(path, conn=cat._conn)
+        return cat
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Catálogo SQLite de casillas Metropoly")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_imp = sub.add_parser("import", help="Importa/sincroniza uno o más CSV")
+    p_imp.add_argument("paths", nargs="+")
+    p_imp.add_argument("--db", default=_DB_PATH)
+    p_imp.add_argument("--force", action="store_true",
+                       help="Ignora mtime/tamaño y compara todas las filas")
+
+    p_st = sub.add_parser("stats", help="Resumen por carril y tipo")
+    p_st.add_argument("path")
+    p_st.add_argument("--db", default=_DB_PATH)
+
+    args = parser.parse_args()
+
+    if args.cmd == "import":
+        for p in args.paths:
+            s = sync_catalog(p, db_path=args.db, force=args.force)
+            print(
+                f"[tileCatalog] {p}: +{s['insertadas']} "
+                f"~{s['actualizadas']} -{s['borradas']} ={s['sin_cambios']}"
+            )
+    else:
+        cat = TileCatalog(args.path, db_path=args.db)
+        for carril in (1, 2, 3):
+            print(f"[tileCatalog] Carril {carril}: {len(cat.rows(carril=carril))} casillas")
+        for tipo, n in sorted(cat.tipo_counts().items()):
+            print(f"   tipo {tipo:>2}: {n}")
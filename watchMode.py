@@ -0,0 +1,496 @@
+"""
+watchMode.py
+============
+Modo --watch: un proceso que se queda abierto vigilando los catálogos, src/
+y los módulos de plantilla, y regenera solo lo que toca cada cambio.
+
+Cambiar un precio en props/zmg.csv, un color en src/palette.html o un
+porcentaje en board_config.json obligaba a correr generator.py (o
+gameFactory.py) otra vez: importar pandas / bs4 / PIL, validar el catálogo y
+revisar cada casilla y tarjeta en disco. Aquí el proceso sigue vivo entre
+cambios: catálogo, paleta, config, fuente e imágenes en base64 se quedan en
+memoria (las cachés por mtime de cardFactory y boardFactory) y cada cambio
+se traduce en el conjunto mínimo de salidas:
+
+  props/zmg.csv       → casillas y tarjetas de las filas que cambiaron,
+                        archivos de las filas borradas, tablero
+  src/palette.html    → casillas y tarjetas que usan un color que cambió;
+                        fortunas (por huella) y hojas
+  board_config.json   → tile: todas las casillas · card: todas las tarjetas
+  src/img/            → casillas y tarjetas cuya imagen cambió (o su alias)
+  props/fortunas.csv  → fortunas cuya huella cambió, hojas de esos carriles
+  src/gw/             → atlas, fortunas y hojas
+  *Factory.py         → se recarga el módulo y se rehace lo que genera
+
+El tablero se rearma si cambió alguna casilla o el layout; renderTileCell
+memoiza por mtime, así que solo se releen las celdas nuevas.
+
+La detección es por sondeo (mtime + tamaño de cada archivo cada
+`intervalo` segundos): sin dependencias extra, y con unos cientos de
+archivos cada vuelta cuesta menos de un milisegundo. Los cambios se agrupan
+hasta que los archivos dejan de moverse (los editores guardan en varios
+pasos).
+
+Mientras vigila no se scrapea (scraper.solo_cache): una casilla sin imagen
+sale con fondo de color hasta la siguiente corrida normal.
+
+Uso:
+    python generator.py --watch
+    python gameFactory.py --watch            # además reensambla juego_completo/
+"""
+
+import os
+import json
+import time
+import importlib
+import traceback
+from dataclasses import dataclass, field
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+_HERE     = os.path.dirname(os.path.abspath(__file__))
+INTERVALO = 0.25            # segundos entre sondeos
+
+# Módulo de plantilla → (módulos a recargar en orden, salidas que rehace)
+_PLANTILLAS = {
+    "cardFactory.py":        (("cardFactory", "generator"),  {"casillas", "tarjetas"}),
+    "boardFactory.py":       (("boardFactory", "generator"), {"tablero"}),
+    "fortunaFactory.py":     (("fortunaFactory",),           {"fortunas"}),
+    "instructivoFactory.py": (("instructivoFactory",),       {"instructivo"}),
+}
+
+# Sección de board_config.json → salida que depende de ella
+_CONFIG_SALIDAS = {"tile": "casillas", "card": "tarjetas"}
+
+_FONDO      = {1: "basicBG", 2: "yellowBG", 3: "redBG"}
+_ROTACIONES = (0, 90, 180, 270)
+_TEMPORALES = (".tmp", ".part", ".swp", "~")
+
+
+# =============================================================================
+# SONDEO
+# =============================================================================
+
+def escanear(rutas) -> dict:
+    """
+    {archivo: (mtime_ns, tamaño)} de cada ruta (archivo, o carpeta recursiva).
+    Se omiten ocultos (salvo .alias.json), temporales y el atlas de sprites,
+    que se genera dentro de src/gw.
+    """
+    from fortunaFactory import _ATLAS_NAME
+
+    out, pendientes = {}, list(rutas)
+    while pendientes:
+        ruta = pendientes.pop()
+        try:
+            if not os.path.isdir(ruta):
+                st = os.stat(ruta)
+                out[ruta] = (st.st_mtime_ns, st.st_size)
+                continue
+            for e in os.scandir(ruta):
+                if e.name.startswith(".") and e.name != ".alias.json":
+                    continue
+                if e.is_dir():
+                    pendientes.append(e.path)
+                elif not e.name.endswith(_TEMPORALES) and not e.name.startswith(_ATLAS_NAME):
+                    st = e.stat()
+                    out[e.path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            continue
+    return out
+
+
+def _diferencias(antes: dict, ahora: dict) -> set:
+    return {p for p in antes.keys() | ahora.keys() if antes.get(p) != ahora.get(p)}
+
+
+# =============================================================================
+# PLAN
+# =============================================================================
+
+@dataclass
+class Pendiente:
+    """Salidas a regenerar por un lote de cambios."""
+    casillas:    set  = field(default_factory=set)     # nombres
+    tarjetas:    set  = field(default_factory=set)     # nombres
+    borradas:    set  = field(default_factory=set)     # nombres que salieron del catálogo
+    tablero:     bool = False
+    fortunas:    bool = False
+    hojas:       set  = field(default_factory=set)     # carriles
+    instructivo: bool = False
+
+    def vacio(self) -> bool:
+        return not (self.casillas or self.tarjetas or self.borradas or self.tablero
+                    or self.fortunas or self.hojas or self.instructivo)
+
+    def unir(self, otro: "Pendiente") -> None:
+        self.casillas    |= otro.casillas
+        self.tarjetas    |= otro.tarjetas
+        self.borradas    |= otro.borradas
+        self.tablero     |= otro.tablero
+        self.fortunas    |= otro.fortunas
+        self.hojas       |= otro.hojas
+        self.instructivo |= otro.instructivo
+
+    def resumen(self) -> str:
+        partes = [
+            f"{len(self.casillas)} casilla(s)" if self.casillas else "",
+            f"{len(self.tarjetas)} tarjeta(s)" if self.tarjetas else "",
+            f"{len(self.borradas)} borrada(s)" if self.borradas else "",
+            "tablero" if self.tablero or self.casillas else "",
+            "fortunas" if self.fortunas else "",
+            f"{len(self.hojas)} hoja(s)" if self.hojas else "",
+            "instructivo" if self.instructivo else "",
+        ]
+        return " · ".join(p for p in partes if p) or "nada que regenerar"
+
+
+def _huella(prop) -> str:
+    return json.dumps(vars(prop), sort_keys=True, default=str)
+
+
+def _sin_scraping(cfg: dict) -> dict:
+    return {**cfg, "scraper": {**cfg.get("scraper", {}), "solo_cache": True}}
+
+
+# =============================================================================
+# VIGILANTE
+# =============================================================================
+
+class Vigilante:
+    """
+    Estado de una edición en memoria (filas del catálogo, layout, paleta,
+    config, imagen de cada casilla, mazo de fortunas) y la traducción de
+    cada lote de archivos cambiados a un Pendiente.
+    """
+
+    def __init__(self, props_path: str = None, fortunas_path: str = None,
+                 repo_dir: str = None, tablero_path: str = None, corners: dict = None,
+                 workers: int = 1, al_terminar=None, label: str = "watch"):
+        import cardFactory, fortunaFactory
+
+        self.props_path    = os.path.abspath(props_path    or os.path.join(_HERE, "props", "zmg.csv"))
+        self.fortunas_path = os.path.abspath(fortunas_path or os.path.join(_HERE, "props", "fortunas.csv"))
+        repo_dir           = os.path.abspath(repo_dir or os.path.join(_HERE, "repo"))
+        self.casillas_dir  = os.path.join(repo_dir, "casillas")
+        self.tarjetas_dir  = os.path.join(repo_dir, "tarjetas")
+        self.fortunas_dir  = os.path.join(repo_dir, "fortunas")
+        self.inst_dir      = os.path.join(repo_dir, "instructivo")
+        self.tablero_path  = os.path.abspath(
+            tablero_path or os.path.join(repo_dir, "tableros", "tablero_metropoly.html"))
+
+        self.config_path  = cardFactory._CONFIG_PATH
+        self.palette_path = cardFactory._PALETTE_PATH
+        self.font_path    = cardFactory._FONT_PATH
+        self.img_dir      = cardFactory._IMG_DIR
+        self.gw_dir       = fortunaFactory._GW_DIR
+
+        self.corners     = corners
+        self.workers     = workers
+        self.al_terminar = al_terminar
+        self.label       = label
+        self._rezagado   = Pendiente()     # lo que falló en el lote anterior
+
+    def rutas(self) -> list:
+        plantillas = [os.path.join(_HERE, m) for m in _PLANTILLAS]
+        return [self.props_path, self.fortunas_path, os.path.dirname(self.config_path),
+                *plantillas]
+
+    # ── Carga inicial ─────────────────────────────────────────────────────────
+
+    def cargar(self) -> bool:
+        """Lee catálogo, paleta, config y mazo. False si el catálogo es inválido."""
+        import cardFactory, fortunaFactory, generator
+
+        self.cfg_raw = cardFactory._load_config(self.config_path)
+        self.cfg     = _sin_scraping(self.cfg_raw)
+        self.colors  = cardFactory._get_colors(self.palette_path)
+        self.font    = os.path.exists(self.font_path)
+
+        ed = generator.preparar_edicion(self.props_path, self.corners, self.label)
+        if ed is None:
+            return False
+        self.layout   = ed.layout
+        self.props    = {p.nombre: p for p in ed.propiedades}
+        self.filas    = {n: _huella(p) for n, p in self.props.items()}
+        self.imagenes = {n: cardFactory._cached_image(n) for n in self.props}
+
+        self.mazo     = fortunaFactory.cargar_fortunas(self.fortunas_path)
+        self.carriles = self._carriles(self.mazo)
+        return True
+
+    def inicial(self) -> Pendiente:
+        """Primera pasada: lo que falte en disco (la caché normal de cada factory)."""
+        import cardFactory, generator
+
+        def procesar(prop):
+            cardFactory.generar_casilla(prop, cfg=self.cfg, colors=self.colors,
+                                        out_dir=self.casillas_dir)
+            cardFactory.generar_tarjeta(prop, cfg=self.cfg, colors=self.colors,
+                                        out_dir=self.tarjetas_dir)
+
+        generator.renderizar_propiedades(list(self.props.values()), procesar,
+                                         self.workers, self.label)
+        return Pendiente(tablero=True, fortunas=True, hojas={1, 2, 3})
+
+    @staticmethod
+    def _carriles(df) -> dict:
+        return {c: df[df["carril"] == c].to_json(orient="records") for c in (1, 2, 3)}
+
+    # ── Cambio → salidas ──────────────────────────────────────────────────────
+
+    def planificar(self, cambios: set) -> Pendiente:
+        p = Pendiente()
+        todas = set(self.props)
+
+        for ruta in sorted(cambios):
+            nombre = os.path.basename(ruta)
+            if os.path.dirname(ruta) == _HERE and nombre in _PLANTILLAS:
+                modulos, salidas = _PLANTILLAS[nombre]
+                try:
+                    for m in modulos:
+                        importlib.reload(importlib.import_module(m))
+                except Exception as e:
+                    print(f"[{self.label}] ❌ {nombre} no se pudo recargar: {type(e).__name__}: {e}")
+                    continue
+                if "casillas" in salidas: p.casillas |= todas
+                if "tarjetas" in salidas: p.tarjetas |= todas
+                p.tablero     |= "tablero" in salidas
+                p.instructivo |= "instructivo" in salidas
+                if "fortunas" in salidas:
+                    p.fortunas = True
+                    p.hojas   |= {1, 2, 3}
+
+        if self.config_path in cambios:
+            self._config(p)
+        if self.palette_path in cambios:
+            self._paleta(p)
+        if self.font_path in cambios and os.path.exists(self.font_path) != self.font:
+            # El TTF se referencia por ruta: solo importa si aparece o desaparece
+            self.font = not self.font
+            p.casillas |= todas
+            p.tarjetas |= todas
+            p.fortunas  = True
+            p.hojas    |= {1, 2, 3}
+        if self.props_path in cambios:
+            self._catalogo(p)
+        if any(c.startswith(self.img_dir + os.sep) for c in cambios):
+            self._imagenes(p, cambios)
+        if self.fortunas_path in cambios:
+            self._mazo(p)
+        if any(c.startswith(self.gw_dir + os.sep) for c in cambios):
+            p.fortunas = True
+            p.hojas   |= {1, 2, 3}
+        return p
+
+    def _config(self, p: Pendiente) -> None:
+        import cardFactory
+        try:
+            nuevo = cardFactory._load_config(self.config_path)
+        except ValueError as e:
+            print(f"[{self.label}] ❌ board_config.json inválido: {e}")
+            return
+        for seccion in nuevo.keys() | self.cfg_raw.keys():
+            if nuevo.get(seccion) != self.cfg_raw.get(seccion):
+                salida = _CONFIG_SALIDAS.get(seccion)
+                if salida == "casillas":
+                    p.casillas |= set(self.props)
+                elif salida == "tarjetas":
+                    p.tarjetas |= set(self.props)
+        self.cfg_raw, self.cfg = nuevo, _sin_scraping(nuevo)
+
+    def _paleta(self, p: Pendiente) -> None:
+        import cardFactory
+        try:
+            nuevos = cardFactory._get_colors(self.palette_path)
+        except (IndexError, AttributeError) as e:
+            print(f"[{self.label}] ❌ palette.html incompleta: {type(e).__name__}")
+            return
+        claves = {k for k in nuevos.keys() | self.colors.keys()
+                  if nuevos.get(k) != self.colors.get(k)}
+        self.colors = nuevos
+        if not claves:
+            return
+        for nombre, prop in self.props.items():
+            usa = {prop.color, _FONDO.get(prop.carril, "basicBG"), "borderBlack"}
+            if prop.color not in nuevos:
+                usa.add("blue")                     # color de franja por defecto
+            if usa & claves:
+                p.casillas.add(nombre)
+                p.tarjetas.add(nombre)
+        p.fortunas = True
+        p.hojas   |= {1, 2, 3}
+
+    def _catalogo(self, p: Pendiente) -> None:
+        import cardFactory, generator
+        ed = generator.preparar_edicion(self.props_path, self.corners, self.label)
+        if ed is None:
+            print(f"[{self.label}] ❌ Catálogo inválido: se mantiene la versión anterior")
+            return
+        nuevos  = {pr.nombre: pr for pr in ed.propiedades}
+        huellas = {n: _huella(pr) for n, pr in nuevos.items()}
+        cambian = {n for n, h in huellas.items() if self.filas.get(n) != h}
+
+        p.casillas |= cambian
+        p.tarjetas |= cambian
+        p.borradas |= set(self.filas) - set(huellas)
+        p.tablero  |= (ed.layout.lanes, ed.layout.corners) != (self.layout.lanes, self.layout.corners)
+
+        self.layout, self.props, self.filas = ed.layout, nuevos, huellas
+        for n in cambian:
+            self.imagenes[n] = cardFactory._cached_image(n)
+
+    def _imagenes(self, p: Pendiente, cambios: set) -> None:
+        import cardFactory
+        for nombre in self.props:
+            img = cardFactory._cached_image(nombre)
+            if img != self.imagenes.get(nombre) or img in cambios:
+                p.casillas.add(nombre)
+                p.tarjetas.add(nombre)
+            self.imagenes[nombre] = img
+
+    def _mazo(self, p: Pendiente) -> None:
+        import fortunaFactory
+        try:
+            mazo = fortunaFactory.cargar_fortunas(self.fortunas_path)
+        except ValueError as e:                 # CatalogError es ValueError
+            print(f"[{self.label}] ❌ {e}")
+            return
+        carriles = self._carriles(mazo)
+        p.fortunas = True
+        p.hojas   |= {c for c in carriles if carriles[c] != self.carriles.get(c)}
+        self.mazo, self.carriles = mazo, carriles
+
+    # ── Regenerar ─────────────────────────────────────────────────────────────
+
+    def aplicar(self, p: Pendiente) -> dict:
+        import cardFactory, fortunaFactory, generator
+
+        p.unir(self._rezagado)
+        self._rezagado = Pendiente()
+        hechos = {"archivos": 0, "errores": 0}
+
+        for nombre in p.borradas - set(self.props):
+            safe = cardFactory._safe_name(nombre)
+            for path in [os.path.join(self.casillas_dir, f"casilla_{safe}_{r}.html") for r in _ROTACIONES] \
+                        + [os.path.join(self.tarjetas_dir, f"tarjeta_{safe}.html")]:
+                if os.path.exists(path):
+                    os.remove(path)
+                    hechos["archivos"] += 1
+            self.imagenes.pop(nombre, None)
+
+        nombres = sorted((p.casillas | p.tarjetas) & set(self.props))
+        if nombres:
+            def procesar(prop):
+                if prop.nombre in p.casillas:
+                    cardFactory.generar_casilla(prop, force=True, cfg=self.cfg, colors=self.colors,
+                                                out_dir=self.casillas_dir)
+                if prop.nombre in p.tarjetas:
+                    cardFactory.generar_tarjeta(prop, force=True, cfg=self.cfg, colors=self.colors,
+                                                out_dir=self.tarjetas_dir)
+            try:
+                errores = generator.renderizar_propiedades(
+                    [self.props[n] for n in nombres], procesar, self.workers, self.label)
+            except Exception:
+                traceback.print_exc()
+                errores = len(nombres)
+            if errores:
+                hechos["errores"] += errores
+                self._rezagado.casillas |= p.casillas
+                self._rezagado.tarjetas |= p.tarjetas
+            hechos["archivos"] += (4 * len(p.casillas & set(nombres))
+                                   + len(p.tarjetas & set(nombres)))
+
+        if p.casillas or p.borradas or p.tablero:
+            generator.guardar_tablero(self.layout, self.props_path, self.tablero_path,
+                                      self.casillas_dir, self.label)
+            hechos["archivos"] += 1
+
+        if p.fortunas or p.hojas:
+            colors = fortunaFactory._get_colors(self.palette_path)
+            atlas  = fortunaFactory.construir_atlas(self.gw_dir)
+            res = fortunaFactory.renderizar_fortunas(self.mazo, out_dir=self.fortunas_dir,
+                                                     colors=colors, atlas=atlas, completo=True)
+            hechos["archivos"] += res["escritas"]
+            hojas = os.path.join(self.fortunas_dir, "hojas")
+            os.makedirs(hojas, exist_ok=True)
+            for carril in sorted(p.hojas):
+                slug = fortunaFactory._LANE_SLUG[carril]
+                fortunaFactory.generar_hoja_carril(
+                    self.mazo, carril, os.path.join(hojas, f"hojas_{slug}.html"), colors, atlas=atlas)
+                hechos["archivos"] += 1
+
+        if p.instructivo:
+            import instructivoFactory
+            instructivoFactory.generar(self.inst_dir)
+            hechos["archivos"] += 1
+
+        if self.al_terminar and hechos["archivos"]:
+            self.al_terminar()
+        return hechos
+
+    def procesar(self, cambios: set) -> None:
+        t0 = time.perf_counter()
+        rel = sorted(os.path.relpath(c, _HERE) for c in cambios)
+        print(f"\n[{self.label}] Cambió: {', '.join(rel[:5])}"
+              + (f" (+{len(rel) - 5})" if len(rel) > 5 else ""))
+        try:
+            p = self.planificar(cambios)
+            print(f"[{self.label}] → {p.resumen()}")
+            if p.vacio() and self._rezagado.vacio():
+                return
+            hechos = self.aplicar(p)
+        except Exception:
+            traceback.print_exc()
+            print(f"[{self.label}] ❌ Lote fallido; se reintenta con el siguiente cambio")
+            return
+        estado = "✅" if not hechos["errores"] else f"⚠️  {hechos['errores']} error(es)"
+        print(f"[{self.label}] {estado} {hechos['archivos']} archivo(s) en "
+              f"{time.perf_counter() - t0:.2f}s")
+
+
+# =============================================================================
+# BUCLE
+# =============================================================================
+
+def vigilar(props_path: str = None, fortunas_path: str = None, repo_dir: str = None,
+            tablero_path: str = None, corners: dict = None, workers: int = 1,
+            intervalo: float = INTERVALO, al_terminar=None, label: str = "watch") -> None:
+    """
+    Build inicial y luego, hasta Ctrl+C, regenera lo afectado por cada lote
+    de cambios. al_terminar(): se llama después de cada lote que escribió
+    algo (gameFactory la usa para reensamblar juego_completo/).
+    """
+    v = Vigilante(props_path, fortunas_path, repo_dir, tablero_path, corners,
+                  workers, al_terminar, label)
+    rutas = v.rutas()
+    foto  = escanear(rutas)
+
+    t0 = time.perf_counter()
+    if not v.cargar():
+        raise SystemExit(1)
+    v.aplicar(v.inicial())
+    print(f"[{label}] Build inicial en {time.perf_counter() - t0:.1f}s · vigilando "
+          f"{len(foto)} archivos cada {intervalo:g}s (Ctrl+C para salir)")
+
+    try:
+        while True:
+            time.sleep(intervalo)
+            ahora   = escanear(rutas)
+            cambios = _diferencias(foto, ahora)
+            if not cambios:
+                continue
+            while True:                         # esperar a que el guardado termine
+                time.sleep(intervalo)
+                despues = escanear(rutas)
+                extra   = _diferencias(ahora, despues)
+                if not extra:
+                    break
+                cambios |= extra
+                ahora    = despues
+            foto = ahora
+            v.procesar(cambios)
+    except KeyboardInterrupt:
+        print(f"\n[{label}] Fin del modo watch")